@@ -22,23 +22,37 @@ bing_token_1、bing_token_2、bing_token_3、bing_token_4... （可选，用于
 cron: 10 0-22 * * *
 """
 
-import requests
+from __future__ import annotations
+
 import random
 import string
 import re
 import time
 import json
 import os
+import sys
+import queue
+import atexit
 from datetime import datetime, date
-from urllib.parse import quote, unquote
+from urllib.parse import quote, unquote, urlsplit
 import threading
-from typing import Dict, List, Optional, Tuple, Any
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as futures_wait, FIRST_COMPLETED, TimeoutError as FuturesTimeoutError
+from typing import Dict, List, Optional, Tuple, Any, Generator, Callable, TYPE_CHECKING
 from dataclasses import dataclass
 from functools import wraps
+from itertools import zip_longest
+from contextlib import contextmanager
 import traceback
 import secrets
+import hashlib
+import sqlite3
 import uuid
 
+if TYPE_CHECKING:
+    # requests 仅在真正发起请求时导入，跳过执行的运行无需加载
+    import requests
+
 # ==================== 用户配置区域 ====================
 # 在这里修改您的配置参数
 # 
@@ -59,21 +73,51 @@ import uuid
 # 任务执行配置
 TASK_CONFIG = {
     'SEARCH_CHECK_INTERVAL': 4,      # 搜索检查间隔次数
+    # 连续多次核对搜索进度无增长（停滞）时是否提前停止搜索。停滞总会记录一条日志；默认不停止，
+    # 因为服务端搜索计数常滞后数分钟后才补上，提前停止会少拿积分，且原流程本就搜满预定次数。
+    # 账号确认被限制计数时可开启，节省无效搜索
+    'SEARCH_STALL_ABORT': False,
     'SEARCH_DELAY_MIN': 25,          # 搜索延迟最小值（秒）
     'SEARCH_DELAY_MAX': 35,          # 搜索延迟最大值（秒）
     'TASK_DELAY_MIN': 2,             # 任务延迟最小值（秒）
     'TASK_DELAY_MAX': 4,             # 任务延迟最大值（秒）
     'MAX_RETRIES': 3,                # 最大重试次数
-    'RETRY_DELAY': 2,                # 重试延迟（秒）
+    'RETRY_DELAY': 2,                # 重试延迟（秒），指数退避的基数
+    'RETRY_BACKOFF_MAX': 10,         # 指数退避单次等待上限（秒）
+    'RETRY_BUDGET': 30,              # 每个账号所有层级共享的重试次数上限
     'REQUEST_TIMEOUT': 15,           # 请求超时时间（秒）
     'HOT_WORDS_MAX_COUNT': 30,       # 热搜词最大数量
+    'HOT_WORDS_TIMEOUT': 12,         # 热搜源并发获取总超时（秒）
+    'HOT_WORDS_CONCURRENCY': 4,      # 热搜源同时请求数（按 API 主机轮流排队，首轮每个主机各一个）
+    'HOT_WORDS_CACHE_TTL': 3600,     # 今日热搜词缓存超过该秒数后后台刷新
     'MAX_REPEAT_COUNT': 3,           # 最大重复运行次数
+    'PROMOTIONS_CACHE_TTL': 20,      # 移动端信息(dapi/me)快照有效期（秒）
+    'OFFER_FETCH_CONCURRENCY': 3,    # 额外活动发现阶段每个账号并发拉取 RSC 页面的上限
+    'FETCH_POOL_WORKERS': 8,         # 各账号共用的页面并发拉取线程数（不随账号数增长）
+    'EDGE_REPORT_INTERVAL': 305,     # Edge 浏览打卡两次上报之间的间隔（秒），低于 300 秒时服务端可能不计入进度
+    'RSC_STREAMING': True,           # 边下载边切分 RSC 响应，只保留包含任务字段的行
+    'HTTP_POOL_HOSTS': 16,           # 进程级连接池缓存的主机数（rewards/bing/login/dapi/热搜源）
+    'HTTP_POOL_MAXSIZE': 32,         # 每个主机保留的 keep-alive 连接数，建议不小于 账号数×额外活动并发
+    'ASYNC_ENGINE': False,           # 是否使用 asyncio 调度器（所有账号共用一个事件循环）
+    'ASYNC_MAX_INFLIGHT': 8,         # asyncio 调度器同时进行中的请求上限
+    'OVERLAP_TASK_FAMILIES': True,   # 单账号内任务族交错执行：Edge打卡等待期间先做阅读/额外活动，再做电脑搜索
+    'REQUEST_METRICS': False,        # 运行结束时打印各接口请求统计（次数/耗时分布/状态码/重试）
+    'REQUEST_METRICS_FILE': "",      # 非空时将请求统计（全局+各账号）写入该 JSON 文件
+    'LOG_LEVEL': "INFO",             # 日志级别：DEBUG / INFO / SUCCESS / WARNING / ERROR
+    'LOG_QUEUED': True,              # 日志先入队，由单独的写线程批量输出（避免各账号线程争抢 stdout）
+    'LOG_JSON_FILE': "",             # 非空时额外以 JSON-lines 格式追加写入该文件
 }
 
 # 缓存配置
 CACHE_CONFIG = {
-    'CACHE_FILE': "bing_cache.json",  # 缓存文件名
+    'CACHE_FILE': "bing_cache.json",  # 缓存文件名（实际存储为同名 .db，旧版 JSON 首次运行自动迁移）
     'CACHE_ENABLED': True,            # 是否启用缓存
+    'ACCESS_TOKEN_DISK_CACHE': False, # 是否将访问令牌写入缓存文件（跨进程复用）
+    'ACCESS_TOKEN_REFRESH_MARGIN': 300,  # 访问令牌到期前多少秒提前刷新
+    'OFFER_STATE_CACHE': True,        # 是否按账号按天缓存额外活动状态（已完成任务、Punch Card 结构）
+    'OFFER_STATE_REFRESH': 10800,     # 已全部处理的账号在该秒数内重复运行时跳过 RSC 拉取
+    'OFFER_LOCKED_RECHECK': 3600,     # 存在未解锁任务时，该秒数后视为可能已解锁，不再跳过 RSC 拉取
+    'EDGE_CHECKIN_STATE_CACHE': True, # 是否缓存 Edge 浏览打卡进度（中断后从上次上报处继续）
 }
 
 # 使用缓存配置
@@ -86,6 +130,7 @@ class Config:
     """配置类，统一管理所有配置项"""
     # 搜索配置
     SEARCH_CHECK_INTERVAL: int = TASK_CONFIG['SEARCH_CHECK_INTERVAL']
+    SEARCH_STALL_ABORT: bool = TASK_CONFIG['SEARCH_STALL_ABORT']
     SEARCH_DELAY_MIN: int = TASK_CONFIG['SEARCH_DELAY_MIN']
     SEARCH_DELAY_MAX: int = TASK_CONFIG['SEARCH_DELAY_MAX']
     TASK_DELAY_MIN: int = TASK_CONFIG['TASK_DELAY_MIN']
@@ -94,13 +139,45 @@ class Config:
     # 重试配置
     MAX_RETRIES: int = TASK_CONFIG['MAX_RETRIES']
     RETRY_DELAY: int = TASK_CONFIG['RETRY_DELAY']
+    RETRY_BACKOFF_MAX: int = TASK_CONFIG['RETRY_BACKOFF_MAX']
+    RETRY_BUDGET: int = TASK_CONFIG['RETRY_BUDGET']
     
     # 文件配置
     CACHE_FILE: str = CACHE_CONFIG['CACHE_FILE']
+    ACCESS_TOKEN_DISK_CACHE: bool = CACHE_CONFIG['ACCESS_TOKEN_DISK_CACHE']
+    ACCESS_TOKEN_REFRESH_MARGIN: int = CACHE_CONFIG['ACCESS_TOKEN_REFRESH_MARGIN']
+    OFFER_STATE_CACHE: bool = CACHE_CONFIG['OFFER_STATE_CACHE']
+    OFFER_STATE_REFRESH: int = CACHE_CONFIG['OFFER_STATE_REFRESH']
+    OFFER_LOCKED_RECHECK: int = CACHE_CONFIG['OFFER_LOCKED_RECHECK']
+    EDGE_CHECKIN_STATE_CACHE: bool = CACHE_CONFIG['EDGE_CHECKIN_STATE_CACHE']
     
     # API配置
     REQUEST_TIMEOUT: int = TASK_CONFIG['REQUEST_TIMEOUT']
     HOT_WORDS_MAX_COUNT: int = TASK_CONFIG['HOT_WORDS_MAX_COUNT']
+    HOT_WORDS_TIMEOUT: int = TASK_CONFIG['HOT_WORDS_TIMEOUT']
+    HOT_WORDS_CONCURRENCY: int = TASK_CONFIG['HOT_WORDS_CONCURRENCY']
+    HOT_WORDS_CACHE_TTL: int = TASK_CONFIG['HOT_WORDS_CACHE_TTL']
+    PROMOTIONS_CACHE_TTL: int = TASK_CONFIG['PROMOTIONS_CACHE_TTL']
+    OFFER_FETCH_CONCURRENCY: int = TASK_CONFIG['OFFER_FETCH_CONCURRENCY']
+    FETCH_POOL_WORKERS: int = TASK_CONFIG['FETCH_POOL_WORKERS']
+    EDGE_REPORT_INTERVAL: int = TASK_CONFIG['EDGE_REPORT_INTERVAL']
+    RSC_STREAMING: bool = TASK_CONFIG['RSC_STREAMING']
+    HTTP_POOL_HOSTS: int = TASK_CONFIG['HTTP_POOL_HOSTS']
+    HTTP_POOL_MAXSIZE: int = TASK_CONFIG['HTTP_POOL_MAXSIZE']
+
+    # 调度配置
+    ASYNC_ENGINE: bool = TASK_CONFIG['ASYNC_ENGINE']
+    ASYNC_MAX_INFLIGHT: int = TASK_CONFIG['ASYNC_MAX_INFLIGHT']
+    OVERLAP_TASK_FAMILIES: bool = TASK_CONFIG['OVERLAP_TASK_FAMILIES']
+
+    # 请求统计配置
+    REQUEST_METRICS: bool = TASK_CONFIG['REQUEST_METRICS']
+    REQUEST_METRICS_FILE: str = TASK_CONFIG['REQUEST_METRICS_FILE']
+
+    # 日志配置
+    LOG_LEVEL: str = TASK_CONFIG['LOG_LEVEL']
+    LOG_QUEUED: bool = TASK_CONFIG['LOG_QUEUED']
+    LOG_JSON_FILE: str = TASK_CONFIG['LOG_JSON_FILE']
     
     # User-Agent池配置
     PC_USER_AGENTS: List[str] = None
@@ -166,6 +243,12 @@ class AccountInfo:
     alias: str
     cookies: str
     refresh_token: str = ""
+    email: str = ""  # 获取账号信息后填入
+
+    @property
+    def state_key(self) -> str:
+        """按账号缓存当天状态的键：优先邮箱，调整账号顺序后仍能对应；未知时退回账号别名"""
+        return self.email or self.alias
 
 class AccountManager:
     """账号管理器 - 读取环境变量中的账号配置"""
@@ -292,36 +375,147 @@ class LogLevel:
     WARNING = 3
     ERROR = 4
 
+    @classmethod
+    def parse(cls, name: Any, default: int = INFO) -> int:
+        """将配置中的级别名（或数字）转换为级别值"""
+        if isinstance(name, int):
+            return name
+        return getattr(cls, str(name or "").strip().upper(), default)
+
+# 日志记录：(时间戳, 级别, 图标, 标题, 消息, 账号索引)；级别为 None 表示原样输出的文本行
+LogRecord = Tuple[float, Optional[int], str, str, str, Optional[int]]
+
+class LogSink:
+    """日志输出端 - 工作线程只负责入队，由单个写线程批量格式化并写入 stdout / JSON-lines 文件"""
+
+    BATCH_MAX = 256
+    LEVEL_NAMES = {LogLevel.DEBUG: "DEBUG", LogLevel.INFO: "INFO", LogLevel.SUCCESS: "SUCCESS",
+                   LogLevel.WARNING: "WARNING", LogLevel.ERROR: "ERROR"}
+
+    def __init__(self, queued: bool = True, json_file: str = ""):
+        self.queued = queued
+        self.json_file = json_file
+        self.lock = threading.Lock()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        # 同一秒内的记录复用格式化好的时间戳
+        self._stamp_second = -1
+        self._stamp = ""
+
+    def emit(self, record: LogRecord):
+        """提交一条记录；非队列模式下直接同步写出"""
+        if not self.queued:
+            with self.lock:
+                self._write_batch([record])
+            return
+        if self._writer is None:
+            self._start_writer()
+        self._queue.put(record)
+
+    def flush(self, timeout: float = 5.0):
+        """等待写线程把已入队的记录全部写出"""
+        writer = self._writer
+        if writer is None or not writer.is_alive() or writer is threading.current_thread():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _start_writer(self):
+        with self.lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        """写线程：阻塞取一条后把队列中已有的记录一并取出，合并成一次写入和一次 flush"""
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.BATCH_MAX:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            waiters = [item for item in batch if isinstance(item, threading.Event)]
+            try:
+                self._write_batch([item for item in batch if not isinstance(item, threading.Event)])
+            except Exception:
+                pass
+            for waiter in waiters:
+                waiter.set()
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._stamp_second:
+            self._stamp_second = second
+            self._stamp = datetime.fromtimestamp(created).strftime("%H:%M:%S")
+        return self._stamp
+
+    def _write_batch(self, records: List[LogRecord]):
+        if not records:
+            return
+        lines: List[str] = []
+        json_lines: List[str] = []
+        for created, level, icon, title, msg, account_index in records:
+            if level is None:
+                lines.append(msg)
+                continue
+            account_prefix = f"[账号{account_index}]" if account_index is not None else "[系统]"
+            lines.append(f"{self._timestamp(created)} {account_prefix} {icon} {title}: {msg or ''}")
+            if self.json_file:
+                json_lines.append(json.dumps({
+                    "ts": round(created, 3),
+                    "level": self.LEVEL_NAMES.get(level, str(level)),
+                    "account": account_index,
+                    "title": title,
+                    "msg": msg or "",
+                }, ensure_ascii=False))
+
+        stream = sys.stdout
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+        if json_lines:
+            try:
+                with open(self.json_file, "a", encoding="utf-8") as f:
+                    f.write("\n".join(json_lines) + "\n")
+            except OSError:
+                pass
+
 class EnhancedLogger:
-    """增强的日志记录器 - 多线程安全版本"""
+    """增强的日志记录器 - 级别过滤在格式化之前完成，输出交给 LogSink"""
     
-    def __init__(self, min_level: int = LogLevel.INFO):
+    def __init__(self, min_level: int = LogLevel.INFO, sink: Optional[LogSink] = None):
         self.min_level = min_level
         self.formatter = LogFormatter()
-        self.lock = threading.Lock()  # 添加线程锁
-    
-    def _get_timestamp(self) -> str:
-        """获取时间戳"""
-        return datetime.now().strftime("%H:%M:%S")
+        self.sink = sink or LogSink()
     
-    def _format_account_prefix(self, account_index: Optional[int]) -> str:
-        """格式化账号前缀"""
-        if account_index is not None:
-            return f"[账号{account_index}]"
-        return "[系统]"
+    def enabled(self, level: int) -> bool:
+        """该级别是否会输出；调用方可据此跳过昂贵的消息构造"""
+        return level >= self.min_level
     
-    def _log(self, level: int, icon: str, title: str, msg: str, account_index: Optional[int] = None):
-        """内部日志方法 - 线程安全"""
+    def _log(self, level: int, icon: str, title: str, msg: Any, account_index: Optional[int] = None):
+        """内部日志方法 - 只入队，不在调用线程格式化或写 stdout"""
         if level < self.min_level:
             return
-            
-        with self.lock:  # 确保线程安全
-            timestamp = self._get_timestamp()
-            account_prefix = self._format_account_prefix(account_index)
-            log_message = f"{timestamp} {account_prefix} {icon} {title}: {msg or ''}"
-            print(log_message, flush=True)
+        if callable(msg):
+            msg = msg()
+        self.sink.emit((time.time(), level, icon, title, msg, account_index))
+    
+    def write(self, text: str = ""):
+        """原样输出一段文本（分隔线、汇总等），与日志保持先后顺序"""
+        self.sink.emit((time.time(), None, "", "", text, None))
+    
+    def flush(self):
+        """等待已提交的日志全部写出"""
+        self.sink.flush()
     
     # ==================== 基础日志方法 ====================
+    def debug(self, title: str, msg: Any, account_index: Optional[int] = None):
+        """调试日志；msg 可传入无参函数，仅在 DEBUG 级别开启时才会调用构造"""
+        self._log(LogLevel.DEBUG, LogIcons.INFO, title, msg, account_index)
+    
     def info(self, title: str, msg: str, account_index: Optional[int] = None):
         """信息日志"""
         self._log(LogLevel.INFO, LogIcons.INFO, title, msg, account_index)
@@ -403,10 +597,16 @@ class EnhancedLogger:
 
 
 # 创建全局日志实例
-logger = EnhancedLogger()
+logger = EnhancedLogger(
+    min_level=LogLevel.parse(config.LOG_LEVEL),
+    sink=LogSink(queued=config.LOG_QUEUED, json_file=config.LOG_JSON_FILE),
+)
 
 def print_log(title: str, msg: str, account_index: Optional[int] = None):
     """保持向后兼容的日志函数"""
+    # 分类结果最高为 ERROR 级别，日志全部关闭时直接返回，省去关键字匹配
+    if not logger.enabled(LogLevel.ERROR):
+        return
     # 自动识别日志类型并使用对应的图标
     title_lower = title.lower()
     msg_text = msg if isinstance(msg, str) else (str(msg) if msg is not None else "")
@@ -433,48 +633,154 @@ def print_log(title: str, msg: str, account_index: Optional[int] = None):
         logger.info(title, msg, account_index)
 
 # ==================== 异常处理装饰器 ====================
-def retry_on_failure(max_retries: int = config.MAX_RETRIES, delay: int = config.RETRY_DELAY):
-    """重试装饰器"""
+class NonRetryableError(Exception):
+    """明确不应重试的错误（如令牌失效、请求参数错误）"""
+
+class RetryPolicy:
+    """统一重试策略：错误分类 + 带抖动的指数退避"""
+
+    # 程序错误或请求本身有误，重试不会改变结果
+    NON_RETRYABLE_ERRORS = (
+        "NonRetryableError", "TypeError", "KeyError", "AttributeError", "NameError",
+        "InvalidURL", "MissingSchema", "InvalidSchema", "InvalidHeader", "TooManyRedirects",
+    )
+    RETRYABLE_STATUS = (408, 425, 429)
+
+    @classmethod
+    def is_retryable(cls, error: BaseException) -> bool:
+        names = {klass.__name__ for klass in type(error).__mro__}
+        return not names.intersection(cls.NON_RETRYABLE_ERRORS)
+
+    @classmethod
+    def is_retryable_status(cls, status_code: int) -> bool:
+        return status_code in cls.RETRYABLE_STATUS or status_code >= 500
+
+    @staticmethod
+    def backoff(attempt: int, base: float = config.RETRY_DELAY, cap: float = config.RETRY_BACKOFF_MAX) -> float:
+        """第 attempt 次重试（从 1 开始）前的等待秒数：base*2^(n-1)，不超过 cap，再乘以 [0.5, 1) 抖动"""
+        return min(cap, base * (2 ** max(0, attempt - 1))) * random.uniform(0.5, 1.0)
+
+class RetryBudget:
+    """单个账号的重试预算 - 请求层与业务层的重试共同消耗，用尽后所有层级立即失败"""
+
+    def __init__(self, total: int = config.RETRY_BUDGET):
+        self.total = max(0, int(total))
+        self.remaining = self.total
+        self.exhausted_logged = False
+        self.lock = threading.Lock()
+
+    def try_consume(self) -> bool:
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+def owner_retry_budget(owner: Any) -> Optional[RetryBudget]:
+    """方法型重试的预算来源：所属实例（RequestManager / RewardsService）的 retry_budget"""
+    return owner.retry_budget
+
+_retry_local = threading.local()  # 外层以分步方式重试时，内层重试不再各自 sleep
+
+def retry_on_failure(max_retries: int = config.MAX_RETRIES, delay: int = config.RETRY_DELAY,
+                     on_retry: Optional[Callable[[tuple, dict, Exception, float], None]] = None,
+                     budget: Optional[Callable[[Any], Optional[RetryBudget]]] = None):
+    """重试装饰器：按 RetryPolicy 分类与退避，每次重试消耗重试预算。
+    预算显式传入：调用时的 retry_budget= 关键字参数优先，否则由 budget(args[0]) 取得（方法型传 owner_retry_budget）；
+    on_retry 在每次决定重试前以 (args, kwargs, 异常, 等待秒数) 调用。
+    被装饰函数另有 .paced(...) 分步版本（见 retry_paced）：退避以等待秒数产出，期间内层重试直接失败交给外层"""
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
+        # 获取更友好的函数名显示
+        func_name = func.__name__
+        if func_name == 'make_request':
+            func_name = "网络请求"
+        elif func_name == 'submit_read_activity':
+            func_name = "阅读请求"
+        elif func_name == 'get_rewards_points':
+            func_name = "积分查询"
+
+        def steps(args: tuple, kwargs: dict, retry_budget: Optional[RetryBudget], paced: bool) -> PacedSteps:
             last_exception = None
-            
-            # 获取更友好的函数名显示
-            func_name = func.__name__
-            if func_name == 'make_request':
-                func_name = "网络请求"
-            elif func_name == 'get_access_token':
-                func_name = "令牌获取"
-            elif func_name == 'get_read_progress':
-                func_name = "阅读进度"
-            elif func_name == 'submit_read_activity':
-                func_name = "阅读请求"
-            elif func_name == 'get_rewards_points':
-                func_name = "积分查询"
-            
-            for attempt in range(max_retries):
+            run_budget = retry_budget
+            if run_budget is None and budget is not None and args:
+                run_budget = budget(args[0])
+            # 已处在外层分步重试中：只尝试一次，避免在线程内 sleep 且重试次数相乘
+            attempts = 1 if not paced and getattr(_retry_local, "deferring", False) else max_retries
+            for attempt in range(attempts):
+                outer_deferring = getattr(_retry_local, "deferring", False)
+                if paced:
+                    _retry_local.deferring = True
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
                     last_exception = e
-                    if attempt < max_retries - 1:
-                        account_index = kwargs.get('account_index')
-                        if account_index is not None:
-                            print_log(f"{func_name}重试", f"第{attempt + 1}次尝试失败，{delay}秒后重试...", account_index)
-                        else:
-                            print_log(f"{func_name}重试", f"第{attempt + 1}次尝试失败，{delay}秒后重试...")
-                        time.sleep(delay)
+                    if not RetryPolicy.is_retryable(e):
+                        raise
+                    account_index = kwargs.get('account_index')
+                    if attempt >= attempts - 1:
+                        if attempts > 1:
+                            if account_index is not None:
+                                print_log(f"{func_name}失败", f"重试{max_retries}次后仍失败: {e}", account_index)
+                            else:
+                                print_log(f"{func_name}失败", f"重试{max_retries}次后仍失败: {e}")
+                        break
+                    if run_budget is not None and not run_budget.try_consume():
+                        if not run_budget.exhausted_logged:
+                            run_budget.exhausted_logged = True
+                            print_log(f"{func_name}失败", f"重试预算({run_budget.total}次)已用尽，不再重试: {e}", account_index)
+                        raise
+                    wait = RetryPolicy.backoff(attempt + 1, delay)
+                    if account_index is not None:
+                        print_log(f"{func_name}重试", f"第{attempt + 1}次尝试失败，{wait:.1f}秒后重试...", account_index)
                     else:
-                        account_index = kwargs.get('account_index')
-                        if account_index is not None:
-                            print_log(f"{func_name}失败", f"重试{max_retries}次后仍失败: {e}", account_index)
-                        else:
-                            print_log(f"{func_name}失败", f"重试{max_retries}次后仍失败: {e}")
+                        print_log(f"{func_name}重试", f"第{attempt + 1}次尝试失败，{wait:.1f}秒后重试...")
+                    if on_retry is not None:
+                        on_retry(args, kwargs, e, wait)
+                finally:
+                    # 等待期间线程会去执行其它任务，标记必须在产出前恢复
+                    _retry_local.deferring = outer_deferring
+                yield wait
             raise last_exception
+
+        @wraps(func)
+        def wrapper(*args, retry_budget: Optional[RetryBudget] = None, **kwargs):
+            return run_paced(steps(args, kwargs, retry_budget, paced=False))
+
+        def paced(*args, retry_budget: Optional[RetryBudget] = None, **kwargs) -> PacedSteps:
+            return steps(args, kwargs, retry_budget, paced=True)
+
+        wrapper.paced = paced
         return wrapper
     return decorator
 
+def retry_paced(method: Callable, *args, **kwargs) -> PacedSteps:
+    """以分步方式调用 retry_on_failure 装饰的函数或方法：重试退避以等待秒数产出，不占用线程 sleep"""
+    func = getattr(method, "__func__", method)
+    owner = getattr(method, "__self__", None)
+    if owner is not None:
+        args = (owner,) + args
+    return func.paced(*args, **kwargs)
+
+# ==================== 延迟初始化 ====================
+class LazyInstance:
+    """延迟创建的全局实例 - 首次使用时才构造，导入模块不产生副作用"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        """获取（必要时创建）实例"""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
 # ==================== 通知系统 ====================
 
 class NotificationTemplates:
@@ -610,6 +916,7 @@ class NotificationManager:
         """创建模拟通知客户端"""
         class MockNotify:
             def send(self, title, content):
+                logger.flush()
                 print("\n--- [通知] ---")
                 print(f"标题: {title}")
                 print(f"内容:\n{content}")
@@ -656,68 +963,228 @@ class NotificationManager:
         title, content = NotificationTemplates.task_summary(summaries)
         self.send(title, content)
 
-global_notification_manager = NotificationManager()  # 全局通知管理器，用于账号验证阶段
+global_notification_manager = LazyInstance(NotificationManager)  # 全局通知管理器，用于账号验证阶段
 
 # ==================== 缓存管理 ====================
+class CacheStore:
+    """缓存存储 - SQLite(WAL) 键值表，按键增量写入，进程内所有缓存管理器共用一把锁"""
+
+    TOKEN_PREFIX = "token:"  # 令牌按账号拆分为独立键: token:<账号别名>
+    OFFER_STATE_PREFIX = "offers:"  # 额外活动当日状态: offers:<账号邮箱或别名>（值内带日期，按账号覆盖写入）
+    EDGE_CHECKIN_PREFIX = "edge:"   # Edge 浏览打卡当日进度: edge:<账号邮箱或别名>（值内带日期）
+    LEGACY_KEYS = ('push', 'push_date', 'tasks_complete', 'tasks_complete_date')
+    LEGACY_PREFIXES = ('push_', 'tasks_complete_')
+
+    lock = threading.RLock()  # 进程级缓存锁
+    _instances: Dict[str, "CacheStore"] = {}
+
+    def __init__(self, json_file: str):
+        self.json_file = json_file
+        self.db_file = os.path.splitext(json_file)[0] + ".db"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._in_transaction = False
+        self.cleaned_date = ""  # 已执行过期数据清理的日期，每个进程每天只清理一次
+
+    @classmethod
+    def shared(cls, json_file: str = config.CACHE_FILE) -> "CacheStore":
+        """获取缓存文件对应的进程内共享实例"""
+        with cls.lock:
+            store = cls._instances.get(json_file)
+            if store is None:
+                store = cls._instances[json_file] = cls(json_file)
+            return store
+
+    @classmethod
+    def token_key(cls, account_alias: str) -> str:
+        """账号令牌对应的键"""
+        return f"{cls.TOKEN_PREFIX}{account_alias}"
+
+    def _connect(self) -> sqlite3.Connection:
+        """懒加载数据库连接，首次连接时迁移旧版 JSON 缓存文件"""
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_file)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn = conn
+            self._migrate_json_file()
+        return self._conn
+
+    def _migrate_json_file(self):
+        """将旧版 bing_cache.json 导入数据库，导入后重命名为 .migrated"""
+        if not os.path.exists(self.json_file):
+            return
+        if self._conn.execute("SELECT 1 FROM kv LIMIT 1").fetchone():
+            return
+
+        try:
+            with open(self.json_file, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            data = json.loads(content) if content else {}
+        except json.JSONDecodeError as e:
+            print_log("缓存错误", f"JSON格式错误: {e}，跳过迁移")
+            self._backup_json_file()
+            return
+        except Exception as e:
+            print_log("缓存错误", f"读取失败: {e}")
+            return
+
+        items: Dict[str, Any] = {}
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if key == 'tokens' and isinstance(value, dict):
+                    for alias, entry in value.items():
+                        items[self.token_key(alias)] = entry
+                else:
+                    items[key] = value
+        self._write(items)
+
+        try:
+            os.replace(self.json_file, self.json_file + ".migrated")
+        except OSError:
+            pass
+        print_log("缓存迁移", f"已将 {self.json_file} 迁移至 {self.db_file}（{len(items)} 项）")
+
+    def _backup_json_file(self):
+        """备份损坏的旧版 JSON 缓存文件"""
+        try:
+            backup_file = self.json_file + f".backup_{int(time.time())}"
+            os.replace(self.json_file, backup_file)
+            print_log("令牌缓存", f"已备份损坏文件到: {backup_file}")
+        except Exception as e:
+            print_log("令牌缓存", f"备份损坏文件失败: {e}")
+
+    def _write(self, items: Dict[str, Any]):
+        """在单个事务内批量写入（已处于 transaction() 中时并入该事务）"""
+        if not items:
+            return
+        conn = self._conn
+        rows = [(key, json.dumps(value, ensure_ascii=False)) for key, value in items.items()]
+        sql = "INSERT INTO kv (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+        if self._in_transaction:
+            conn.executemany(sql, rows)
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(sql, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def transaction(self):
+        """持锁并在单个事务内执行多次读写；已在事务中时直接并入"""
+        with self.lock:
+            conn = self._connect()
+            if self._in_transaction:
+                yield
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            self._in_transaction = True
+            try:
+                yield
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._in_transaction = False
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取单个键"""
+        with self.lock:
+            row = self._connect().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        try:
+            return json.loads(row[0])
+        except (TypeError, ValueError):
+            return default
+
+    def set(self, key: str, value: Any):
+        """写入单个键"""
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, Any]):
+        """批量写入多个键"""
+        with self.lock:
+            self._connect()
+            self._write(items)
+
+    def delete(self, *keys: str):
+        """删除指定键"""
+        if not keys:
+            return
+        with self.lock:
+            self._connect().executemany("DELETE FROM kv WHERE key = ?", [(key,) for key in keys])
+
+    def delete_prefix(self, prefix: str):
+        """删除指定前缀的全部键"""
+        with self.lock:
+            self._connect().execute("DELETE FROM kv WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def load_all(self) -> Dict[str, Any]:
+        """读取全部缓存，令牌键重新组装为 tokens 字典（兼容旧版结构）"""
+        with self.lock:
+            rows = self._connect().execute("SELECT key, value FROM kv").fetchall()
+        data: Dict[str, Any] = {}
+        tokens: Dict[str, Any] = {}
+        for key, raw in rows:
+            try:
+                value = json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            if key.startswith(self.TOKEN_PREFIX):
+                tokens[key[len(self.TOKEN_PREFIX):]] = value
+            else:
+                data[key] = value
+        if tokens:
+            data['tokens'] = tokens
+        return data
+
+
 class CacheManager:
     """缓存管理器"""
     
     def __init__(self, cache_file: str = config.CACHE_FILE):
         self.cache_file = cache_file
-        self.lock = threading.Lock()
+        self.store = CacheStore.shared(cache_file)
+        self.lock = CacheStore.lock  # 与令牌缓存共用进程级锁
     
     def load_cache(self) -> Dict[str, Any]:
-        """加载缓存数据（返回统一缓存文件的全部数据）"""
-        return self._load_unified_cache()
+        """加载缓存数据（返回统一缓存的全部数据）"""
+        return self.store.load_all()
 
     def save_cache(self, data: Dict[str, Any]):
-        """保存缓存数据到统一缓存文件"""
+        """按键写入缓存数据"""
         try:
             with self.lock:
-                # 读取现有的统一缓存数据
-                all_cache_data = self._load_unified_cache()
-                
-                # 清理整个缓存文件中的过期推送记录
-                today = date.today().isoformat()
-                all_cache_data = self._clean_expired_data(all_cache_data, today)
-                
-                # 更新传入的数据
-                for key, value in data.items():
-                    all_cache_data[key] = value
-                
-                # 保存到统一缓存文件
-                self._save_unified_cache(all_cache_data)
-                
+                # 清理过期推送记录
+                self._clean_expired_data(date.today().isoformat())
+                self.store.set_many(data)
         except Exception as e:
             print_log("缓存错误", f"保存缓存失败: {e}")
     
-    def _load_unified_cache(self) -> Dict[str, Any]:
-        """加载统一缓存文件"""
-        return global_token_cache_manager._load_all_cache_data()
-    
-    def _save_unified_cache(self, data: Dict[str, Any]):
-        """保存到统一缓存文件"""
-        global_token_cache_manager._save_all_cache_data(data)
-    
-    def _clean_expired_data(self, data: Dict[str, Any], today: str) -> Dict[str, Any]:
-        """清理非当天的旧缓存键，并统一为固定按天字段。"""
-        cleaned: Dict[str, Any] = {}
-        for k, v in data.items():
-            # 移除历史动态日期键
-            if k.startswith('push_') or k.startswith('tasks_complete_'):
-                continue
-            # 移除历史冗余兼容字段
-            if k in ('push', 'push_date', 'tasks_complete', 'tasks_complete_date'):
-                continue
-            cleaned[k] = v
-
-        # 仅保留当天固定字段
-        if cleaned.get('daily_date') != today:
-            cleaned.pop('daily_push', None)
-            cleaned.pop('daily_tasks_complete', None)
-            cleaned['daily_date'] = today
+    def _clean_expired_data(self, today: str):
+        """清理非当天的旧缓存键，并统一为固定按天字段；每个进程每天只在首次写入前执行一次，整体一个事务。"""
+        if self.store.cleaned_date == today:
+            return
+        with self.store.transaction():
+            # 移除历史动态日期键和冗余兼容字段
+            for prefix in CacheStore.LEGACY_PREFIXES:
+                self.store.delete_prefix(prefix)
+            self.store.delete(*CacheStore.LEGACY_KEYS)
+
+            # 仅保留当天固定字段
+            if self.store.get('daily_date') != today:
+                self.store.delete('daily_push', 'daily_tasks_complete')
+                self.store.set('daily_date', today)
+        self.store.cleaned_date = today
 
-        return cleaned
     @staticmethod
     def _to_non_negative_int(value: Any, default: int = 0) -> int:
         """将值安全转换为非负整数"""
@@ -727,56 +1194,86 @@ class CacheManager:
         except (TypeError, ValueError):
             return default
     
-    def _get_legacy_tasks_complete_count(self, data: Dict[str, Any], today: str) -> int:
+    def _get_legacy_tasks_complete_count(self, today: str) -> int:
         """读取旧版 tasks_complete 字段（仅当天有效）"""
-        if data.get("tasks_complete_date") != today:
+        if self.store.get("tasks_complete_date") != today:
             return 0
-        return self._to_non_negative_int(data.get("tasks_complete", 0), 0)
+        return self._to_non_negative_int(self.store.get("tasks_complete", 0), 0)
     
     def has_pushed_today(self) -> bool:
         """是否今日已推送。"""
         today = date.today().isoformat()
-        data = self.load_cache()
 
         # 固定字段优先
-        if data.get("daily_date") == today:
-            return bool(data.get("daily_push", False))
+        if self.store.get("daily_date") == today:
+            return bool(self.store.get("daily_push", False))
 
         # 兼容旧字段（仅迁移读取）
-        if data.get(f"push_{today}", False):
+        if self.store.get(f"push_{today}", False):
             return True
-        return bool(data.get("push", False) and data.get("push_date") == today)
+        return bool(self.store.get("push", False) and self.store.get("push_date") == today)
     def mark_pushed_today(self):
         """标记今日已推送。"""
         today = date.today().isoformat()
         with self.lock:
-            all_cache_data = self._load_unified_cache()
-            all_cache_data = self._clean_expired_data(all_cache_data, today)
-            all_cache_data["daily_date"] = today
-            all_cache_data["daily_push"] = True
-            self._save_unified_cache(all_cache_data)
+            self._clean_expired_data(today)
+            self.store.set("daily_push", True)
+    def get_offer_state(self, state_key: str, account_index: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """读取账号当天的额外活动状态，非当天返回 None"""
+        try:
+            state = self.store.get(f"{CacheStore.OFFER_STATE_PREFIX}{state_key}")
+        except Exception as e:
+            print_log("缓存错误", f"读取额外活动状态失败: {e}", account_index)
+            return None
+        if isinstance(state, dict) and state.get("date") == date.today().isoformat():
+            return state
+        return None
+
+    def save_offer_state(self, state_key: str, state: Dict[str, Any], account_index: Optional[int] = None):
+        """保存账号当天的额外活动状态"""
+        try:
+            self.store.set(f"{CacheStore.OFFER_STATE_PREFIX}{state_key}", dict(state, date=date.today().isoformat()))
+        except Exception as e:
+            print_log("缓存错误", f"保存额外活动状态失败: {e}", account_index)
+
+    def get_edge_checkin_state(self, state_key: str, account_index: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """读取账号当天的 Edge 浏览打卡进度，非当天返回 None"""
+        try:
+            state = self.store.get(f"{CacheStore.EDGE_CHECKIN_PREFIX}{state_key}")
+        except Exception as e:
+            print_log("缓存错误", f"读取Edge打卡进度失败: {e}", account_index)
+            return None
+        if isinstance(state, dict) and state.get("date") == date.today().isoformat():
+            return state
+        return None
+
+    def save_edge_checkin_state(self, state_key: str, state: Dict[str, Any], account_index: Optional[int] = None):
+        """保存账号当天的 Edge 浏览打卡进度"""
+        try:
+            self.store.set(f"{CacheStore.EDGE_CHECKIN_PREFIX}{state_key}", dict(state, date=date.today().isoformat()))
+        except Exception as e:
+            print_log("缓存错误", f"保存Edge打卡进度失败: {e}", account_index)
+
     def get_tasks_complete_count(self) -> int:
         """获取今日任务完成次数。"""
         today = date.today().isoformat()
-        data = self.load_cache()
 
         # 固定字段优先
-        if data.get("daily_date") == today:
-            return self._to_non_negative_int(data.get("daily_tasks_complete", 0), 0)
+        if self.store.get("daily_date") == today:
+            return self._to_non_negative_int(self.store.get("daily_tasks_complete", 0), 0)
 
         # 兼容旧字段（仅迁移读取）
-        today_count = data.get(f"tasks_complete_{today}")
+        today_count = self.store.get(f"tasks_complete_{today}")
         if today_count is not None:
             return self._to_non_negative_int(today_count, 0)
 
-        return self._get_legacy_tasks_complete_count(data, today)
+        return self._get_legacy_tasks_complete_count(today)
     def increment_tasks_complete_count(self):
         """Increase today's completed-task counter."""
         today = date.today().isoformat()
         with self.lock:
-            all_cache_data = self._load_unified_cache()
-            all_cache_data = self._clean_expired_data(all_cache_data, today)
-            current_count = self._to_non_negative_int(all_cache_data.get("daily_tasks_complete", 0), 0)
+            self._clean_expired_data(today)
+            current_count = self._to_non_negative_int(self.store.get("daily_tasks_complete", 0), 0)
 
             new_count = current_count + 1
 
@@ -784,9 +1281,7 @@ class CacheManager:
                 print_log("TASK_COUNT", f"Reached max {TASK_CONFIG['MAX_REPEAT_COUNT']}, skip increment", None)
                 return
 
-            all_cache_data["daily_date"] = today
-            all_cache_data["daily_tasks_complete"] = new_count
-            self._save_unified_cache(all_cache_data)
+            self.store.set("daily_tasks_complete", new_count)
 
         print_log("RUN_COUNT", f"{new_count}/{TASK_CONFIG['MAX_REPEAT_COUNT']}", None)
 
@@ -798,7 +1293,7 @@ class CacheManager:
     
 
 
-global_cache_manager = CacheManager()  # 全局缓存管理器，用于推送状态检查
+global_cache_manager = LazyInstance(CacheManager)  # 全局缓存管理器，用于推送状态检查
 
 # ==================== Refresh Token 缓存管理 ====================
 class TokenCacheManager:
@@ -806,62 +1301,26 @@ class TokenCacheManager:
     
     def __init__(self, token_file: str = config.CACHE_FILE):
         self.token_file = token_file
-        self.lock = threading.Lock()
+        self.store = CacheStore.shared(token_file)
+        self.lock = CacheStore.lock  # 与推送状态缓存共用进程级锁
         self._cached_tokens = {}  # 内存缓存，避免重复保存
+        self._access_tokens: Dict[str, Dict[str, Any]] = {}  # 访问令牌内存缓存: alias -> {token, expires_at, refresh_hashes}
+
+    @staticmethod
+    def refresh_hash(refresh_token: str) -> str:
+        """刷新令牌的短摘要，用于把访问令牌绑定到换取它的刷新令牌"""
+        return hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()[:16] if refresh_token else ""
     
     def _load_all_cache_data(self) -> Dict[str, Any]:
-        """加载统一缓存文件的所有数据"""
-        if not os.path.exists(self.token_file):
-            return {}
-        
+        """加载统一缓存的所有数据"""
         try:
-            with open(self.token_file, "r", encoding="utf-8") as f:
-                content = f.read().strip()
-                if not content:  # 如果文件为空，返回空字典
-                    return {}
-                return json.loads(content)
-        except json.JSONDecodeError as e:
-            print_log("缓存错误", f"JSON格式错误: {e}，尝试修复文件")
-            # 尝试修复损坏的JSON文件
-            self._repair_json_file()
-            return {}
+            return self.store.load_all()
         except Exception as e:
             print_log("缓存错误", f"读取失败: {e}")
             return {}
     
-    def _save_all_cache_data(self, data: Dict[str, Any]):
-        """保存数据到统一缓存文件"""
-        try:
-            # 使用线程安全的临时文件名（添加线程ID和随机数）
-            thread_id = threading.get_ident()
-            random_suffix = random.randint(1000, 9999)
-            temp_file = f"{self.token_file}.tmp.{thread_id}.{random_suffix}"
-            
-            try:
-                # 原子性保存到文件（先写临时文件，再重命名）
-                with open(temp_file, "w", encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                
-                # 原子性重命名
-                import shutil
-                shutil.move(temp_file, self.token_file)
-                
-            except Exception as file_error:
-                # 清理临时文件
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except:
-                    pass
-                raise file_error
-                
-        except Exception as e:
-            print_log("缓存错误", f"保存失败: {e}")
-    
-
-    
     def save_token(self, account_alias: str, refresh_token: str, account_index: Optional[int] = None):
-        """保存刷新令牌到统一缓存文件"""
+        """保存刷新令牌到统一缓存"""
         try:
             # 检查是否已经缓存过相同的令牌
             cache_key = f"{account_alias}_{refresh_token}"
@@ -869,31 +1328,19 @@ class TokenCacheManager:
                 return  # 已经缓存过，跳过
             
             with self.lock:
-                # 确保目录存在
-                os.makedirs(os.path.dirname(self.token_file) if os.path.dirname(self.token_file) else '.', exist_ok=True)
-                
-                # 读取现有缓存数据（包含推送状态等）
-                all_cache_data = self._load_all_cache_data()
-                
-                # 获取或初始化tokens部分
-                if 'tokens' not in all_cache_data:
-                    all_cache_data['tokens'] = {}
+                token_key = CacheStore.token_key(account_alias)
+                account_data = self.store.get(token_key) or {}
                 
                 # 检查是否与现有令牌相同
-                existing_token = all_cache_data['tokens'].get(account_alias, {}).get("refreshToken")
-                if existing_token == refresh_token:
+                if account_data.get("refreshToken") == refresh_token:
                     # 标记为已缓存，避免重复尝试
                     self._cached_tokens[cache_key] = True
                     return  # 令牌没有变化，跳过
                 
-                # 更新令牌
-                all_cache_data['tokens'][account_alias] = {
-                    "refreshToken": refresh_token,
-                    "updatedAt": datetime.now().isoformat()
-                }
-                
-                # 保存到统一缓存文件
-                self._save_all_cache_data(all_cache_data)
+                # 仅更新该账号的令牌键
+                account_data["refreshToken"] = refresh_token
+                account_data["updatedAt"] = datetime.now().isoformat()
+                self.store.set(token_key, account_data)
                 
                 # 标记为已缓存
                 self._cached_tokens[cache_key] = True
@@ -906,105 +1353,396 @@ class TokenCacheManager:
     def get_cached_token(self, account_alias: str, account_index: Optional[int] = None) -> Optional[str]:
         """获取缓存的刷新令牌"""
         try:
-            all_cache_data = self._load_all_cache_data()
-            tokens = all_cache_data.get('tokens', {})
-            account_data = tokens.get(account_alias)
+            account_data = self.store.get(CacheStore.token_key(account_alias))
             if account_data and account_data.get("refreshToken"):
                 return account_data["refreshToken"]
             return None
         except Exception as e:
             print_log("令牌缓存", f"读取失败: {e}", account_index)
             return None
-    
-    def _repair_json_file(self):
-        """尝试修复损坏的JSON文件"""
+
+    def get_cached_access_token(self, account_alias: str, refresh_token: str = "") -> Optional[str]:
+        """获取未临近过期、且由该刷新令牌换取的访问令牌，不可用时返回 None"""
+        if not account_alias:
+            return None
+
+        entry = self._access_tokens.get(account_alias)
+        if entry is None and config.ACCESS_TOKEN_DISK_CACHE:
+            try:
+                account_data = self.store.get(CacheStore.token_key(account_alias)) or {}
+                if account_data.get("accessToken"):
+                    entry = {
+                        "token": account_data["accessToken"],
+                        "expires_at": float(account_data.get("accessTokenExpiresAt", 0) or 0),
+                        "refresh_hashes": list(account_data.get("accessTokenRefreshHashes") or []),
+                    }
+                    self._access_tokens[account_alias] = entry
+            except Exception:
+                entry = None
+
+        if not entry:
+            return None
+        if self.refresh_hash(refresh_token) not in entry.get("refresh_hashes", []):
+            # 环境变量或缓存中的刷新令牌已更换，旧访问令牌可能属于其它账号
+            return None
+        if entry["expires_at"] - time.time() <= config.ACCESS_TOKEN_REFRESH_MARGIN:
+            return None
+        return entry["token"]
+
+    def save_access_token(self, account_alias: str, access_token: str, expires_in: Any,
+                          account_index: Optional[int] = None, refresh_tokens: Tuple[str, ...] = ("",)):
+        """缓存访问令牌及其过期时间，refresh_tokens 为可复用该访问令牌的刷新令牌（轮换前后各一个）"""
+        if not account_alias or not access_token:
+            return
         try:
-            # 备份损坏的文件
-            backup_file = self.token_file + f".backup_{int(time.time())}"
-            if os.path.exists(self.token_file):
-                import shutil
-                shutil.copy2(self.token_file, backup_file)
-                print_log("令牌缓存", f"已备份损坏文件到: {backup_file}")
-            
-            # 创建新的空文件
-            with open(self.token_file, "w", encoding="utf-8") as f:
-                json.dump({}, f, ensure_ascii=False, indent=2)
-            
-            print_log("令牌缓存", "已重新创建令牌缓存文件")
+            expires_in = int(expires_in)
+        except (TypeError, ValueError):
+            expires_in = 3600
+        expires_at = time.time() + max(0, expires_in)
+        refresh_hashes = sorted({self.refresh_hash(token) for token in refresh_tokens})
+        self._access_tokens[account_alias] = {
+            "token": access_token, "expires_at": expires_at, "refresh_hashes": refresh_hashes
+        }
+
+        if not config.ACCESS_TOKEN_DISK_CACHE:
+            return
+        try:
+            with self.lock:
+                token_key = CacheStore.token_key(account_alias)
+                account_data = self.store.get(token_key) or {}
+                account_data["accessToken"] = access_token
+                account_data["accessTokenExpiresAt"] = int(expires_at)
+                account_data["accessTokenRefreshHashes"] = refresh_hashes
+                self.store.set(token_key, account_data)
         except Exception as e:
-            print_log("令牌缓存", f"修复文件失败: {e}")
+            print_log("令牌缓存", f"访问令牌保存失败: {e}", account_index)
 
-global_token_cache_manager = TokenCacheManager()  # 全局令牌缓存管理器，用于账号验证阶段
+    def invalidate_access_token(self, account_alias: str = "", access_token: str = ""):
+        """丢弃缓存的访问令牌（令牌被拒绝或刷新令牌轮换时调用），可按别名或令牌值指定"""
+        aliases = [account_alias] if account_alias else [
+            alias for alias, entry in self._access_tokens.items() if entry.get("token") == access_token
+        ]
+        for alias in aliases:
+            self._access_tokens.pop(alias, None)
+        if not config.ACCESS_TOKEN_DISK_CACHE:
+            return
+        try:
+            with self.lock:
+                for alias in aliases:
+                    token_key = CacheStore.token_key(alias)
+                    account_data = self.store.get(token_key)
+                    if account_data and "accessToken" in account_data:
+                        for field in ("accessToken", "accessTokenExpiresAt", "accessTokenRefreshHashes"):
+                            account_data.pop(field, None)
+                        self.store.set(token_key, account_data)
+        except Exception as e:
+            print_log("令牌缓存", f"访问令牌清除失败: {e}")
 
-# ==================== 提前检查重复运行次数 ====================
-# 在热搜词管理器初始化之前检查是否应该跳过执行
-try:
-    current_complete_count = global_cache_manager.get_tasks_complete_count()
-    
-    # 强制检查计数是否超过设定次数
-    if current_complete_count >= TASK_CONFIG['MAX_REPEAT_COUNT']:
-        print_log("脚本跳过", f"已重复运行{current_complete_count}次，跳过执行")
-        exit(0)
-    elif current_complete_count > 0:
-        print_log("系统提示", f"已重复运行{current_complete_count}/{TASK_CONFIG['MAX_REPEAT_COUNT']}次", None)
-except Exception as e:
-    # 如果检查失败，继续执行
-    print_log("检查警告", f"检查重复运行次数失败: {e}", None)
+global_token_cache_manager = LazyInstance(TokenCacheManager)  # 全局令牌缓存管理器，用于账号验证阶段
 
 # ==================== 热搜词管理 ====================
 class HotWordsManager:
-    """热搜词管理器"""
+    """热搜词管理器 - 并发竞速获取热搜源，按天缓存到磁盘"""
+
+    CACHE_KEY = "hot_words"
     
     def __init__(self):
-        self.hot_words = self._fetch_hot_words()
+        self.lock = threading.Lock()
+        self._refreshing = False
+        cached = CacheStore.shared().get(self.CACHE_KEY) or {}
+        if cached.get("date") == date.today().isoformat() and cached.get("words"):
+            self.hot_words = list(cached["words"])
+            print_log("热搜词", f"使用今日缓存热搜词 {len(self.hot_words)} 条")
+            # 缓存较旧时后台刷新，不阻塞启动
+            if time.time() - float(cached.get("updated_at", 0) or 0) > config.HOT_WORDS_CACHE_TTL:
+                self.refresh_hot_words()
+        else:
+            self.hot_words = self._fetch_hot_words()
+
+    @staticmethod
+    def _fetch_source(api_url: str, timeout: float = 10) -> List[str]:
+        """请求单个热搜源，失败返回空列表"""
+        try:
+            resp = global_transport.session.get(api_url, timeout=timeout)
+            if resp.status_code == 200:
+                data = resp.json()
+                if isinstance(data, dict) and 'data' in data and data['data']:
+                    return [item.get('title') for item in data['data'] if isinstance(item, dict) and item.get('title')]
+        except Exception:
+            pass
+        return []
     
-    @retry_on_failure(max_retries=2, delay=1)
-    def _fetch_hot_words(self, max_count: int = config.HOT_WORDS_MAX_COUNT) -> List[str]:
-        """获取热搜词"""
-        apis_shuffled = config.HOT_WORDS_APIS[:]
-        random.shuffle(apis_shuffled)
-        
-        for base_url, sources in apis_shuffled:
-            sources_shuffled = sources[:]
-            random.shuffle(sources_shuffled)
-            
-            for source in sources_shuffled:
-                api_url = base_url + source
-                try:
-                    resp = requests.get(api_url, timeout=10)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if isinstance(data, dict) and 'data' in data and data['data']:
-                            all_titles = [item.get('title') for item in data['data'] if item.get('title')]
-                            if all_titles:
-                                print_log("热搜词", f"成功获取热搜词 {len(all_titles)} 条，来源: {api_url}")
-                                random.shuffle(all_titles)
-                                return all_titles[:max_count]
-                except Exception:
-                    continue
+    def _fetch_hot_words(self, max_count: int = config.HOT_WORDS_MAX_COUNT, fallback: bool = True) -> List[str]:
+        """获取热搜词：热搜源按主机轮流排队，最多 HOT_WORDS_CONCURRENCY 个同时请求，取最先返回的有效结果；
+        全部失败时 fallback=True 返回打乱的默认搜索词，否则返回空列表"""
+        hosts = []
+        for base_url, sources in config.HOT_WORDS_APIS:
+            urls = [base_url + source for source in sources]
+            random.shuffle(urls)
+            hosts.append(urls)
+        random.shuffle(hosts)
+        # 轮流取各主机的源：同时进行的请求分散在不同主机上，某个主机故障只拖慢它自己的那一路
+        api_urls = [url for group in zip_longest(*hosts) for url in group if url]
+
+        # 单个请求超时不超过总超时；取得结果后排队中的源全部取消，进行中的至多 HOT_WORDS_CONCURRENCY - 1 个
+        per_request_timeout = min(10, config.HOT_WORDS_TIMEOUT)
+        workers = max(1, min(config.HOT_WORDS_CONCURRENCY, len(api_urls)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hotwords")
+        futures = {executor.submit(self._fetch_source, api_url, per_request_timeout): api_url for api_url in api_urls}
+        try:
+            for future in as_completed(futures, timeout=config.HOT_WORDS_TIMEOUT):
+                all_titles = future.result()
+                if all_titles:
+                    print_log("热搜词", f"成功获取热搜词 {len(all_titles)} 条，来源: {futures[future]}")
+                    random.shuffle(all_titles)
+                    words = all_titles[:max_count]
+                    self._save_cache(words)
+                    return words
+        except FuturesTimeoutError:
+            pass
+        finally:
+            # 已取得结果或超时后不再等待其余热搜源
+            executor.shutdown(wait=False, cancel_futures=True)
         
+        if not fallback:
+            return []
         print_log("热搜词", "全部热搜API失效，使用默认搜索词。")
+        return self._default_words(max_count)
+
+    @staticmethod
+    def _default_words(max_count: int = config.HOT_WORDS_MAX_COUNT) -> List[str]:
         default_words = config.DEFAULT_HOT_WORDS[:max_count]
         random.shuffle(default_words)
         return default_words
+
+    def _save_cache(self, words: List[str]):
+        """保存今日热搜词缓存"""
+        try:
+            CacheStore.shared().set(self.CACHE_KEY, {
+                "date": date.today().isoformat(),
+                "updated_at": int(time.time()),
+                "words": words
+            })
+        except Exception as e:
+            print_log("缓存错误", f"热搜词缓存保存失败: {e}")
     
     def get_random_word(self) -> str:
         """获取随机热搜词"""
         return random.choice(self.hot_words) if self.hot_words else random.choice(config.DEFAULT_HOT_WORDS)
 
-    def refresh_hot_words(self):
-        """刷新热搜词池，供长流程搜索中途更换搜索词使用"""
-        self.hot_words = self._fetch_hot_words()
+    def refresh_hot_words(self, background: bool = True):
+        """刷新热搜词池，供长流程搜索中途更换搜索词使用；默认在后台线程刷新，完成后替换词池。
+        全部热搜源失败时保留当前词池，不用默认词覆盖已缓存的热搜词"""
+        if not background:
+            self._replace_hot_words(self._fetch_hot_words(fallback=False))
+            return
+
+        with self.lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _refresh():
+            try:
+                self._replace_hot_words(self._fetch_hot_words(fallback=False))
+            finally:
+                with self.lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_refresh, name="hotwords-refresh", daemon=True).start()
+
+    def _replace_hot_words(self, words: List[str]):
+        """用刷新结果替换词池：刷新失败时保留当前词池，词池为空时才退回默认搜索词"""
+        if words:
+            self.hot_words = words
+        elif self.hot_words:
+            print_log("热搜词", f"热搜源刷新失败，继续使用当前 {len(self.hot_words)} 条热搜词")
+        else:
+            print_log("热搜词", "全部热搜API失效，使用默认搜索词。")
+            self.hot_words = self._default_words()
+
+hot_words_manager = LazyInstance(HotWordsManager)
+
+# ==================== 请求统计 ====================
+class RequestMetrics:
+    """按接口统计请求次数、耗时分布、响应大小、状态码和重试 - 线程安全"""
+
+    LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
 
-hot_words_manager = HotWordsManager()
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def endpoint_key(method: str, url: str) -> str:
+        """接口标识：方法 + 域名 + 路径（忽略查询参数，quest 子路径归并）"""
+        parts = urlsplit(url)
+        path = re.sub(r'^/earn/quest/.+', '/earn/quest/*', parts.path or '/')
+        return f"{method.upper()} {parts.netloc}{path}"
+
+    def _entry(self, key: str) -> Dict[str, Any]:
+        entry = self.endpoints.get(key)
+        if entry is None:
+            entry = self.endpoints[key] = {
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "retry_wait_seconds": 0.0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "bytes": 0,
+                "status": {},
+                "latency_hist": [0] * (len(self.LATENCY_BUCKETS_MS) + 1),
+            }
+        return entry
+
+    def record(self, key: str, elapsed_ms: float, status: Optional[int] = None, size: int = 0):
+        """记录一次请求；status 为 None 表示请求异常"""
+        bucket = next((i for i, bound in enumerate(self.LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+                      len(self.LATENCY_BUCKETS_MS))
+        with self.lock:
+            entry = self._entry(key)
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["bytes"] += size
+            entry["latency_hist"][bucket] += 1
+            if status is None:
+                entry["errors"] += 1
+            else:
+                status_key = str(status)
+                entry["status"][status_key] = entry["status"].get(status_key, 0) + 1
+
+    def record_retry(self, key: str, wait_seconds: float):
+        with self.lock:
+            entry = self._entry(key)
+            entry["retries"] += 1
+            entry["retry_wait_seconds"] += wait_seconds
+
+    def merge(self, other: "RequestMetrics"):
+        """合并另一份统计（用于汇总）"""
+        with other.lock:
+            snapshot = json.loads(json.dumps(other.endpoints))
+        with self.lock:
+            for key, src in snapshot.items():
+                entry = self._entry(key)
+                for field in ("calls", "errors", "retries", "retry_wait_seconds", "total_ms", "bytes"):
+                    entry[field] += src[field]
+                entry["max_ms"] = max(entry["max_ms"], src["max_ms"])
+                for status, count in src["status"].items():
+                    entry["status"][status] = entry["status"].get(status, 0) + count
+                entry["latency_hist"] = [a + b for a, b in zip(entry["latency_hist"], src["latency_hist"])]
+
+    def _percentile_ms(self, hist: List[int], ratio: float) -> Optional[float]:
+        """按直方图估算分位数（取所在桶的上界）；落在最后一个桶之外时返回 None"""
+        total = sum(hist)
+        if not total:
+            return 0.0
+        threshold = total * ratio
+        running = 0
+        for i, count in enumerate(hist):
+            running += count
+            if running >= threshold:
+                return float(self.LATENCY_BUCKETS_MS[i]) if i < len(self.LATENCY_BUCKETS_MS) else None
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计，按总耗时降序"""
+        with self.lock:
+            endpoints = json.loads(json.dumps(self.endpoints))
+        for entry in endpoints.values():
+            entry["avg_ms"] = round(entry["total_ms"] / entry["calls"], 1) if entry["calls"] else 0.0
+            entry["p50_ms"] = self._percentile_ms(entry["latency_hist"], 0.5)
+            entry["p95_ms"] = self._percentile_ms(entry["latency_hist"], 0.95)
+            entry["total_ms"] = round(entry["total_ms"], 1)
+            entry["max_ms"] = round(entry["max_ms"], 1)
+        ordered = sorted(endpoints.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        return {
+            "latency_buckets_ms": list(self.LATENCY_BUCKETS_MS),
+            "endpoints": dict(ordered),
+        }
+
+    def format_report(self, limit: int = 15) -> List[str]:
+        """生成文本报告行"""
+        endpoints = self.to_dict()["endpoints"]
+        lines = []
+        for key, entry in list(endpoints.items())[:limit]:
+            status_text = ",".join(f"{k}x{v}" for k, v in sorted(entry["status"].items())) or "-"
+            p95 = entry["p95_ms"]
+            p95_text = f"p95≤{p95:.0f}ms" if p95 is not None else f"p95>{self.LATENCY_BUCKETS_MS[-1]}ms"
+            lines.append(
+                f"{key} | 次数 {entry['calls']} | 总耗时 {entry['total_ms'] / 1000:.1f}s | "
+                f"平均 {entry['avg_ms']:.0f}ms {p95_text} | {entry['bytes'] / 1024:.0f}KB | "
+                f"状态 {status_text} | 异常 {entry['errors']} | 重试 {entry['retries']}({entry['retry_wait_seconds']:.0f}s)"
+            )
+        return lines
+
+global_request_metrics = RequestMetrics()  # 全局请求统计，所有账号的 RequestManager 共同写入
+
+def _record_request_retry(args: tuple, kwargs: dict, error: Exception, wait_seconds: float):
+    """retry_on_failure 钩子：记录 make_request 的重试次数及重试等待时间"""
+    manager = args[0]
+    method = args[1] if len(args) > 1 else kwargs.get('method', '')
+    url = args[2] if len(args) > 2 else kwargs.get('url', '')
+    manager.record_retry(RequestMetrics.endpoint_key(method, url), wait_seconds)
 
 # ==================== HTTP请求管理 ====================
+class SharedTransport:
+    """进程级 HTTP 传输层 - 所有账号共用按主机划分的 keep-alive 连接池，Cookie 仍由各自的 Session 隔离"""
+
+    def __init__(self, pool_hosts: int = config.HTTP_POOL_HOSTS, pool_maxsize: int = config.HTTP_POOL_MAXSIZE):
+        self.pool_hosts = max(1, pool_hosts)
+        self.pool_maxsize = max(1, pool_maxsize)
+        self.lock = threading.Lock()
+        self._adapter = None
+        self._session = None
+
+    def _create_adapter(self):
+        from requests.adapters import HTTPAdapter
+        # 重试由 retry_on_failure 统一处理；连接池满时不阻塞，多出的连接用完即弃
+        return HTTPAdapter(pool_connections=self.pool_hosts, pool_maxsize=self.pool_maxsize, max_retries=0)
+
+    @property
+    def adapter(self):
+        if self._adapter is None:
+            with self.lock:
+                if self._adapter is None:
+                    self._adapter = self._create_adapter()
+        return self._adapter
+
+    def new_session(self) -> requests.Session:
+        """创建挂载共享连接池的 Session（Cookie 罐独立）"""
+        import requests
+        session = requests.Session()
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """无状态请求（热搜源等）共用的 Session"""
+        if self._session is None:
+            session = self.new_session()
+            with self.lock:
+                if self._session is None:
+                    self._session = session
+        return self._session
+
+    @staticmethod
+    def release(session: requests.Session):
+        """账号结束时只清空其 Cookie；连接池归进程共享，不随 Session 关闭"""
+        session.cookies.clear()
+
+global_transport = LazyInstance(SharedTransport)
+
 class RequestManager:
-    """HTTP请求管理器 - 支持独立Session"""
+    """HTTP请求管理器 - 每个账号独立 Session（Cookie 隔离），底层连接池进程共享"""
     
     def __init__(self):
-        """初始化请求管理器，创建独立的Session"""
-        self.session = requests.Session()
+        """初始化请求管理器，创建挂载共享连接池的独立Session"""
+        self.session = global_transport.new_session()
+        self.metrics = RequestMetrics()  # 本账号的请求统计
+        self.retry_budget: Optional[RetryBudget] = None  # 由 RewardsService 注入共享的重试预算
     
     @staticmethod
     def get_browser_headers(cookies: str) -> Dict[str, str]:
@@ -1029,16 +1767,45 @@ class RequestManager:
             "cookie": cookies
         }
 
-    @retry_on_failure(max_retries=2)
+    def record_retry(self, key: str, wait_seconds: float):
+        """记录一次重试（本账号 + 全局）"""
+        self.metrics.record_retry(key, wait_seconds)
+        global_request_metrics.record_retry(key, wait_seconds)
+
+    @retry_on_failure(max_retries=2, on_retry=_record_request_retry, budget=owner_retry_budget)
     def make_request(self, method: str, url: str, headers: Dict[str, str], 
                  params: Optional[Dict] = None, data: Optional[str] = None,
                  timeout: int = config.REQUEST_TIMEOUT, account_index: Optional[int] = None,
-                 allow_redirects: bool = True) -> requests.Response:
-        """统一的HTTP请求方法 - 使用独立Session"""
-        if method.upper() == 'GET':
-            return self.session.get(url, headers=headers, params=params, timeout=timeout, allow_redirects=allow_redirects)
-        elif method.upper() == 'POST':
-            # 判断是否为JSON数据
+                 allow_redirects: bool = True, stream: bool = False) -> requests.Response:
+        """统一的HTTP请求方法 - 使用独立Session，并记录接口统计；stream=True 时不预读响应体"""
+        key = RequestMetrics.endpoint_key(method, url)
+        started = time.perf_counter()
+        try:
+            response = self._send(method, url, headers, params, data, timeout, allow_redirects, stream)
+        except Exception:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.metrics.record(key, elapsed_ms)
+            global_request_metrics.record(key, elapsed_ms)
+            raise
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if stream:
+            # 流式响应尚未读取，按 Content-Length 记录（分块传输时记为 0）
+            try:
+                size = int(response.headers.get("Content-Length") or 0)
+            except ValueError:
+                size = 0
+        else:
+            size = len(response.content or b"")
+        self.metrics.record(key, elapsed_ms, response.status_code, size)
+        global_request_metrics.record(key, elapsed_ms, response.status_code, size)
+        return response
+
+    def _send(self, method: str, url: str, headers: Dict[str, str], params: Optional[Dict],
+              data: Optional[str], timeout: int, allow_redirects: bool, stream: bool = False) -> requests.Response:
+        if method.upper() == 'GET':
+            return self.session.get(url, headers=headers, params=params, timeout=timeout, allow_redirects=allow_redirects, stream=stream)
+        elif method.upper() == 'POST':
+            # 判断是否为JSON数据
             if headers.get('Content-Type') == 'application/json' and data:
                  return self.session.post(url, headers=headers, json=json.loads(data), timeout=timeout, allow_redirects=allow_redirects)
             elif isinstance(data, dict):
@@ -1051,24 +1818,993 @@ class RequestManager:
             raise ValueError(f"不支持的HTTP方法: {method}")
     
     def close(self):
-        """关闭Session"""
+        """释放Session（清空 Cookie，保留共享连接池）"""
         if hasattr(self, 'session'):
-            self.session.close()
+            global_transport.release(self.session)
+
+# ==================== 分步执行调度 ====================
+# 分步任务：生成器在需要等待时产出等待秒数，结束时 return 结果。
+# 同步调度直接 sleep；asyncio 调度在步骤间 await，阻塞请求放到有界线程池中执行。
+PacedSteps = Generator[float, None, Any]
+
+def run_paced(steps: PacedSteps) -> Any:
+    """同步驱动分步任务，返回其结果"""
+    while True:
+        try:
+            delay = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        if delay and delay > 0:
+            time.sleep(delay)
+
+def _advance_steps(steps: PacedSteps) -> Tuple[bool, Any]:
+    """推进一步，返回 (是否结束, 等待秒数或结果)；StopIteration 不能穿过 Future，需在线程内转换"""
+    try:
+        return False, next(steps)
+    except StopIteration as stop:
+        return True, stop.value
+
+def interleave_paced(families: Dict[str, PacedSteps]) -> PacedSteps:
+    """交错驱动多个独立的分步任务，各自的等待节奏不变，返回 名称 -> 结果"""
+    results: Dict[str, Any] = {}
+    wake_at = {name: 0.0 for name in families}  # 下一步最早可执行的时间
+    while wake_at:
+        name = min(wake_at, key=wake_at.get)
+        wait = wake_at[name] - time.monotonic()
+        if wait > 0:
+            yield wait
+        done, value = _advance_steps(families[name])
+        if done:
+            results[name] = value
+            del wake_at[name]
+        else:
+            wake_at[name] = time.monotonic() + (value or 0)
+    return results
+
+# 各账号共用的页面拉取线程池：并发拉取的每一步都提交到这里，线程数不随账号数增长
+global_fetch_pool = LazyInstance(
+    lambda: ThreadPoolExecutor(max_workers=max(1, config.FETCH_POOL_WORKERS), thread_name_prefix="fetch")
+)
+
+def gather_paced(jobs: Dict[str, PacedSteps], limit: int = 0) -> PacedSteps:
+    """并发推进多个独立的分步任务：每一步在共享拉取线程池中执行，最多同时 limit 个；
+    全部都在等待时产出最近的等待秒数。返回 名称 -> 结果，任一任务异常时放弃其余任务并抛出。
+    任务的步骤内不能再调用 gather_paced（共享线程池内嵌套等待可能耗尽线程）"""
+    pool = global_fetch_pool.get()
+    limit = max(1, limit or len(jobs))
+    advance = RunProfiler.bind(_advance_steps)
+    results: Dict[str, Any] = {}
+    wake_at = {name: 0.0 for name in jobs}  # 下一步最早可执行的时间
+    running: Dict[Any, str] = {}
+    try:
+        while wake_at or running:
+            now = time.monotonic()
+            for name in sorted((n for n in wake_at if wake_at[n] <= now), key=wake_at.get):
+                if len(running) >= limit:
+                    break
+                del wake_at[name]
+                running[pool.submit(advance, jobs[name])] = name
+            if not running:
+                delay = min(wake_at.values()) - time.monotonic()
+                if delay > 0:
+                    yield delay
+                continue
+            # 有任务在执行时阻塞等待其完成；若有空位，最多等到下一个任务的唤醒时间
+            timeout = None
+            if wake_at and len(running) < limit:
+                timeout = max(0.0, min(wake_at.values()) - time.monotonic())
+            done, _ = futures_wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                finished, value = future.result()
+                if finished:
+                    results[name] = value
+                else:
+                    wake_at[name] = time.monotonic() + (value or 0)
+    finally:
+        # 出错时不再等待其余请求：未开始的取消，等待中的关闭
+        for future in running:
+            future.cancel()
+        for name in wake_at:
+            jobs[name].close()
+    return results
+
+class AsyncAccountScheduler:
+    """asyncio 账号调度器 - 所有账号作为协程运行在同一事件循环上，线程数不随账号数增长"""
+
+    def __init__(self, max_inflight: int = config.ASYNC_MAX_INFLIGHT):
+        self.max_inflight = max(1, int(max_inflight))
+
+    async def _drive(self, steps: PacedSteps, executor: ThreadPoolExecutor) -> Any:
+        """在线程池中执行每一步的阻塞请求，步骤间的等待交还事件循环"""
+        loop = asyncio.get_running_loop()
+        while True:
+            done, value = await loop.run_in_executor(executor, _advance_steps, steps)
+            if done:
+                return value
+            if value and value > 0:
+                await asyncio.sleep(value)
+
+    async def _run_all(self, jobs: Dict[Any, PacedSteps]) -> Dict[Any, Any]:
+        with ThreadPoolExecutor(max_workers=self.max_inflight, thread_name_prefix="rewards") as executor:
+            keys = list(jobs.keys())
+            results = await asyncio.gather(
+                *(self._drive(jobs[key], executor) for key in keys),
+                return_exceptions=True
+            )
+        return dict(zip(keys, results))
+
+    def run(self, jobs: Dict[Any, PacedSteps]) -> Dict[Any, Any]:
+        """并发运行全部分步任务，返回 key -> 结果（异常以异常对象返回）"""
+        if not jobs:
+            return {}
+        return asyncio.run(self._run_all(jobs))
+
+# ==================== 性能剖析 ====================
+class AccountProfile:
+    """单个账号的剖析数据：主流程 Profile + 子线程 Profile + 计时"""
+
+    def __init__(self, account_index: int):
+        import cProfile
+        self.account_index = account_index
+        self.profile = cProfile.Profile()
+        self.children: List[Any] = []     # 账号内线程池任务各自的 Profile
+        self.lock = threading.Lock()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.paced_wait = 0.0             # 步骤之间交还调度器的时间
+        self.cpu = 0.0                    # 各步骤所在线程的 CPU 时间
+        self.profiling = True             # 已有其他剖析器占用时（Python 3.12+）降级为仅计时
+
+class RunProfiler:
+    """可选性能剖析 - 环境变量 BING_PROFILE=1 开启
+
+    每个账号的步骤在独立的 cProfile 下执行（账号内线程池任务通过 bind() 一并剖析），
+    BING_PROFILE_MEMORY=1 时同时开启 tracemalloc。结束后在 BING_PROFILE_DIR（默认 bing_profile）
+    写出 account_N.prof、合并后的 all.prof 以及 summary.txt：
+    按账号区分 调度等待 / 任务内 sleep / 网络等待 / RSC 解析 CPU / 其他。
+    """
+
+    ENV = "BING_PROFILE"
+    MEMORY_ENV = "BING_PROFILE_MEMORY"
+    DIR_ENV = "BING_PROFILE_DIR"
+
+    _local = threading.local()
+
+    def __init__(self, output_dir: str, memory: bool = False):
+        self.output_dir = output_dir
+        self.memory = memory
+        self.lock = threading.Lock()
+        self.accounts: Dict[int, AccountProfile] = {}
+        if memory:
+            import tracemalloc
+            tracemalloc.start(10)
+
+    @classmethod
+    def from_env(cls) -> Optional["RunProfiler"]:
+        """未设置 BING_PROFILE 时返回 None，不产生任何开销"""
+        if str(os.getenv(cls.ENV, "")).strip().lower() not in ("1", "true", "yes", "on"):
+            return None
+        memory = str(os.getenv(cls.MEMORY_ENV, "")).strip().lower() in ("1", "true", "yes", "on")
+        output_dir = os.getenv(cls.DIR_ENV, "") or "bing_profile"
+        print_log("性能剖析", f"已开启（内存追踪: {'是' if memory else '否'}），结果目录: {output_dir}")
+        return cls(output_dir, memory)
+
+    # ==================== 采集 ====================
+    def _account(self, account_index: int) -> AccountProfile:
+        with self.lock:
+            record = self.accounts.get(account_index)
+            if record is None:
+                record = self.accounts[account_index] = AccountProfile(account_index)
+            return record
+
+    @classmethod
+    def _run_profiled(cls, record: AccountProfile, profile: Any, fn: Callable, *args, **kwargs) -> Any:
+        """在 profile 下执行 fn，并把当前线程标记为属于该账号"""
+        previous = getattr(cls._local, "record", None)
+        cls._local.record = record
+        enabled = False
+        if record.profiling:
+            try:
+                profile.enable()
+                enabled = True
+            except ValueError:
+                # Python 3.12+ 同一时刻只允许一个剖析器，其余账号降级为仅计时
+                record.profiling = False
+        cpu_started = time.thread_time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if enabled:
+                profile.disable()
+            with record.lock:
+                record.cpu += time.thread_time() - cpu_started
+            cls._local.record = previous
+
+    def wrap_steps(self, account_index: int, steps: PacedSteps) -> PacedSteps:
+        """包装账号的分步任务：每一步在该账号的 Profile 下执行，并累计调度等待"""
+        record = self._account(account_index)
+        record.started = time.perf_counter()
+        try:
+            while True:
+                done, value = self._run_profiled(record, record.profile, _advance_steps, steps)
+                if done:
+                    return value
+                # 按实际经过的时间计：包含调度器 sleep 与 asyncio 下等待线程池空位
+                waited_from = time.perf_counter()
+                yield value
+                record.paced_wait += time.perf_counter() - waited_from
+        finally:
+            record.finished = time.perf_counter()
+
+    @classmethod
+    def bind(cls, fn: Callable) -> Callable:
+        """账号线程向线程池提交任务前调用：未在剖析中时原样返回 fn"""
+        record = getattr(cls._local, "record", None)
+        if record is None:
+            return fn
+
+        def profiled(*args, **kwargs):
+            import cProfile
+            profile = cProfile.Profile()
+            try:
+                return cls._run_profiled(record, profile, fn, *args, **kwargs)
+            finally:
+                with record.lock:
+                    record.children.append(profile)
+
+        return profiled
+
+    # ==================== 汇总 ====================
+    @staticmethod
+    def _parse_code_keys() -> set:
+        """RSC 解析相关函数在 pstats 中的键 (文件, 行号, 函数名)"""
+        keys = set()
+        functions: List[Any] = []
+        for owner in (RscRowReader, RscStreamIndex, OfferTask, OfferTaskIndex):
+            functions.extend(vars(owner).values())
+        functions.extend(
+            value for name, value in vars(RewardsService).items()
+            if name.startswith(("_parse_", "_extract_")) or name == "_iter_punchcard_child_tasks"
+        )
+        for value in functions:
+            code = getattr(getattr(value, "__func__", value), "__code__", None)
+            if code is not None:
+                keys.add((code.co_filename, code.co_firstlineno, code.co_name))
+        return keys
+
+    @staticmethod
+    def _is_network(func: Tuple[str, int, str]) -> bool:
+        filename, _, name = func
+        return filename == "~" and ("_socket." in name or "_ssl." in name or "getaddrinfo" in name or "select." in name)
+
+    @staticmethod
+    def _is_sleep(func: Tuple[str, int, str]) -> bool:
+        return func[0] == "~" and func[2] == "<built-in method time.sleep>"
+
+    @classmethod
+    def _breakdown(cls, stats: Any, parse_keys: set) -> Dict[str, float]:
+        """从 pstats 统计中拆分 sleep / 网络 / RSC 解析时间（秒）"""
+        sleep = network = parse = 0.0
+        parse_callee_dirs = (os.sep + "json" + os.sep, os.sep + "re" + os.sep)
+        for func, (_, _, tottime, _, callers) in stats.stats.items():
+            if cls._is_sleep(func):
+                sleep += tottime
+            elif cls._is_network(func):
+                network += tottime
+            elif func in parse_keys:
+                parse += tottime
+            else:
+                # 解析函数直接调用的内建函数 / re / json 的耗时也计入解析
+                filename = func[0]
+                if filename == "~" or any(part in filename for part in parse_callee_dirs) or filename.endswith(os.sep + "re.py"):
+                    parse += sum(edge[3] for caller, edge in callers.items() if caller in parse_keys)
+        return {"sleep": sleep, "network": network, "parse": parse}
+
+    @staticmethod
+    def _load_stats(profiles: List[Any]) -> Optional[Any]:
+        """合并多个 Profile 为 pstats.Stats；未能开启（无数据）的跳过，全部为空时返回 None"""
+        import io
+        import pstats
+
+        stats = None
+        for profile in profiles:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile, stream=io.StringIO())
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # 空 Profile 无法构造 Stats（Python 3.12+ 降级为仅计时的账号）
+                continue
+        return stats
+
+    def write_report(self):
+        """写出各账号 .prof、合并的 all.prof 与 summary.txt；没有剖析数据的账号只输出计时"""
+        import io
+
+        if not self.accounts:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        parse_keys = self._parse_code_keys()
+        lines = [
+            f"{'账号':<6}{'总耗时':>9}{'调度等待':>9}{'任务sleep':>10}{'网络等待':>9}{'RSC解析':>9}{'其他':>9}{'CPU':>9}",
+        ]
+        merged = None
+        for account_index in sorted(self.accounts):
+            record = self.accounts[account_index]
+            stats = self._load_stats([record.profile] + record.children)
+            if stats is not None:
+                stats.dump_stats(os.path.join(self.output_dir, f"account_{account_index}.prof"))
+                if merged is None:
+                    merged = stats
+                else:
+                    merged.add(stats)
+
+            wall = (record.finished or time.perf_counter()) - (record.started or time.perf_counter())
+            parts = self._breakdown(stats, parse_keys) if stats is not None else {"sleep": 0.0, "network": 0.0, "parse": 0.0}
+            other = wall - record.paced_wait - parts["sleep"] - parts["network"] - parts["parse"]
+            lines.append(
+                f"{account_index:<8}{wall:>9.2f}{record.paced_wait:>11.2f}{parts['sleep']:>11.2f}"
+                f"{parts['network']:>11.2f}{parts['parse']:>10.2f}{other:>10.2f}{record.cpu:>9.2f}"
+                + ("" if record.profiling else "  (仅计时)")
+            )
+        lines.append("")
+        lines.append("注：网络等待/RSC解析含账号内并发子线程时间，可能与其他列重叠；其他 = 总耗时 - 前四列。")
+        if sys.version_info >= (3, 12):
+            lines.append("注：Python 3.12+ 同一时刻只能有一个剖析器，且它会记录所有线程的调用；"
+                         "多账号并发时各账号的拆分不可靠（其余账号仅计时），请以 all.prof 整体为准。")
+
+        if merged is not None:
+            merged.dump_stats(os.path.join(self.output_dir, "all.prof"))
+            top = io.StringIO()
+            merged.stream = top
+            merged.sort_stats("cumulative").print_stats(30)
+            lines.extend(["", "=" * 17 + " 合并剖析（按累计耗时前 30） " + "=" * 17, top.getvalue()])
+
+        if self.memory:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"{'=' * 17} 内存（全进程） {'=' * 17}")
+            lines.append(f"当前 {current / 1024 / 1024:.1f}MB，峰值 {peak / 1024 / 1024:.1f}MB")
+            for stat in tracemalloc.take_snapshot().statistics("lineno")[:20]:
+                lines.append(str(stat))
+            tracemalloc.stop()
+
+        summary_path = os.path.join(self.output_dir, "summary.txt")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        logger.write("\n".join(lines[:len(self.accounts) + 1]))
+        print_log("性能剖析", f"结果已写入 {summary_path}")
+
+# ==================== RSC 流解析 ====================
+class RscRowReader:
+    """RSC 字节流增量切行 - 按到达的字节块输出完整行（文本行按字节长度截取，其余按换行）"""
+
+    _ROW_HEADER = re.compile(rb'([0-9a-fA-F]+):(?:T([0-9a-fA-F]+),)?')
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.flight: Optional[bool] = None  # None 表示尚未判断是否为 flight 格式
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """追加字节块，返回已完整的行内容"""
+        self.buffer.extend(chunk)
+        if self.flight is None:
+            if len(self.buffer) < 32 and b"\n" not in self.buffer:
+                return []
+            self.flight = bool(self._ROW_HEADER.match(self.buffer))
+        if not self.flight:
+            return []  # 非 flight 文本整体视为一行，结束时输出
+        return self._drain(final=False)
+
+    def close(self) -> List[str]:
+        """输出剩余内容"""
+        if self.flight is None:
+            self.flight = bool(self._ROW_HEADER.match(self.buffer))
+        if not self.flight:
+            text = bytes(self.buffer).decode("utf-8", "replace")
+            self.buffer.clear()
+            return [text] if text else []
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> List[str]:
+        rows: List[str] = []
+        buf = self.buffer
+        pos = 0
+        while pos < len(buf):
+            m = self._ROW_HEADER.match(buf, pos)
+            if m and m.group(2):
+                body_end = m.end() + int(m.group(2), 16)
+                if body_end > len(buf) and not final:
+                    break
+                rows.append(bytes(buf[m.end():body_end]).decode("utf-8", "ignore"))
+                pos = min(body_end, len(buf))
+                continue
+            end = buf.find(b"\n", pos)
+            if end == -1:
+                if not final:
+                    break
+                end = len(buf)
+            body_start = m.end() if m else pos
+            if body_start < end:
+                rows.append(bytes(buf[body_start:end]).decode("utf-8", "replace"))
+            pos = end + 1
+        del buf[:pos]
+        return rows
+
+class RscStreamIndex:
+    """RSC（Next.js flight）文本流索引 - 一次扫描切分行并建立 key → 位置索引"""
+
+    # 行头: "<hex id>:"，文本行为 "<hex id>:T<hex 字节长度>,"
+    _ROW_HEADER = re.compile(r'([0-9a-fA-F]+):(?:T([0-9a-fA-F]+),)?')
+    # 结构记号: JSON 字符串（可选紧跟冒号，即对象 key）或括号
+    _TOKEN = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"(\s*:)?|[{}\[\]]')
+    _STRING = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"')
+    _PAIRS = {"}": "{", "]": "["}
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self.bytes_seen = len(self.text)  # 扫描过的原始长度（流式时为字节数）
+        self.rows: List[Tuple[int, int]] = []
+        # key -> [(key 位置, 值起始位置)]
+        self._keys: Dict[str, List[Tuple[int, int]]] = {}
+        # key 位置 -> 所在对象的起始位置
+        self._parents: Dict[int, int] = {}
+        # 容器起始位置 -> 结束位置（含）
+        self._spans: Dict[int, int] = {}
+        self._split_rows()
+        for start, end in self.rows:
+            self._index_row(start, end)
+
+    @classmethod
+    def from_stream(cls, chunks: Any, keep: Tuple[str, ...] = ()) -> "RscStreamIndex":
+        """边读边建索引：逐行切分并立即索引，只保留包含 keep 中任一子串的行（keep 为空时保留全部）"""
+        index = cls("")
+        parts: List[str] = []
+        length = 0
+        reader = RscRowReader()
+
+        def _accept(rows: List[str]):
+            nonlocal length
+            for row in rows:
+                if keep and not any(k in row for k in keep):
+                    continue
+                # 仅扫描当前行，位置换算为最终拼接文本中的偏移
+                index._index_row(0, len(row), row, length)
+                index.rows.append((length, length + len(row)))
+                parts.append(row)
+                length += len(row) + 1
+
+        for chunk in chunks:
+            if chunk:
+                index.bytes_seen += len(chunk)
+                _accept(reader.feed(chunk))
+        _accept(reader.close())
+        index.text = "\n".join(parts)
+        return index
+
+    @classmethod
+    def ensure(cls, rsc: Any) -> "RscStreamIndex":
+        """接受原始文本或已建好的索引，统一返回索引"""
+        return rsc if isinstance(rsc, cls) else cls(rsc)
+
+    def _split_rows(self):
+        """按 flight 行格式切分；非 flight 文本整体视为一行"""
+        text = self.text
+        text_len = len(text)
+        if not self._ROW_HEADER.match(text):
+            if text_len:
+                self.rows.append((0, text_len))
+            return
+
+        pos = 0
+        while pos < text_len:
+            m = self._ROW_HEADER.match(text, pos)
+            if m and m.group(2):
+                # 文本行按 UTF-8 字节长度截取，内容中可能包含换行
+                byte_len = int(m.group(2), 16)
+                body_start = m.end()
+                chunk = text[body_start:body_start + byte_len]
+                chunk = chunk.encode("utf-8")[:byte_len].decode("utf-8", "ignore")
+                end = body_start + len(chunk)
+                self.rows.append((body_start, end))
+                pos = end
+                continue
+
+            end = text.find("\n", pos)
+            if end == -1:
+                end = text_len
+            body_start = m.end() if m else pos
+            if body_start < end:
+                self.rows.append((body_start, end))
+            pos = end + 1
+
+    def _index_row(self, start: int, end: int, text: Optional[str] = None, base: int = 0):
+        """扫描单行结构记号，记录 key、容器跨度和 key 所在对象；text/base 用于流式逐行索引"""
+        text = self.text if text is None else text
+        keys = self._keys
+        parents = self._parents
+        spans = self._spans
+        pairs = self._PAIRS
+        stack: List[int] = []
+
+        for m in self._TOKEN.finditer(text, start, end):
+            token_start = m.start()
+            ch = text[token_start]
+            if ch == "\"":
+                if m.group(2) is None:
+                    continue
+                value_pos = m.end()
+                while value_pos < end and text[value_pos] in " \t\r\n":
+                    value_pos += 1
+                keys.setdefault(m.group(1), []).append((token_start + base, value_pos + base))
+                if stack and text[stack[-1]] == "{":
+                    parents[token_start + base] = stack[-1] + base
+            elif ch in "{[":
+                stack.append(token_start)
+            elif stack and text[stack[-1]] == pairs[ch]:
+                spans[stack.pop() + base] = token_start + base
+
+    def blocks(self, key: str, open_char: str) -> List[str]:
+        """返回指定 key 对应、以 open_char 开头的完整 JSON 块"""
+        text = self.text
+        blocks: List[str] = []
+        for _, value_pos in self._keys.get(key, ()):
+            if value_pos < len(text) and text[value_pos] == open_char and value_pos in self._spans:
+                blocks.append(text[value_pos:self._spans[value_pos] + 1])
+        return blocks
+
+    def string_values(self, key: str) -> List[Tuple[int, str]]:
+        """返回指定 key 的字符串值列表 [(key 位置, 原始字符串内容)]"""
+        values: List[Tuple[int, str]] = []
+        for key_pos, value_pos in self._keys.get(key, ()):
+            m = self._STRING.match(self.text, value_pos)
+            if m:
+                values.append((key_pos, m.group(1)))
+        return values
+
+    def enclosing_object(self, key_pos: int) -> Optional[str]:
+        """返回 key 所在的最小包裹 JSON 对象文本"""
+        start = self._parents.get(key_pos)
+        if start is None or start not in self._spans:
+            return None
+        return self.text[start:self._spans[start] + 1]
+
+# ==================== 移动端信息快照 ====================
+class PromotionsSnapshot:
+    """dapi/me promotions 快照 - 按渠道缓存，TTL 内复用，状态变更后显式失效"""
+
+    def __init__(self, ttl: float = config.PROMOTIONS_CACHE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # channel -> (获取时间, access_token, promotions)
+        self._entries: Dict[str, Tuple[float, str, List[Dict[str, Any]]]] = {}
+
+    def get(self, channel: str, access_token: str) -> Optional[List[Dict[str, Any]]]:
+        """返回未过期且令牌一致的快照，否则返回 None"""
+        with self.lock:
+            entry = self._entries.get(channel)
+        if not entry:
+            return None
+        fetched_at, token, promotions = entry
+        if token != access_token or time.monotonic() - fetched_at > self.ttl:
+            return None
+        return promotions
+
+    def put(self, channel: str, access_token: str, promotions: List[Dict[str, Any]]):
+        """保存最新快照"""
+        with self.lock:
+            self._entries[channel] = (time.monotonic(), access_token, promotions)
+
+    def invalidate(self, channel: Optional[str] = None):
+        """使快照失效；不指定渠道时清空全部"""
+        with self.lock:
+            if channel is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(channel, None)
+
+# ==================== 搜索进度估算 ====================
+class SearchProgressEstimator:
+    """电脑搜索进度估算 - 按每次搜索积分推算进度，仅在检查点、临近完成或推算偏差时向服务端核对"""
+
+    # 连续多少次核对进度没有增长视为停滞
+    STALL_CHECKS = 3
+
+    def __init__(self, current: int, maximum: int, per_search_points: int,
+                 check_interval: int = config.SEARCH_CHECK_INTERVAL):
+        self.confirmed = max(0, current)
+        self.maximum = max(0, maximum)
+        self.per_search_points = max(1, per_search_points)
+        self.check_interval = max(1, check_interval)
+        self.pending = 0          # 上次核对后成功的搜索次数
+        self.since_check = 0      # 上次核对后执行的搜索次数
+        self.drifting = False     # 上次核对时实际进度落后于推算
+        self.drift_interval = 1   # 偏差期间的核对间隔，连续偏差时翻倍，不超过 check_interval
+        self.stall_checks = 0
+        self.checks = 0
+
+    @property
+    def predicted(self) -> int:
+        """按成功搜索次数推算的当前进度"""
+        progress = self.confirmed + self.pending * self.per_search_points
+        return min(progress, self.maximum) if self.maximum > 0 else progress
+
+    @property
+    def stalled(self) -> bool:
+        return self.stall_checks >= self.STALL_CHECKS
+
+    def record_search(self, success: bool):
+        """记录一次搜索结果"""
+        self.since_check += 1
+        if success:
+            self.pending += 1
+
+    def should_check(self, remaining: int) -> bool:
+        """判断本次搜索后是否需要向服务端核对进度"""
+        if self.since_check == 0:
+            return False
+        if remaining <= 0 or self.since_check >= self.check_interval:
+            return True
+        if self.drifting:
+            return self.since_check >= self.drift_interval
+        return self.maximum > 0 and self.predicted >= self.maximum
+
+    def observe(self, current: int):
+        """用服务端进度校准推算"""
+        self.checks += 1
+        was_drifting = self.drifting
+        self.drifting = current < self.predicted
+        # 服务端计数滞后时逐次放宽核对间隔，避免每次搜索后都拉取 dapi/me
+        self.drift_interval = min(self.check_interval, self.drift_interval * 2) if self.drifting and was_drifting else 1
+        self.stall_checks = self.stall_checks + 1 if current <= self.confirmed else 0
+        self.confirmed = max(0, current)
+        self.pending = 0
+        self.since_check = 0
+
+# ==================== 额外活动任务模型 ====================
+class OfferTask:
+    """额外活动任务记录 - 固定字段（__slots__），来源/接口地址等重复字符串驻留共享"""
+
+    __slots__ = ("source", "endpoint", "offerid", "hash", "title", "complete", "locked",
+                 "is_promotional", "points", "destination", "daily_set_date",
+                 "referer", "href", "parent_offerid", "parent_href")
+
+    ENDPOINTS = {
+        "earn": "https://rewards.bing.com/earn",
+        "dashboard": "https://rewards.bing.com/dashboard",
+    }
+
+    def __init__(self, source: str, endpoint: str, offerid: str, offer_hash: str, title: str,
+                 complete: bool = False, locked: bool = False, is_promotional: bool = False,
+                 points: int = 0, destination: str = "", daily_set_date: str = "",
+                 referer: str = "", href: str = "", parent_offerid: str = "", parent_href: str = ""):
+        self.source = sys.intern(source)
+        self.endpoint = sys.intern(endpoint)
+        self.offerid = offerid
+        self.hash = offer_hash
+        self.title = title
+        self.complete = complete
+        self.locked = locked
+        self.is_promotional = is_promotional
+        self.points = points
+        self.destination = destination
+        self.daily_set_date = daily_set_date
+        self.referer = sys.intern(referer) if referer else self.endpoint
+        self.href = href
+        self.parent_offerid = parent_offerid
+        self.parent_href = parent_href
+
+    def merge(self, other: "OfferTask"):
+        """合并同一 (source, offerid) 的另一语言版本：状态取并集，缺失字段补齐，hash 以后者为准"""
+        self.complete = self.complete or other.complete
+        self.locked = self.locked or other.locked
+        self.is_promotional = self.is_promotional or other.is_promotional
+        if self.points <= 0 < other.points:
+            self.points = other.points
+        if not self.destination and other.destination:
+            self.destination = other.destination
+        if not self.daily_set_date and other.daily_set_date:
+            self.daily_set_date = other.daily_set_date
+        if other.hash:
+            self.hash = other.hash
+        if (not self.title or self.title == self.offerid) and other.title:
+            self.title = other.title
+
+    def filter_reason(self, known_completed: set, today_dates: frozenset) -> str:
+        """返回过滤分类（与 filter_stats 的键一致），可执行时返回 "pending"
+        today_dates 为今日日期的各种写法，DailySet 日期直接查表，仅非常规写法才回退解析"""
+        if self.complete or self.offerid in known_completed:
+            return "completed"
+        if self.locked:
+            return "locked"
+        if not self.offerid or not self.hash:
+            return "missing_offerid_or_hash"
+        if self.points <= 0 or self.is_promotional or "/redeem/" in self.destination.lower():
+            return "no_points_or_promo_or_redeem"
+        if "punchcard" in self.offerid.lower():
+            return "punchcard_parent"
+        if self.source == "dashboard" and "Gamification_DailySet_" in self.offerid:
+            if not self._is_today(today_dates):
+                return "not_today_dailyset"
+        return "pending"
+
+    def _is_today(self, today_dates: frozenset) -> bool:
+        """Dashboard DailySet 仅执行当天任务"""
+        ds = self.daily_set_date.strip()
+        if not ds:
+            return False
+        if ds in today_dates:
+            return True
+        today_obj = date.today()
+        for fmt in ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y"):
+            try:
+                return datetime.strptime(ds, fmt).date() == today_obj
+            except Exception:
+                continue
+        return False
+
+    @staticmethod
+    def today_dates() -> frozenset:
+        today_obj = date.today()
+        return frozenset(today_obj.strftime(fmt) for fmt in ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y"))
+
+class OfferTaskIndex:
+    """按 (source, offerid) 合并的任务索引 - 解析时即合并，避免中英双语重复执行"""
+
+    def __init__(self):
+        self._tasks: Dict[Tuple[str, str], OfferTask] = {}
+        self._by_offerid: Dict[str, OfferTask] = {}
+
+    def add(self, task: OfferTask):
+        key = (task.source, task.offerid)
+        existing = self._tasks.get(key)
+        if existing is None:
+            self._tasks[key] = task
+            self._by_offerid.setdefault(task.offerid, task)
+        else:
+            existing.merge(task)
+
+    def tasks(self) -> List[OfferTask]:
+        return list(self._tasks.values())
+
+    def title(self, offerid: str, default: str = "") -> str:
+        """offerid 对应的任务标题（按首次出现的来源）"""
+        task = self._by_offerid.get(offerid)
+        return task.title if task is not None and task.title else default
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+# ==================== Edge 浏览打卡 ====================
+class EdgeCheckinTask:
+    """Edge 浏览连续打卡状态机 - 每次 step() 只执行一个动作，不在内部等待
+
+    下次上报时间以绝对时间记录并写入缓存，等待交给调度器（交错执行 / asyncio 计时）；
+    运行中断后，当天再次运行会从上次上报处继续，并保证与上次上报的间隔。
+    """
+
+    TARGET_MINUTES = 30
+    REPORT_MINUTES = 5  # 服务端未返回 report_per_minutes 时，每次上报计入的分钟数
+
+    def __init__(self, service: "RewardsService", access_token: str, account_index: Optional[int] = None,
+                 state_key: str = ""):
+        self.service = service
+        self.account_index = account_index
+        self.state_key = state_key or f"账号{account_index}"
+        self.phase = "status"
+        # remaining: 本轮计划上报次数  reported: 已上报次数  base_minutes: 计划开始时的分钟进度
+        # minutes_per_report: 每次上报估算计入的分钟数
+        # next_due_at: 下次可上报的时间戳  last_points: 最后一次上报返回的积分  finished: 今日已完成
+        self.state: Dict[str, Any] = {}
+        if config.EDGE_CHECKIN_STATE_CACHE:
+            self.state = service.cache_manager.get_edge_checkin_state(self.state_key, account_index) or {}
+        self.headers = {
+            "Authorization": f"Bearer {access_token}",
+            "X-Rewards-PartnerId": "EdgeHub",
+            "X-Rewards-AppId": "EdgeDesktop",
+            "X-Rewards-Country": "CN",
+            "X-Rewards-Language": "zh-CN",
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/146.0.0.0 Safari/537.36 Edg/146.0.0.0",
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate, zsdch, zstd",
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6"
+        }
+        self.payload = {
+            "amount": 1,
+            "attributes": {"offerid": "DailyCheckIn_Edge"},
+            "request_user_info": True,
+            "type": "29"
+        }
+        self.access_token = access_token
+
+    def step(self) -> Tuple[bool, Any]:
+        """推进一步，返回 (是否结束, 等待秒数或打卡积分)"""
+        return getattr(self, f"_step_{self.phase}")()
+
+    def _save(self):
+        if config.EDGE_CHECKIN_STATE_CACHE:
+            self.service.cache_manager.save_edge_checkin_state(self.state_key, self.state, self.account_index)
+
+    def _finish(self, result: int, settled: bool) -> Tuple[bool, int]:
+        """结束：确认完成时记为今日已完成，否则清空进度，下次运行按服务端状态重新规划"""
+        self.state = {"finished": True} if settled else {}
+        self._save()
+        return True, result
+
+    @staticmethod
+    def _minutes_per_report(report_per_minutes: int) -> int:
+        """每次上报计入的分钟数：服务端按 report_per_minutes 计，上报间隔更短时只按间隔内的整分钟估算"""
+        return max(1, min(report_per_minutes, config.EDGE_REPORT_INTERVAL // 60))
+
+    def _step_status(self) -> Tuple[bool, Any]:
+        account_index = self.account_index
+        if self.state.get("finished"):
+            print_log("Edge浏览打卡", "任务已完成（缓存）", account_index)
+            return True, 0
+
+        previous = self.state
+        resumable = int(previous.get("remaining", 0) or 0) > int(previous.get("reported", 0) or 0)
+        report_per_minutes = self.REPORT_MINUTES
+        base_minutes = 0
+
+        edge_status = self.service._get_edge_checkin_status(self.access_token, account_index)
+        if edge_status and edge_status.get("complete") is True:
+            print_log("Edge浏览打卡", "任务已完成", account_index)
+            return self._finish(0, settled=True)
+
+        progress = -1
+        if edge_status:
+            progress_raw = edge_status.get("progress", -1)
+            try:
+                progress = int(progress_raw) if progress_raw is not None else -1
+            except Exception:
+                progress = -1
+            report_per_minutes = int(edge_status.get("report_per_minutes", self.REPORT_MINUTES) or self.REPORT_MINUTES)
+        minutes_per_report = self._minutes_per_report(max(1, report_per_minutes))
+        if config.EDGE_REPORT_INTERVAL < report_per_minutes * 60:
+            print_log(
+                "Edge浏览打卡",
+                f"上报间隔 {config.EDGE_REPORT_INTERVAL} 秒小于 {report_per_minutes} 分钟，服务端可能不计入进度，按每次 {minutes_per_report} 分钟估算",
+                account_index
+            )
+        remaining_requests = -(-self.TARGET_MINUTES // minutes_per_report)
+        if edge_status and 0 <= progress <= self.TARGET_MINUTES and report_per_minutes > 0:
+            base_minutes = progress
+            remaining_minutes = max(0, self.TARGET_MINUTES - progress)
+            remaining_requests = max(1, -(-remaining_minutes // minutes_per_report))
+            print_log(
+                "Edge浏览打卡",
+                f"状态查询: 进度 {progress}/{self.TARGET_MINUTES} 分钟，计划执行 {remaining_requests} 次",
+                account_index
+            )
+        elif resumable:
+            # 服务端没有可用进度时，按上次运行留下的计划继续
+            reported = int(previous.get("reported", 0) or 0)
+            remaining_requests = int(previous["remaining"]) - reported
+            minutes_per_report = int(previous.get("minutes_per_report", minutes_per_report) or minutes_per_report)
+            base_minutes = min(self.TARGET_MINUTES, int(previous.get("base_minutes", 0) or 0) + reported * minutes_per_report)
+            print_log("Edge浏览打卡", f"状态查询未返回进度，按上次中断处继续，剩余 {remaining_requests} 次", account_index)
+        elif edge_status:
+            print_log("Edge浏览打卡", f"状态查询: 未返回可用分钟进度，按默认 {remaining_requests} 次执行", account_index)
+        else:
+            print_log("Edge浏览打卡", f"状态查询失败，按默认 {remaining_requests} 次执行", account_index)
+
+        # 上次上报的间隔要求跨运行保留
+        next_due_at = float(previous.get("next_due_at", 0) or 0) if resumable else 0.0
+        self.state = {
+            "remaining": remaining_requests,
+            "reported": 0,
+            "base_minutes": base_minutes,
+            "minutes_per_report": minutes_per_report,
+            "next_due_at": next_due_at,
+            "last_points": 0,
+        }
+        self._save()
+        self.phase = "report"
+        wait = max(0.0, next_due_at - time.time())
+        if wait > 0:
+            print_log("Edge浏览打卡", f"距上次上报不足 {config.EDGE_REPORT_INTERVAL} 秒，{int(wait)} 秒后继续", account_index)
+        return False, wait
+
+    def _step_report(self) -> Tuple[bool, Any]:
+        account_index = self.account_index
+        i = int(self.state["reported"])
+        remaining_requests = int(self.state["remaining"])
+        last_points = int(self.state.get("last_points", 0) or 0)
+        try:
+            response = self.service._post_me_activity(self.headers, self.payload, account_index)
+            if response.status_code != 200:
+                print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次执行失败，状态码: {response.status_code}", account_index)
+                return self._finish(-1, settled=False)
+
+            current_points = last_points
+            try:
+                result = response.json()
+            except Exception:
+                result = None
+
+            if isinstance(result, dict):
+                response_block = result.get("response", {})
+                if isinstance(response_block, dict):
+                    activity_block = response_block.get("activity", {})
+                    if isinstance(activity_block, dict):
+                        points_raw = activity_block.get("p", last_points)
+                        try:
+                            current_points = int(points_raw)
+                        except Exception:
+                            current_points = last_points
+                    else:
+                        print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次返回缺少 activity 字段，按当前进度继续", account_index)
+                else:
+                    print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次返回缺少 response 字段，按当前进度继续", account_index)
+            else:
+                body_preview = (response.text or "").replace("\r", " ").replace("\n", " ")
+                print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次返回结构异常（非JSON对象），片段: {body_preview[:300]}", account_index)
+
+            if i == remaining_requests - 1:
+                last_points = current_points
+            minutes_per_report = int(self.state.get("minutes_per_report", self.REPORT_MINUTES) or self.REPORT_MINUTES)
+            simulated_minutes = min(self.TARGET_MINUTES, int(self.state.get("base_minutes", 0) or 0) + (i + 1) * minutes_per_report)
+            print_log(
+                "Edge浏览打卡",
+                f"第 {i + 1}/{remaining_requests} 次执行成功，估算进度: {simulated_minutes}/{self.TARGET_MINUTES} 分钟",
+                account_index
+            )
+        except Exception as e:
+            print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次执行异常: {e}", account_index)
+            return self._finish(-1, settled=False)
+
+        self.state.update(
+            reported=i + 1,
+            last_points=last_points,
+            next_due_at=time.time() + config.EDGE_REPORT_INTERVAL,
+        )
+        self._save()
+        if i + 1 < remaining_requests:
+            return False, config.EDGE_REPORT_INTERVAL
+        return self._step_verify()
+
+    def _step_verify(self) -> Tuple[bool, int]:
+        # 兜底：执行结束后积分为0，再复查一次 edge 状态；完成即视为成功。
+        last_points = int(self.state.get("last_points", 0) or 0)
+        if last_points == 0:
+            verify_status = self.service._get_edge_checkin_status(self.access_token, self.account_index)
+            if verify_status and verify_status.get("complete") is True:
+                print_log("Edge浏览打卡", "积分增加0，复查确认任务已完成", self.account_index)
+                return self._finish(0, settled=True)
+            print_log("Edge浏览打卡", "积分增加0，复查未确认完成", self.account_index)
+            return self._finish(0, settled=False)
+        return self._finish(last_points, settled=True)
 
 # ==================== 主要业务逻辑类 ====================
 class RewardsService:
     """Microsoft Rewards服务类 - 增强版本支持令牌缓存和独立Session"""
+
+    # dapi/me 快照渠道
+    MOBILE_INFO_CHANNEL = "SAAndroid"
+    EDGE_INFO_CHANNEL = "edge"
+
+    # 流式解析 RSC 时保留的行：earn/dashboard 任务列表与 punchcard 入口、punchcard 子任务
+    OFFER_STREAM_KEYS = ("activityCards", "dailySetItems", "/earn/quest", "punchcard")
+    PUNCHCARD_STREAM_KEYS = ("offerId", "offerid", "aria-label")
     
     # ==================== 1. 基础设施方法 ====================
     def __init__(self):
         """初始化服务，创建独立的请求管理器和通知管理器"""
         self.request_manager = RequestManager()
+        # 本账号所有层级（请求、业务方法、RSC 拉取）共享一份重试预算
+        self.retry_budget = RetryBudget()
+        self.request_manager.retry_budget = self.retry_budget
         self.notification_manager = NotificationManager()  # 每个实例独立的通知管理器
         # 为每个实例创建独立的缓存管理器，避免文件锁竞争
         self.cache_manager = CacheManager()
         self.token_cache_manager = TokenCacheManager()
         # 电脑搜索诊断日志去重：同一账号仅打印一次详细诊断
         self._pc_search_diag_logged_accounts: set = set()
+        # dapi/me 快照：搜索/阅读/Edge 进度与汇总共用一次下载
+        self.promotions_snapshot = PromotionsSnapshot()
     
     def __del__(self):
         """析构函数，确保Session被正确关闭"""
@@ -1076,7 +2812,7 @@ class RewardsService:
             self.request_manager.close()
     
     # ==================== 2. 核心数据获取方法 ====================
-    @retry_on_failure()
+    @retry_on_failure(budget=owner_retry_budget)
     def get_rewards_points(self, cookies: str, account_index: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """查询当前积分、账号信息和获取token"""
         headers = self.request_manager.get_browser_headers(cookies)
@@ -1118,9 +2854,34 @@ class RewardsService:
             }
 
     # ==================== 3. 令牌相关方法 ====================
-    @retry_on_failure()
     def get_access_token(self, refresh_token: str, account_alias: str = "", account_index: Optional[int] = None, silent: bool = False) -> Optional[str]:
-        """获取访问令牌用于阅读任务 - 支持令牌自动更新"""
+        """获取访问令牌用于阅读任务 - 支持令牌自动更新，未临近过期时直接复用缓存。
+        请求层 make_request 已负责网络重试；刷新令牌失效时改用环境变量中的新令牌再试一轮（循环而非递归）"""
+        cached_access_token = self.token_cache_manager.get_cached_access_token(account_alias, refresh_token)
+        if cached_access_token:
+            return cached_access_token
+
+        tried_tokens = {refresh_token}
+        while True:
+            access_token, token_invalid = self._request_access_token(refresh_token, account_alias, account_index, silent)
+            if access_token or not token_invalid:
+                return access_token
+
+            # 尝试从环境变量重新读取令牌
+            new_token = (os.getenv(f"bing_token_{account_index}") or "").strip()
+            if new_token and new_token not in tried_tokens:
+                print_log("令牌获取", f"从环境变量获取到新令牌，重试", account_index)
+                tried_tokens.add(new_token)
+                refresh_token = new_token
+                continue
+
+            print_log("令牌获取", "环境变量中无新令牌，发送失效通知", account_index)
+            self._send_token_invalid_notification(account_index)
+            return None
+
+    def _request_access_token(self, refresh_token: str, account_alias: str, account_index: Optional[int],
+                              silent: bool) -> Tuple[Optional[str], bool]:
+        """用刷新令牌换取访问令牌一次，返回 (访问令牌, 刷新令牌是否已失效)"""
         try:
             data = {
                 'client_id': '0000000040170455',
@@ -1147,20 +2908,23 @@ class RewardsService:
             if response.status_code == 200:
                 token_data = response.json()
                 if 'access_token' in token_data:
-                    # print_log("令牌获取", "成功获取访问令牌", account_index)
-                    
-                    # 检查是否有新的refresh_token返回并启用了缓存（非静默模式）
-                    if (not silent and CACHE_ENABLED and 'refresh_token' in token_data and 
-                        token_data['refresh_token'] != refresh_token and account_alias):
-                        # print_log("令牌更新", f"检测到新的刷新令牌，正在更新缓存", account_index)
-                        # 保存新的refresh_token到缓存
-                        self.token_cache_manager.save_token(account_alias, token_data['refresh_token'], account_index)
-                    
-                    return token_data['access_token']
+                    new_refresh_token = token_data.get('refresh_token') or refresh_token
+                    if new_refresh_token != refresh_token:
+                        # 刷新令牌已轮换：旧令牌换取的访问令牌作废
+                        self.token_cache_manager.invalidate_access_token(account_alias)
+                        # 检查是否启用了缓存（非静默模式），保存新的refresh_token到缓存
+                        if not silent and CACHE_ENABLED and account_alias:
+                            self.token_cache_manager.save_token(account_alias, new_refresh_token, account_index)
+
+                    self.token_cache_manager.save_access_token(
+                        account_alias, token_data['access_token'], token_data.get('expires_in', 3600), account_index,
+                        refresh_tokens=(refresh_token, new_refresh_token)
+                    )
+                    return token_data['access_token'], False
             
             # 静默模式下不处理错误通知
             if silent:
-                return None
+                return None, False
             
             # 检查是否为令牌失效错误
             if response.status_code in [400, 401, 403]:
@@ -1177,27 +2941,17 @@ class RewardsService:
                     
                     if any(indicator in error_description or indicator in error_code for indicator in token_invalid_indicators):
                         print_log("令牌获取", "刷新令牌已失效，尝试读取环境变量", account_index)
-                        
-                        # 尝试从环境变量重新读取令牌
-                        new_token = os.getenv(f"bing_token_{account_index}")
-                        if new_token and new_token.strip() and new_token != refresh_token:
-                            print_log("令牌获取", f"从环境变量获取到新令牌，重试", account_index)
-                            # 使用新令牌重试
-                            return self.get_access_token(new_token.strip(), account_alias, account_index, silent)
-                        else:
-                            print_log("令牌获取", "环境变量中无新令牌，发送失效通知", account_index)
-                            self._send_token_invalid_notification(account_index)
-                            return None
-                except:
+                        return None, True
+                except ValueError:
                     pass
             
             print_log("令牌获取", f"获取访问令牌失败，状态码: {response.status_code}", account_index)
-            return None
+            return None, False
             
         except Exception as e:
             # 静默模式下不处理错误通知
             if silent:
-                return None
+                return None, False
                 
             # 检查异常是否包含令牌失效的信息
             error_message = str(e).lower()
@@ -1208,84 +2962,82 @@ class RewardsService:
             
             if any(indicator in error_message for indicator in token_invalid_indicators):
                 print_log("令牌获取", "刷新令牌已失效（异常检测），尝试读取环境变量", account_index)
-                
-                # 尝试从环境变量重新读取令牌
-                new_token = os.getenv(f"bing_token_{account_index}")
-                if new_token and new_token.strip() and new_token != refresh_token:
-                    print_log("令牌获取", f"从环境变量获取到新令牌，重试", account_index)
-                    # 使用新令牌重试
-                    return self.get_access_token(new_token.strip(), account_alias, account_index, silent)
-                else:
-                    print_log("令牌获取", "环境变量中无新令牌，发送失效通知", account_index)
-                    self._send_token_invalid_notification(account_index)
-            else:
-                print_log("令牌获取", f"获取访问令牌异常: {e}", account_index)
-            return None
+                return None, True
+            print_log("令牌获取", f"获取访问令牌异常: {e}", account_index)
+            return None, False
     
-    @retry_on_failure()
     def get_read_progress(self, access_token: str, account_index: Optional[int] = None) -> Dict[str, int]:
-        """获取阅读任务进度"""
+        """获取阅读任务进度（从移动端信息快照中读取）。
+        网络层重试由 make_request 负责，这里拿不到数据即为确定结果，抛出 NonRetryableError"""
         try:
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'User-Agent': config.get_random_mobile_ua(),
-                'Accept-Encoding': 'gzip',
-                'x-rewards-partnerid': 'startapp',
-                'x-rewards-appid': 'SAAndroid/32.2.430730002',
-                'x-rewards-country': 'cn',
-                'x-rewards-language': 'zh',
-                'x-rewards-flights': 'rwgobig'
-            }
-            
-            response = self.request_manager.make_request(
-                'GET', 
-                'https://prod.rewardsplatform.microsoft.com/dapi/me?channel=SAAndroid&options=613',
-                headers, account_index=account_index
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if 'response' in data and 'promotions' in data['response']:
-                    for promotion in data['response']['promotions']:
-                        if (promotion.get('attributes', {}).get('offerid') == 
-                            'ENUS_readarticle3_30points'):
-                            # 获取max和progress值
-                            max_value = promotion['attributes'].get('max')
-                            progress_value = promotion['attributes'].get('progress')
-                            
-                            # 检查值是否有效
-                            if max_value is not None and progress_value is not None:
-                                try:
-                                    return {
-                                        'max': int(max_value),
-                                        'progress': int(progress_value)
-                                    }
-                                except (ValueError, TypeError):
-                                    # 如果转换失败，继续查找其他任务或抛出异常
-                                    print_log("阅读进度", f"数据格式错误: max={max_value}, progress={progress_value}", account_index)
-                                    continue
-                            else:
-                                # 如果值为空，记录日志并继续查找
-                                print_log("阅读进度", f"数据为空: max={max_value}, progress={progress_value}", account_index)
-                                continue
-                    
-                    # 如果没有找到有效的阅读任务数据，抛出异常让重试机制处理
-                    print_log("阅读进度", "未找到有效的阅读任务数据，将重试", account_index)
-                    raise ValueError("未找到有效的阅读任务数据")
+            promotions = self._get_mobile_info_promotions(access_token, account_index)
+            if promotions is None:
+                # 请求失败的原因已由移动端信息接口记录
+                raise NonRetryableError("移动端信息获取失败")
+
+            for promotion in promotions:
+                if not isinstance(promotion, dict):
+                    continue
+                attributes = promotion.get('attributes', {}) or {}
+                if attributes.get('offerid') != 'ENUS_readarticle3_30points':
+                    continue
+
+                # 获取max和progress值
+                max_value = attributes.get('max')
+                progress_value = attributes.get('progress')
+
+                # 检查值是否有效
+                if max_value is not None and progress_value is not None:
+                    try:
+                        return {
+                            'max': int(max_value),
+                            'progress': int(progress_value)
+                        }
+                    except (ValueError, TypeError):
+                        # 如果转换失败，继续查找其他任务或抛出异常
+                        print_log("阅读进度", f"数据格式错误: max={max_value}, progress={progress_value}", account_index)
+                        continue
                 else:
-                    # 如果响应结构不正确，抛出异常
-                    print_log("阅读进度", "API响应结构不正确，将重试", account_index)
-                    raise ValueError("API响应结构不正确")
-            
-            # 如果状态码不是200，抛出异常让重试机制处理
-            print_log("阅读进度", f"获取阅读进度失败，状态码: {response.status_code}", account_index)
-            raise Exception(f"HTTP状态码错误: {response.status_code}")
-            
+                    # 如果值为空，记录日志并继续查找
+                    print_log("阅读进度", f"数据为空: max={max_value}, progress={progress_value}", account_index)
+                    continue
+
+            # 没有找到有效的阅读任务数据：丢弃快照，下次查询重新拉取
+            self.promotions_snapshot.invalidate(self.MOBILE_INFO_CHANNEL)
+            raise NonRetryableError("未找到有效的阅读任务数据")
+
         except Exception as e:
-            # 重新抛出异常，让重试装饰器处理
             print_log("阅读进度", f"获取阅读进度异常: {e}", account_index)
             raise
 
+    def _check_access_token_rejected(self, response: requests.Response, headers: Dict[str, str],
+                                     account_index: Optional[int] = None) -> requests.Response:
+        """Rewards dapi 返回 401 / invalid_token 时丢弃缓存的访问令牌，下次获取时重新换取"""
+        if response.status_code in (400, 401, 403):
+            rejected = response.status_code == 401
+            if not rejected:
+                challenge = response.headers.get("WWW-Authenticate", "")
+                rejected = "invalid_token" in challenge or "invalid_token" in (response.text or "")[:2000]
+            if rejected:
+                access_token = headers.get("Authorization", "").replace("Bearer ", "", 1)
+                self.token_cache_manager.invalidate_access_token(access_token=access_token)
+                print_log("令牌缓存", f"访问令牌被拒绝（状态码 {response.status_code}），已清除缓存", account_index)
+        return response
+
+    def _post_me_activity(self, headers: Dict[str, str], payload: Dict[str, Any], account_index: Optional[int] = None) -> requests.Response:
+        """上报 dapi/me/activities 活动，并使移动端信息快照失效。"""
+        try:
+            response = self.request_manager.make_request(
+                'POST',
+                'https://prod.rewardsplatform.microsoft.com/dapi/me/activities',
+                headers,
+                data=json.dumps(payload),
+                account_index=account_index
+            )
+            return self._check_access_token_rejected(response, headers, account_index)
+        finally:
+            self.promotions_snapshot.invalidate()
+
     # ==================== 4. 搜索任务相关方法 ====================
     def _get_mobile_info_promotions(
         self,
@@ -1293,7 +3045,11 @@ class RewardsService:
         account_index: Optional[int] = None,
         silent: bool = False
     ) -> Optional[List[Dict[str, Any]]]:
-        """通过移动端信息接口获取 promotions 列表。"""
+        """通过移动端信息接口获取 promotions 列表（TTL 内复用快照）。"""
+        cached = self.promotions_snapshot.get(self.MOBILE_INFO_CHANNEL, access_token)
+        if cached is not None:
+            return cached
+
         try:
             headers = {
                 "Authorization": f"Bearer {access_token}",
@@ -1311,6 +3067,7 @@ class RewardsService:
                 headers,
                 account_index=account_index
             )
+            self._check_access_token_rejected(response, headers, account_index)
             if response.status_code != 200:
                 if not silent:
                     print_log("移动端信息", f"接口请求失败，状态码: {response.status_code}", account_index)
@@ -1322,6 +3079,7 @@ class RewardsService:
                 if not silent:
                     print_log("移动端信息", "接口返回结构异常：promotions不是数组", account_index)
                 return None
+            self.promotions_snapshot.put(self.MOBILE_INFO_CHANNEL, access_token, promotions)
             return promotions
         except Exception as e:
             if not silent:
@@ -1545,7 +3303,7 @@ class RewardsService:
             "more_total": max(0, more_total)
         }
 
-    @retry_on_failure(max_retries=2, delay=1)
+    @retry_on_failure(max_retries=2, delay=1, budget=owner_retry_budget)
     def perform_pc_search(self, cookies: str, account_index: Optional[int] = None, email: Optional[str] = None) -> bool:
         """执行电脑搜索，固定使用 cn.bing.com，动态 form，ver 从页面提取"""
 
@@ -1664,9 +3422,9 @@ class RewardsService:
             }
             post_data = f"url={quote(final_url, safe='')}&V=web"
             report_response = self.request_manager.make_request('POST', report_url, post_headers, data=post_data, account_index=account_index)
+            self.promotions_snapshot.invalidate()
 
             if 200 <= report_response.status_code < 400:
-                time.sleep(random.uniform(config.TASK_DELAY_MIN, config.TASK_DELAY_MAX))
                 return True
             else:
                 raise Exception(f"报告活动失败，状态码: {report_response.status_code}")
@@ -1676,7 +3434,7 @@ class RewardsService:
             raise
     
     # ==================== 5. APP签到相关方法 ====================
-    @retry_on_failure()
+    @retry_on_failure(budget=owner_retry_budget)
     def app_sign_in(self, access_token: str, account_index: Optional[int] = None) -> int:
         """执行App端每日签到任务
         
@@ -1717,21 +3475,12 @@ class RewardsService:
                 "channel": "SAAndroid"
             }
             
-            # 添加随机延时，模拟人类操作
-            time.sleep(random.uniform(2, 4))
-            
-            # 发送签到请求
-            response = self.request_manager.make_request(
-                'POST',
-                'https://prod.rewardsplatform.microsoft.com/dapi/me/activities',
-                headers,
-                data=json.dumps(payload),
-                account_index=account_index
-            )
+            # 发送签到请求（签到前后的随机延时由调用方以分步等待产出）
+            response = self._post_me_activity(headers, payload, account_index)
 
             if response.status_code == 200:
                 result = response.json()
-                #print(result)
+                logger.debug("APP签到", lambda: f"签到响应: {result}", account_index)
                 # result格式为{'response': {'balance': 16622, 'activity': {...}, ...}, 'code': 0}
                 # 提取积分值
                 points_earned = result.get("response", {}).get("activity", {}).get("p", 0)
@@ -1743,9 +3492,6 @@ class RewardsService:
                     # 可能已经签到过了
                     # print_log("APP签到", "签到可能已完成", account_index)
                     pass
-                
-                # 增加延时让积分有时间更新
-                time.sleep(random.uniform(2, 4))
                 return points_earned
             else:
                 # 检查是否是已经签到过的错误
@@ -1767,6 +3513,8 @@ class RewardsService:
             if 'already' in error_message or 'duplicate' in error_message:
                 # print_log("APP签到", "今日已签到（异常检测）", account_index)
                 return 0
+            if RetryPolicy.is_retryable(e):
+                raise  # 交给 retry_on_failure 重试，重试用尽后由调用方记为失败
             
             print_log("APP签到", f"签到执行异常: {e}", account_index)
             return -1
@@ -1799,21 +3547,25 @@ class RewardsService:
             return str(value).strip().lower() in ("true", "1", "yes", "y")
 
         try:
-            response = self.request_manager.make_request(
-                "GET",
-                "https://prod.rewardsplatform.microsoft.com/dapi/me?channel=edge",
-                headers,
-                account_index=account_index
-            )
-            if response.status_code != 200:
-                print_log("Edge浏览打卡", f"状态查询失败，状态码: {response.status_code}", account_index)
-                return None
+            promotions = self.promotions_snapshot.get(self.EDGE_INFO_CHANNEL, access_token)
+            if promotions is None:
+                response = self.request_manager.make_request(
+                    "GET",
+                    "https://prod.rewardsplatform.microsoft.com/dapi/me?channel=edge",
+                    headers,
+                    account_index=account_index
+                )
+                self._check_access_token_rejected(response, headers, account_index)
+                if response.status_code != 200:
+                    print_log("Edge浏览打卡", f"状态查询失败，状态码: {response.status_code}", account_index)
+                    return None
 
-            data = response.json()
-            promotions = data.get("response", {}).get("promotions", [])
-            if not isinstance(promotions, list):
-                print_log("Edge浏览打卡", "状态查询返回结构异常：promotions不是数组", account_index)
-                return None
+                data = response.json()
+                promotions = data.get("response", {}).get("promotions", [])
+                if not isinstance(promotions, list):
+                    print_log("Edge浏览打卡", "状态查询返回结构异常：promotions不是数组", account_index)
+                    return None
+                self.promotions_snapshot.put(self.EDGE_INFO_CHANNEL, access_token, promotions)
 
             edge_item = None
             for item in promotions:
@@ -1828,142 +3580,41 @@ class RewardsService:
 
             if not edge_item:
                 print_log("Edge浏览打卡", "未匹配到 DailyCheckIn_Edge 任务状态", account_index)
-                return None
-
-            attrs = edge_item.get("attributes", {}) or {}
-            complete = _to_bool(attrs.get("complete"))
-            progress = _to_int(attrs.get("progress"), -1)
-            maximum = _to_int(attrs.get("max"), 0)
-            report_per_minutes = _to_int(attrs.get("report_per_minutes"), 5)
-            if report_per_minutes <= 0:
-                report_per_minutes = 5
-
-            return {
-                "complete": complete,
-                "progress": progress,
-                "max": maximum,
-                "report_per_minutes": report_per_minutes
-            }
-        except Exception as e:
-            print_log("Edge浏览打卡", f"状态查询异常: {e}", account_index)
-            return None
-
-    def complete_edge_checkin(self, access_token: str, account_index: Optional[int] = None) -> int:
-        """执行 Edge 浏览连续打卡：状态查询与复查均使用 dapi/me?channel=edge。"""
-        target_minutes = 30
-        remaining_requests = 6
-        base_minutes = 0
-
-        edge_status = self._get_edge_checkin_status(access_token, account_index)
-        if edge_status:
-            if edge_status.get("complete") is True:
-                print_log("Edge浏览打卡", "任务已完成", account_index)
-                return 0
-
-            progress_raw = edge_status.get("progress", -1)
-            try:
-                progress = int(progress_raw) if progress_raw is not None else -1
-            except Exception:
-                progress = -1
-            report_per_minutes = int(edge_status.get("report_per_minutes", 5) or 5)
-            if 0 <= progress <= target_minutes and report_per_minutes > 0:
-                base_minutes = progress
-                remaining_minutes = max(0, target_minutes - progress)
-                remaining_requests = max(1, (remaining_minutes + report_per_minutes - 1) // report_per_minutes)
-                remaining_requests = min(6, remaining_requests)
-                print_log(
-                    "Edge浏览打卡",
-                    f"状态查询: 进度 {progress}/{target_minutes} 分钟，计划执行 {remaining_requests} 次",
-                    account_index
-                )
-            else:
-                print_log("Edge浏览打卡", "状态查询: 未返回可用分钟进度，按默认 6 次执行", account_index)
-        else:
-            print_log("Edge浏览打卡", "状态查询失败，按默认 6 次执行", account_index)
-
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "X-Rewards-PartnerId": "EdgeHub",
-            "X-Rewards-AppId": "EdgeDesktop",
-            "X-Rewards-Country": "CN",
-            "X-Rewards-Language": "zh-CN",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/146.0.0.0 Safari/537.36 Edg/146.0.0.0",
-            "Content-Type": "application/json",
-            "Accept-Encoding": "gzip, deflate, zsdch, zstd",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6"
-        }
-        payload = {
-            "amount": 1,
-            "attributes": {"offerid": "DailyCheckIn_Edge"},
-            "request_user_info": True,
-            "type": "29"
-        }
-
-        last_points = 0
-        for i in range(remaining_requests):
-            try:
-                response = self.request_manager.make_request(
-                    'POST',
-                    'https://prod.rewardsplatform.microsoft.com/dapi/me/activities',
-                    headers,
-                    data=json.dumps(payload),
-                    account_index=account_index
-                )
-                if response.status_code != 200:
-                    print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次执行失败，状态码: {response.status_code}", account_index)
-                    return -1
+                return None
 
-                current_points = last_points
-                try:
-                    result = response.json()
-                except Exception:
-                    result = None
-
-                if isinstance(result, dict):
-                    response_block = result.get("response", {})
-                    if isinstance(response_block, dict):
-                        activity_block = response_block.get("activity", {})
-                        if isinstance(activity_block, dict):
-                            points_raw = activity_block.get("p", last_points)
-                            try:
-                                current_points = int(points_raw)
-                            except Exception:
-                                current_points = last_points
-                        else:
-                            print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次返回缺少 activity 字段，按当前进度继续", account_index)
-                    else:
-                        print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次返回缺少 response 字段，按当前进度继续", account_index)
-                else:
-                    body_preview = (response.text or "").replace("\r", " ").replace("\n", " ")
-                    print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次返回结构异常（非JSON对象），片段: {body_preview[:300]}", account_index)
-
-                if i == remaining_requests - 1:
-                    last_points = current_points
-                simulated_minutes = min(target_minutes, base_minutes + (i + 1) * 5)
-                print_log(
-                    "Edge浏览打卡",
-                    f"第 {i + 1}/{remaining_requests} 次执行成功，估算进度: {simulated_minutes}/{target_minutes} 分钟",
-                    account_index
-                )
-            except Exception as e:
-                print_log("Edge浏览打卡", f"第 {i + 1}/{remaining_requests} 次执行异常: {e}", account_index)
-                return -1
+            attrs = edge_item.get("attributes", {}) or {}
+            complete = _to_bool(attrs.get("complete"))
+            progress = _to_int(attrs.get("progress"), -1)
+            maximum = _to_int(attrs.get("max"), 0)
+            report_per_minutes = _to_int(attrs.get("report_per_minutes"), 5)
+            if report_per_minutes <= 0:
+                report_per_minutes = 5
 
-            if i < remaining_requests - 1:
-                time.sleep(305)
+            return {
+                "complete": complete,
+                "progress": progress,
+                "max": maximum,
+                "report_per_minutes": report_per_minutes
+            }
+        except Exception as e:
+            print_log("Edge浏览打卡", f"状态查询异常: {e}", account_index)
+            return None
 
-        # 兜底：执行结束后积分为0，再复查一次 edge 状态；完成即视为成功。
-        if last_points == 0:
-            verify_status = self._get_edge_checkin_status(access_token, account_index)
-            if verify_status and verify_status.get("complete") is True:
-                print_log("Edge浏览打卡", "积分增加0，复查确认任务已完成", account_index)
-                return 0
-            print_log("Edge浏览打卡", "积分增加0，复查未确认完成", account_index)
+    def complete_edge_checkin(self, access_token: str, account_index: Optional[int] = None, state_key: str = "") -> int:
+        """执行 Edge 浏览连续打卡：状态查询与复查均使用 dapi/me?channel=edge。"""
+        return run_paced(self.iter_edge_checkin(access_token, account_index, state_key))
 
-        return last_points
+    def iter_edge_checkin(self, access_token: str, account_index: Optional[int] = None, state_key: str = "") -> PacedSteps:
+        """Edge 浏览连续打卡的分步实现：由 EdgeCheckinTask 推进，两次上报之间产出等待秒数。"""
+        task = EdgeCheckinTask(self, access_token, account_index, state_key)
+        while True:
+            done, value = task.step()
+            if done:
+                return value
+            yield value
 
     # ==================== 6. 阅读任务相关方法 ====================
-    @retry_on_failure()
+    @retry_on_failure(budget=owner_retry_budget)
     def submit_read_activity(self, access_token: str, account_index: Optional[int] = None) -> bool:
         """执行阅读活动请求"""
         try:
@@ -1989,12 +3640,7 @@ class RewardsService:
                 }
             }
             
-            response = self.request_manager.make_request(
-                'POST',
-                'https://prod.rewardsplatform.microsoft.com/dapi/me/activities',
-                headers,
-                data=json.dumps(payload), account_index=account_index
-            )
+            response = self._post_me_activity(headers, payload, account_index)
             
             if response.status_code == 200:
                 # print_log("阅读活动", "文章阅读请求成功", account_index)
@@ -2012,12 +3658,18 @@ class RewardsService:
                         return True
                 except:
                     pass
+            if RetryPolicy.is_retryable(e):
+                raise  # 交给 retry_on_failure 重试，重试用尽后由调用方记为失败
             
             print_log("阅读活动", f"文章阅读执行异常: {e}", account_index)
             return False
     
     def complete_read_tasks(self, refresh_token: str, account_alias: str = "", account_index: Optional[int] = None, access_token: Optional[str] = None) -> int:
         """完成阅读任务 - 支持令牌缓存和令牌复用"""
+        return run_paced(self.iter_read_tasks(refresh_token, account_alias, account_index, access_token))
+
+    def iter_read_tasks(self, refresh_token: str, account_alias: str = "", account_index: Optional[int] = None, access_token: Optional[str] = None) -> PacedSteps:
+        """阅读任务的分步实现，阅读间隔以等待秒数产出。"""
         if not refresh_token and not access_token:
             print_log("阅读任务", "未提供刷新令牌或访问令牌，跳过阅读任务", account_index)
             return 0
@@ -2053,13 +3705,18 @@ class RewardsService:
             for i in range(max_attempts):
                 print_log("阅读任务", f"执行第 {i + 1} 次阅读任务", account_index)
                 
-                if self.submit_read_activity(access_token, account_index):
+                try:
+                    submitted = yield from retry_paced(self.submit_read_activity, access_token, account_index)
+                except Exception as e:
+                    print_log("阅读活动", f"文章阅读执行异常: {e}", account_index)
+                    submitted = False
+                if submitted:
                     read_attempts += 1
                     
                     # 延迟一段时间
                     delay = random.uniform(5, 10)
                     print_log("阅读任务", f"阅读执行成功，等待 {delay:.1f} 秒", account_index)
-                    time.sleep(delay)
+                    yield delay
                     
                     # 再次检查进度
                     try:
@@ -2079,7 +3736,7 @@ class RewardsService:
                             break
                 else:
                     print_log("阅读任务", f"第 {i + 1} 次阅读执行失败", account_index)
-                    time.sleep(random.uniform(2, 5))
+                    yield random.uniform(2, 5)
             
             print_log("阅读任务", f"阅读任务执行完成，最终进度: {current_progress}/{max_reads}", account_index)
             return current_progress
@@ -2106,56 +3763,37 @@ class RewardsService:
             "rsc": "1"
         }
 
-    def _fetch_rsc_stream(
+    def _iter_rsc_stream(
         self,
         url: str,
         cookies: str,
         accept_language: str,
         account_index: Optional[int] = None,
-        referer: str = "https://rewards.bing.com/earn"
-    ) -> str:
-        """拉取 RSC 文本流（最多重试3次）。"""
+        referer: str = "https://rewards.bing.com/earn",
+        keep: Optional[Tuple[str, ...]] = None
+    ) -> PacedSteps:
+        """拉取 RSC 文本流（分步）：状态码可重试或内容为空时按统一策略退避重试（最多3次，消耗账号重试预算），
+        退避以等待秒数产出；网络异常由 make_request 的分步重试处理，同样不在线程内 sleep，这里不再叠加重试。
+
+        keep 为 None 时返回完整文本；否则（RSC_STREAMING 开启时）边下载边切行，
+        返回只保留包含 keep 中任一子串的行的 RscStreamIndex。"""
         headers = self._build_rsc_get_headers(cookies, accept_language, referer=referer)
+        streaming = keep is not None and config.RSC_STREAMING
         max_attempts = 3
         last_error_msg = ""
         last_excerpt = ""
 
         for attempt in range(1, max_attempts + 1):
             try:
-                response = self.request_manager.make_request(
+                response = yield from retry_paced(
+                    self.request_manager.make_request,
                     "GET",
                     url,
                     headers,
                     timeout=30,
-                    account_index=account_index
+                    account_index=account_index,
+                    stream=streaming
                 )
-
-                # RSC 响应偶发 charset 标注不准，统一按 UTF-8 解码避免中文乱码
-                try:
-                    text = response.content.decode("utf-8")
-                except Exception:
-                    text = response.text or ""
-
-                last_excerpt = (text or "")[:500]
-
-                if response.status_code != 200:
-                    last_error_msg = f"状态码: {response.status_code}"
-                    if attempt < max_attempts:
-                        print_log("RSC请求", f"第{attempt}次失败[{url}]，{last_error_msg}，准备重试", account_index)
-                        time.sleep(attempt)
-                        continue
-                    break
-
-                if not (text and text.strip()):
-                    last_error_msg = "返回内容为空"
-                    if attempt < max_attempts:
-                        print_log("RSC请求", f"第{attempt}次失败[{url}]，{last_error_msg}，准备重试", account_index)
-                        time.sleep(attempt)
-                        continue
-                    break
-
-                return text
-
             except Exception as e:
                 last_error_msg = str(e)
                 # 尝试从异常对象里提取响应内容片段
@@ -2169,121 +3807,91 @@ class RewardsService:
                         last_excerpt = (err_text or "")[:500]
                 except Exception:
                     pass
-
-                if attempt < max_attempts:
-                    print_log("RSC请求", f"第{attempt}次异常[{url}]：{e}，准备重试", account_index)
-                    time.sleep(attempt)
-                    continue
                 break
 
-        # 第3次仍失败：打印返回内容前500字符
-        excerpt_text = last_excerpt if last_excerpt else "<空>"
-        print_log("RSC请求", f"重试{max_attempts}次后仍失败[{url}]：{last_error_msg}", account_index)
-        print_log("RSC请求", f"返回内容前500字符: {excerpt_text}", account_index)
-        raise RuntimeError(f"RSC请求失败[{url}]，{last_error_msg}")
-
-    def _extract_json_blocks_by_key(self, text: str, key: str, open_char: str) -> List[str]:
-        """从文本中提取指定 key 对应的 JSON 块（数组或对象）。"""
-        if open_char == "[":
-            close_char = "]"
-        elif open_char == "{":
-            close_char = "}"
-        else:
-            return []
-
-        marker = f"\"{key}\""
-        blocks: List[str] = []
-        cursor = 0
+            if streaming and response.status_code == 200:
+                head = bytearray()
 
-        while True:
-            idx = text.find(marker, cursor)
-            if idx == -1:
-                break
-            colon = text.find(":", idx + len(marker))
-            if colon == -1:
-                break
+                def _chunks():
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        if len(head) < 500:
+                            head.extend(chunk[:500 - len(head)])
+                        yield chunk
 
-            i = colon + 1
-            text_len = len(text)
-            while i < text_len and text[i] in (" ", "\t", "\r", "\n"):
-                i += 1
+                try:
+                    index = RscStreamIndex.from_stream(_chunks(), keep)
+                except Exception as e:
+                    last_error_msg = f"读取响应失败: {e}"
+                    last_excerpt = bytes(head).decode("utf-8", "ignore")
+                    break
+                finally:
+                    response.close()
+                last_excerpt = bytes(head).decode("utf-8", "ignore")
+                if last_excerpt.strip():
+                    return index
+                text = ""
+            else:
+                # RSC 响应偶发 charset 标注不准，统一按 UTF-8 解码避免中文乱码
+                try:
+                    text = response.content.decode("utf-8")
+                except Exception:
+                    text = response.text or ""
 
-            if i >= text_len or text[i] != open_char:
-                cursor = idx + len(marker)
-                continue
+                last_excerpt = (text or "")[:500]
 
-            depth = 0
-            in_string = False
-            escaped = False
-            end_pos = -1
-
-            for j in range(i, text_len):
-                ch = text[j]
-                if in_string:
-                    if escaped:
-                        escaped = False
-                    elif ch == "\\":
-                        escaped = True
-                    elif ch == "\"":
-                        in_string = False
-                else:
-                    if ch == "\"":
-                        in_string = True
-                    elif ch == open_char:
-                        depth += 1
-                    elif ch == close_char:
-                        depth -= 1
-                        if depth == 0:
-                            end_pos = j
-                            break
+                if response.status_code == 200 and text and text.strip():
+                    return text if keep is None else RscStreamIndex(text)
 
-            if end_pos != -1:
-                blocks.append(text[i:end_pos + 1])
-                cursor = end_pos + 1
+            if response.status_code != 200:
+                last_error_msg = f"状态码: {response.status_code}"
+                if not RetryPolicy.is_retryable_status(response.status_code):
+                    break
             else:
-                break
+                last_error_msg = "返回内容为空"
 
-        return blocks
+            if attempt >= max_attempts or not self.retry_budget.try_consume():
+                break
+            wait = RetryPolicy.backoff(attempt)
+            print_log("RSC请求", f"第{attempt}次失败[{url}]，{last_error_msg}，{wait:.1f}秒后重试", account_index)
+            self.request_manager.record_retry(RequestMetrics.endpoint_key("GET", url), wait)
+            yield wait
 
-    def _extract_enclosing_json_object(self, text: str, key_pos: int) -> Optional[str]:
-        """给定 key 位置，提取其所在的最小包裹 JSON 对象文本。"""
-        search_pos = key_pos
-        while True:
-            start = text.rfind("{", 0, search_pos + 1)
-            if start == -1:
-                return None
+        # 最终失败：打印返回内容前500字符
+        excerpt_text = last_excerpt if last_excerpt else "<空>"
+        print_log("RSC请求", f"请求失败[{url}]：{last_error_msg}", account_index)
+        print_log("RSC请求", f"返回内容前500字符: {excerpt_text}", account_index)
+        raise RuntimeError(f"RSC请求失败[{url}]，{last_error_msg}")
 
-            depth = 0
-            in_string = False
-            escaped = False
-            end = -1
-            for i in range(start, len(text)):
-                ch = text[i]
-                if in_string:
-                    if escaped:
-                        escaped = False
-                    elif ch == "\\":
-                        escaped = True
-                    elif ch == "\"":
-                        in_string = False
-                else:
-                    if ch == "\"":
-                        in_string = True
-                    elif ch == "{":
-                        depth += 1
-                    elif ch == "}":
-                        depth -= 1
-                        if depth == 0:
-                            end = i
-                            break
+    def _iter_rsc_streams(
+        self,
+        specs: Dict[str, Tuple[str, str, str]],
+        cookies: str,
+        account_index: Optional[int] = None
+    ) -> PacedSteps:
+        """并发拉取多个 RSC 流（name -> (url, accept_language, referer)），边下载边建立索引；任一失败则抛出。
+        请求在共享拉取线程池中执行，重试退避以等待秒数产出。"""
+        jobs = {
+            name: self._iter_rsc_stream(url, cookies, accept_language, account_index, referer, self.OFFER_STREAM_KEYS)
+            for name, (url, accept_language, referer) in specs.items()
+        }
+        streams = yield from gather_paced(jobs, config.OFFER_FETCH_CONCURRENCY)
+        return {name: RscStreamIndex.ensure(stream) for name, stream in streams.items()}
 
-            if end != -1 and start <= key_pos <= end:
-                return text[start:end + 1]
+    def _extract_json_blocks_by_key(self, rsc: Any, key: str, open_char: str) -> List[str]:
+        """从 RSC 索引中提取指定 key 对应的 JSON 块（数组或对象）。"""
+        if open_char not in ("[", "{"):
+            return []
+        return RscStreamIndex.ensure(rsc).blocks(key, open_char)
 
-            search_pos = start - 1
+    def _extract_enclosing_json_object(self, rsc: Any, key_pos: int) -> Optional[str]:
+        """给定 key 位置，提取其所在的最小包裹 JSON 对象文本。"""
+        return RscStreamIndex.ensure(rsc).enclosing_object(key_pos)
 
-    def _parse_offer_tasks_from_items(self, items: List[Any], source: str) -> List[Dict[str, Any]]:
-        tasks: List[Dict[str, Any]] = []
+    def _parse_offer_tasks_from_items(self, items: List[Any], source: str,
+                                      index: Optional[OfferTaskIndex] = None) -> List[OfferTask]:
+        """解析任务卡片；传入 index 时边解析边合并"""
+        tasks: List[OfferTask] = []
+        endpoint = OfferTask.ENDPOINTS.get(source, OfferTask.ENDPOINTS["dashboard"])
 
         def _to_optional_bool(value: Any) -> Optional[bool]:
             """仅在值明确表达 true/false 时返回布尔，否则返回 None。"""
@@ -2331,113 +3939,85 @@ class RewardsService:
             except Exception:
                 points = 0
 
-            title = item.get("title") or item.get("name") or offerid
-            destination = str(item.get("destination", "") or "")
-            endpoint = "https://rewards.bing.com/earn" if source == "earn" else "https://rewards.bing.com/dashboard"
-            tasks.append({
-                "source": source,
-                "endpoint": endpoint,
-                "offerid": offerid,
-                "hash": offer_hash,
-                "title": title,
-                "complete": is_completed,
-                "locked": is_locked,
-                "is_promotional": is_promotional,
-                "points": points,
-                "destination": destination,
-                "daily_set_date": str(
+            task = OfferTask(
+                source,
+                endpoint,
+                str(offerid),
+                str(offer_hash),
+                str(item.get("title") or item.get("name") or offerid),
+                complete=is_completed,
+                locked=is_locked,
+                is_promotional=is_promotional,
+                points=points,
+                destination=str(item.get("destination", "") or ""),
+                daily_set_date=str(
                     item.get("daily_set_date")
                     or item.get("dailySetDate")
                     or item.get("date")
                     or ""
                 ),
-            })
+            )
+            tasks.append(task)
+            if index is not None:
+                index.add(task)
         return tasks
 
-    def _parse_earn_activity_cards(self, rsc_text: str) -> List[Dict[str, Any]]:
+    def _parse_earn_activity_cards(self, rsc: Any, index: Optional[OfferTaskIndex] = None) -> List[OfferTask]:
         """解析 earn RSC 中的 activityCards 任务。"""
-        tasks: List[Dict[str, Any]] = []
-        for block in self._extract_json_blocks_by_key(rsc_text, "activityCards", "["):
+        tasks: List[OfferTask] = []
+        for block in self._extract_json_blocks_by_key(rsc, "activityCards", "["):
             try:
                 cards = json.loads(block)
             except Exception:
                 continue
             if isinstance(cards, list):
-                tasks.extend(self._parse_offer_tasks_from_items(cards, "earn"))
+                tasks.extend(self._parse_offer_tasks_from_items(cards, "earn", index))
         return tasks
 
-    def _parse_dashboard_dailyset_items(self, rsc_text: str) -> List[Dict[str, Any]]:
+    def _parse_dashboard_dailyset_items(self, rsc: Any, index: Optional[OfferTaskIndex] = None) -> List[OfferTask]:
         """解析 dashboard RSC 中的 dailySetItems 任务。"""
-        tasks: List[Dict[str, Any]] = []
-        for block in self._extract_json_blocks_by_key(rsc_text, "dailySetItems", "["):
+        tasks: List[OfferTask] = []
+        for block in self._extract_json_blocks_by_key(rsc, "dailySetItems", "["):
             try:
                 items = json.loads(block)
             except Exception:
                 continue
             if isinstance(items, list):
-                tasks.extend(self._parse_offer_tasks_from_items(items, "dashboard"))
+                tasks.extend(self._parse_offer_tasks_from_items(items, "dashboard", index))
         return tasks
 
-    def _merge_offer_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """按 (source, offerid) 合并任务，避免中英双语重复执行。"""
-        def _to_int(value: Any, default: int = 0) -> int:
-            try:
-                return int(float(value))
-            except Exception:
-                return default
-
-        merged: Dict[str, Dict[str, Any]] = {}
-        for task in tasks:
-            key = f"{task['source']}::{task['offerid']}"
-            if key not in merged:
-                merged[key] = dict(task)
-                continue
-
-            existing = merged[key]
-            existing["complete"] = bool(existing.get("complete", False) or task.get("complete", False))
-            existing["locked"] = bool(existing.get("locked", False) or task.get("locked", False))
-            existing["is_promotional"] = bool(existing.get("is_promotional", False) or task.get("is_promotional", False))
-            if _to_int(existing.get("points", 0)) <= 0 and _to_int(task.get("points", 0)) > 0:
-                existing["points"] = _to_int(task.get("points", 0))
-            if not existing.get("destination") and task.get("destination"):
-                existing["destination"] = task.get("destination")
-            if not existing.get("daily_set_date") and task.get("daily_set_date"):
-                existing["daily_set_date"] = task.get("daily_set_date")
-            if not existing.get("hash") and task.get("hash"):
-                existing["hash"] = task["hash"]
-            if existing.get("hash") and task.get("hash") and existing["hash"] != task["hash"]:
-                existing["hash"] = task["hash"]
-            if (not existing.get("title") or existing.get("title") == existing.get("offerid")) and task.get("title"):
-                existing["title"] = task["title"]
-
-        return list(merged.values())
-
-    def _extract_punchcard_parents_from_earn_rsc(self, rsc_text: str) -> List[Dict[str, str]]:
+    def _extract_punchcard_parents_from_earn_rsc(self, rsc: Any) -> List[Dict[str, str]]:
         """提取 punchcard 主任务（offerid + href）。"""
+        index = RscStreamIndex.ensure(rsc)
+        href_pattern = re.compile(r'/earn/quest/?([A-Za-z0-9_%\-]*punchcard)')
         parents: Dict[str, str] = {}
-        for href, href_offerid in re.findall(r'"href"\s*:\s*"(/earn/quest/?([A-Za-z0-9_%\-]*punchcard))"', rsc_text):
-            offerid = unquote(href_offerid)
+        for _, href in index.string_values("href"):
+            match = href_pattern.fullmatch(href)
+            if not match:
+                continue
+            offerid = unquote(match.group(1))
             if "punchcard" in offerid.lower():
                 parents[offerid] = unquote(href)
 
         # 兜底：从 offerId 提取 parent，但 href 不存在时跳过
-        for offerid in re.findall(r'"offerId"\s*:\s*"([^"]*punchcard[^"]*)"', rsc_text, flags=re.IGNORECASE):
-            if offerid not in parents:
-                maybe_href = f"/earn/quest{offerid}"
-                if f"\"{maybe_href}\"" in rsc_text:
-                    parents[offerid] = maybe_href
+        for _, offerid in index.string_values("offerId"):
+            if "punchcard" not in offerid.lower() or offerid in parents:
+                continue
+            maybe_href = f"/earn/quest{offerid}"
+            if f"\"{maybe_href}\"" in index.text:
+                parents[offerid] = maybe_href
 
         return [{"offerid": k, "href": v} for k, v in parents.items()]
 
-    def _fetch_punchcard_child_tasks(
+    def _iter_punchcard_child_tasks(
         self,
         cookies: str,
         parent_offerid: str,
         parent_href: str,
         parent_name: Optional[str] = None,
         account_index: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
-        """拉取 punchcard 页面并提取子任务。"""
+    ) -> PacedSteps:
+        """拉取 punchcard 页面并提取子任务（分步，返回 List[OfferTask]）。"""
         display_parent = parent_name or parent_offerid
         candidate_hrefs: List[str] = []
         if parent_href:
@@ -2450,7 +4030,7 @@ class RewardsService:
         if alt_with_slash not in candidate_hrefs:
             candidate_hrefs.append(alt_with_slash)
 
-        rsc_text = ""
+        page_index: Optional[RscStreamIndex] = None
         used_href = parent_href
         last_error: Optional[Exception] = None
         tried_urls: List[str] = []
@@ -2460,13 +4040,14 @@ class RewardsService:
                     referer = f"https://rewards.bing.com{href}"
                     url = f"https://rewards.bing.com{href}?_rsc={rsc_key}"
                     tried_urls.append(url)
-                    rsc_text = self._fetch_rsc_stream(
+                    page_index = RscStreamIndex.ensure((yield from self._iter_rsc_stream(
                         url,
                         cookies,
                         "zh-CN,zh;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6",
                         account_index=account_index,
-                        referer=referer
-                    )
+                        referer=referer,
+                        keep=self.PUNCHCARD_STREAM_KEYS
+                    )))
                     used_href = href
                     if href != parent_href or rsc_key != "bnjs8":
                         print_log("Punch Card", f"任务页回退成功: href={href}, rsc={rsc_key}", account_index)
@@ -2474,16 +4055,18 @@ class RewardsService:
                 except Exception as e:
                     last_error = e
                     continue
-            if rsc_text:
+            if page_index is not None:
                 break
 
-        if not rsc_text:
+        if page_index is None:
             tried_desc = " | ".join(tried_urls[-6:]) if tried_urls else "无"
             print_log("Punch Card", f"获取任务页失败[{display_parent}]: {last_error}", account_index)
             print_log("Punch Card", f"已尝试URL: {tried_desc}", account_index)
             return []
 
-        tasks: List[Dict[str, Any]] = []
+        # 流式模式下 page_index.text 只含子任务相关行
+        rsc_text = page_index.text
+        tasks: List[OfferTask] = []
         seen: set = set()
         parse_texts: List[str] = [rsc_text]
         if "\\\"offerId\\\"" in rsc_text or "\\\"aria-label\\\"" in rsc_text:
@@ -2506,28 +4089,29 @@ class RewardsService:
                     continue
                 seen.add(dedup_key)
                 target_href = href if isinstance(href, str) and href.startswith("/") else used_href
-                tasks.append({
-                    "source": "punchcard",
-                    "endpoint": f"https://rewards.bing.com{target_href}",
-                    "parent_offerid": parent_offerid,
-                    "parent_href": used_href,
-                    "referer": f"https://rewards.bing.com{target_href}",
-                    "title": aria_label,
-                    "href": href,
-                    "offerid": offerid,
-                    "hash": offer_hash,
-                    "complete": str(is_completed).lower() == "true",
-                    "locked": str(is_locked).lower() == "true",
-                })
+                tasks.append(OfferTask(
+                    "punchcard",
+                    f"https://rewards.bing.com{target_href}",
+                    offerid,
+                    offer_hash,
+                    aria_label,
+                    complete=str(is_completed).lower() == "true",
+                    locked=str(is_locked).lower() == "true",
+                    href=href,
+                    parent_offerid=parent_offerid,
+                    parent_href=used_href,
+                ))
 
         # direct_pattern 没提全时，再走对象/邻域兜底
         for parse_text in parse_texts:
+            # 反转义后的文本结构可能不完整，仍用正则定位 offerId，包裹对象从索引直接查表
+            parse_index = page_index if parse_text is rsc_text else RscStreamIndex(parse_text)
             for match in re.finditer(r'"offerId"\s*:\s*"([^"]*punchcard[^"]*)"', parse_text, flags=re.IGNORECASE):
                 offerid = match.group(1)
                 if "pcchild" not in offerid.lower():
                     continue
                 key_pos = match.start()
-                obj_text = self._extract_enclosing_json_object(parse_text, key_pos)
+                obj_text = self._extract_enclosing_json_object(parse_index, key_pos)
                 obj_data: Dict[str, Any] = {}
                 if obj_text:
                     try:
@@ -2597,19 +4181,18 @@ class RewardsService:
                     is_locked = is_locked.lower() == "true"
                 target_href = href if isinstance(href, str) and href.startswith("/") else used_href
 
-                tasks.append({
-                    "source": "punchcard",
-                    "endpoint": f"https://rewards.bing.com{target_href}",
-                    "parent_offerid": parent_offerid,
-                    "parent_href": used_href,
-                    "referer": f"https://rewards.bing.com{target_href}",
-                    "title": aria_label,
-                    "href": href,
-                    "offerid": offerid,
-                    "hash": offer_hash,
-                    "complete": bool(is_completed),
-                    "locked": bool(is_locked),
-                })
+                tasks.append(OfferTask(
+                    "punchcard",
+                    f"https://rewards.bing.com{target_href}",
+                    offerid,
+                    str(offer_hash),
+                    str(aria_label),
+                    complete=bool(is_completed),
+                    locked=bool(is_locked),
+                    href=str(href or ""),
+                    parent_offerid=parent_offerid,
+                    parent_href=used_href,
+                ))
 
         if not tasks:
             print_log("Punch Card", f"{display_parent} 未找到可执行任务", account_index)
@@ -2654,6 +4237,7 @@ class RewardsService:
                 data=payload,
                 account_index=account_index
             )
+            self.promotions_snapshot.invalidate()
 
             if response.status_code != 200:
                 print_log("提交额外活动", f"执行失败: {display_name}，状态码: {response.status_code}", account_index)
@@ -2672,78 +4256,59 @@ class RewardsService:
         except Exception as e:
             print_log("提交额外活动", f"执行异常: {task_name or offerid}，{e}", account_index)
             return -1
-    def complete_all_offers(self, cookies: str, access_token: Optional[str] = None, account_index: Optional[int] = None) -> List[str]:
+    def complete_all_offers(self, cookies: str, access_token: Optional[str] = None, account_index: Optional[int] = None,
+                            state_key: str = "") -> List[str]:
         """基于 earn/dashboard RSC 数据执行 offerid 任务。"""
+        return run_paced(self.iter_all_offers(cookies, access_token, account_index, state_key))
+
+    def iter_all_offers(self, cookies: str, access_token: Optional[str] = None, account_index: Optional[int] = None,
+                        state_key: str = "") -> PacedSteps:
+        """额外活动的分步实现，任务提交之间产出等待秒数；state_key 为当天状态的缓存键（默认账号别名）。"""
         del access_token  # 新方案不依赖 access_token
         completed_ids: List[str] = []
+        state_key = state_key or f"账号{account_index}"
 
+        # 当天之前运行留下的状态：已完成任务直接跳过；全部处理完、未到刷新时间且没有待解锁任务时不再拉取
+        offer_state = self.cache_manager.get_offer_state(state_key, account_index) if config.OFFER_STATE_CACHE else None
+        known_completed: set = set(offer_state.get("completed", [])) if offer_state else set()
+        cached_punchcards: Dict[str, Dict[str, Any]] = offer_state.get("punchcards", {}) if offer_state else {}
+        today_mmddyyyy = date.today().strftime("%m/%d/%Y")
+        if (
+            offer_state
+            and offer_state.get("settled")
+            and offer_state.get("daily_set_date") in ("", today_mmddyyyy)
+            and time.time() - float(offer_state.get("discovered_at", 0) or 0) < config.OFFER_STATE_REFRESH
+        ):
+            unlock_at = float(offer_state.get("unlock_at", 0) or 0)
+            if not unlock_at or time.time() < unlock_at:
+                print_log("额外活动", f"今日任务已在之前的运行中处理完毕（已完成 {len(known_completed)} 个），跳过拉取", account_index)
+                return completed_ids
+            print_log("额外活动", "之前运行时有未解锁任务，已到重新检查时间，重新拉取", account_index)
+        failed_count = 0
+        locked_count = 0
+
+        stream_specs = {
+            "earn_zh": ("https://rewards.bing.com/earn?_rsc=aq46i", "zh-CN,zh;q=0.9", "https://rewards.bing.com/earn"),
+            "earn_en": ("https://rewards.bing.com/earn?_rsc=aq46i", "en-US,en;q=0.9", "https://rewards.bing.com/earn"),
+            "dashboard": ("https://rewards.bing.com/dashboard?_rsc=aq46i", "zh-CN,zh;q=0.9", "https://rewards.bing.com/dashboard"),
+        }
         try:
-            earn_zh = self._fetch_rsc_stream(
-                "https://rewards.bing.com/earn?_rsc=aq46i",
-                cookies,
-                "zh-CN,zh;q=0.9",
-                account_index
-            )
-            earn_en = self._fetch_rsc_stream(
-                "https://rewards.bing.com/earn?_rsc=aq46i",
-                cookies,
-                "en-US,en;q=0.9",
-                account_index
-            )
-            dash_rsc = self._fetch_rsc_stream(
-                "https://rewards.bing.com/dashboard?_rsc=aq46i",
-                cookies,
-                "zh-CN,zh;q=0.9",
-                account_index,
-                referer="https://rewards.bing.com/dashboard"
-            )
+            streams = yield from self._iter_rsc_streams(stream_specs, cookies, account_index)
         except Exception as e:
             print_log("额外活动", f"获取数据失败: {e}", account_index)
             return completed_ids
 
-        earn_tasks = self._parse_earn_activity_cards(earn_zh) + self._parse_earn_activity_cards(earn_en)
-        dashboard_tasks = self._parse_dashboard_dailyset_items(dash_rsc)
-        all_tasks = self._merge_offer_tasks(earn_tasks + dashboard_tasks)
-        offer_title_map: Dict[str, str] = {}
-        for t in all_tasks:
-            oid = str(t.get("offerid", "") or "")
-            title = str(t.get("title", "") or "")
-            if oid and title and oid not in offer_title_map:
-                offer_title_map[oid] = title
+        # 每个流只扫描一次，三个解析器共用同一份索引
+        earn_zh = streams["earn_zh"]
+        earn_en = streams["earn_en"]
+        task_index = OfferTaskIndex()
+        earn_tasks = self._parse_earn_activity_cards(earn_zh, task_index) + self._parse_earn_activity_cards(earn_en, task_index)
+        dashboard_tasks = self._parse_dashboard_dailyset_items(streams["dashboard"], task_index)
+        all_tasks = task_index.tasks()
 
         if not all_tasks:
             print_log("额外活动", "未解析到 activityCards/dailySetItems 任务，继续检查 punchcard", account_index)
 
-        def _safe_int(value: Any, default: int = 0) -> int:
-            try:
-                return int(float(value))
-            except Exception:
-                return default
-
-        def _is_today_daily_set_task(task: Dict[str, Any]) -> bool:
-            """Dashboard DailySet 仅执行当天任务；无日期字段时默认放行。"""
-            if str(task.get("source", "")) != "dashboard":
-                return False
-            offerid_text = str(task.get("offerid", "") or "")
-            if "Gamification_DailySet_" not in offerid_text:
-                return False
-
-            ds = str(task.get("daily_set_date", "") or "").strip()
-            if not ds:
-                return False
-
-            today_obj = date.today()
-            today_std = today_obj.strftime("%m/%d/%Y")
-            if ds == today_std:
-                return True
-
-            for fmt in ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y"):
-                try:
-                    return datetime.strptime(ds, fmt).date() == today_obj
-                except Exception:
-                    continue
-            return False
-
         filter_stats = {
             "completed": 0,
             "locked": 0,
@@ -2753,34 +4318,13 @@ class RewardsService:
             "punchcard_parent": 0,
             "pending": 0
         }
-        pending_tasks: List[Dict[str, Any]] = []
+        today_dates = OfferTask.today_dates()
+        pending_tasks: List[OfferTask] = []
         for t in all_tasks:
-            if t.get("complete", False):
-                filter_stats["completed"] += 1
-                continue
-            if t.get("locked", False):
-                filter_stats["locked"] += 1
-                continue
-            if not t.get("offerid") or not t.get("hash"):
-                filter_stats["missing_offerid_or_hash"] += 1
-                continue
-            if (
-                _safe_int(t.get("points", 0)) <= 0
-                or t.get("is_promotional", False)
-                or "/redeem/" in str(t.get("destination", "")).lower()
-            ):
-                filter_stats["no_points_or_promo_or_redeem"] += 1
-                continue
-            if "punchcard" in str(t.get("offerid", "")).lower():
-                filter_stats["punchcard_parent"] += 1
-                continue
-            if str(t.get("source", "")) == "dashboard" and "Gamification_DailySet_" in str(t.get("offerid", "")):
-                if not _is_today_daily_set_task(t):
-                    filter_stats["not_today_dailyset"] += 1
-                    continue
-
-            filter_stats["pending"] += 1
-            pending_tasks.append(t)
+            reason = t.filter_reason(known_completed, today_dates)
+            filter_stats[reason] += 1
+            if reason == "pending":
+                pending_tasks.append(t)
 
         skipped_promo_count = filter_stats["no_points_or_promo_or_redeem"]
         if skipped_promo_count:
@@ -2803,11 +4347,11 @@ class RewardsService:
         )
 
         for idx, task in enumerate(pending_tasks, 1):
-            offerid = task["offerid"]
-            title = task.get("title") or offerid
-            source = task.get("source", "earn")
-            endpoint = task["endpoint"]
-            offer_hash = task["hash"]
+            offerid = task.offerid
+            title = task.title or offerid
+            source = task.source
+            endpoint = task.endpoint
+            offer_hash = task.hash
 
             print_log("额外活动", f"正在处理 ({idx}/{len(pending_tasks)}) [{source}] {title}", account_index)
             result = self._submit_rsc_offer_activity(
@@ -2821,11 +4365,13 @@ class RewardsService:
             )
             if result > 0:
                 completed_ids.append(f"{source}:{offerid}")
+                known_completed.add(offerid)
                 print_log("额外活动", f"✅ 完成: {title}", account_index)
             else:
+                failed_count += 1
                 print_log("额外活动", f"❌ 未完成: {title}", account_index)
 
-            time.sleep(random.uniform(2, 4))
+            yield random.uniform(2, 4)
 
         # punchcard 任务链路（从 earn 接口提取 parent punchcard，再拉 quest 接口解析子任务）
         punchcard_parents = self._extract_punchcard_parents_from_earn_rsc(earn_zh) + self._extract_punchcard_parents_from_earn_rsc(earn_en)
@@ -2839,45 +4385,101 @@ class RewardsService:
         if merged_parent_map:
             print_log("Punch Card", f"发现 {len(merged_parent_map)} 个主任务", account_index)
 
-        for parent_offerid, parent_href in merged_parent_map.items():
-            parent_title = offer_title_map.get(parent_offerid, parent_offerid)
-            child_tasks = self._fetch_punchcard_child_tasks(
-                cookies, parent_offerid, parent_href, parent_name=parent_title, account_index=account_index
+        # 之前运行已确认子任务全部完成的主任务不再拉取任务页
+        punchcards_state: Dict[str, Dict[str, Any]] = {}
+        for poid in list(merged_parent_map):
+            cached = cached_punchcards.get(poid)
+            if cached and cached.get("settled") and all(child in known_completed for child in cached.get("children", [])):
+                punchcards_state[poid] = cached
+                del merged_parent_map[poid]
+        if punchcards_state:
+            print_log("Punch Card", f"{len(punchcards_state)} 个主任务今日已完成（缓存），跳过拉取", account_index)
+
+        # 各主任务页相互独立，在共享拉取线程池中并发拉取（单个失败不影响其它）；执行仍按发现顺序
+        parent_titles = {poid: task_index.title(poid, poid) for poid in merged_parent_map}
+
+        def _children(poid: str, phref: str) -> PacedSteps:
+            try:
+                return (yield from self._iter_punchcard_child_tasks(
+                    cookies, poid, phref, parent_name=parent_titles[poid], account_index=account_index
+                ))
+            except Exception as e:
+                print_log("Punch Card", f"获取任务页异常[{parent_titles[poid]}]: {e}", account_index)
+                return []
+
+        children_by_parent: Dict[str, List[OfferTask]] = {}
+        if merged_parent_map:
+            children_by_parent = yield from gather_paced(
+                {poid: _children(poid, phref) for poid, phref in merged_parent_map.items()},
+                config.OFFER_FETCH_CONCURRENCY
             )
+
+        for parent_offerid in merged_parent_map:
+            parent_title = parent_titles[parent_offerid]
+            child_tasks = children_by_parent.get(parent_offerid, [])
             if not child_tasks:
                 print_log("Punch Card", f"跳过: {parent_title}", account_index)
                 continue
 
             print_log("Punch Card", f"{parent_title} 找到 {len(child_tasks)} 个可执行任务", account_index)
             for idx, task in enumerate(child_tasks, 1):
-                offerid = task["offerid"]
-                title = task.get("title") or offerid
-                is_completed = bool(task.get("complete", False))
-                is_locked = bool(task.get("locked", False))
+                offerid = task.offerid
+                title = task.title or offerid
+                is_completed = task.complete or offerid in known_completed
+                is_locked = task.locked
+                if is_completed:
+                    known_completed.add(offerid)
 
                 if is_completed:
                     print_log("Punch Card", f"跳过 ({idx}/{len(child_tasks)}) 已完成: {title}", account_index)
                     continue
                 if is_locked:
+                    locked_count += 1
                     print_log("Punch Card", f"跳过 ({idx}/{len(child_tasks)}) 未解锁: {title}", account_index)
                     continue
 
                 print_log("Punch Card", f"执行({idx}/{len(child_tasks)}): {title}", account_index)
                 result = self._submit_rsc_offer_activity(
                     cookies,
-                    task["endpoint"],
+                    task.endpoint,
                     offerid,
-                    task["hash"],
+                    task.hash,
                     account_index=account_index,
-                    referer=task["referer"],
+                    referer=task.referer,
                     task_name=title
                 )
                 if result > 0:
                     completed_ids.append(f"Punch Card:{offerid}")
+                    known_completed.add(offerid)
                     print_log("Punch Card", f"✅ 完成: {title}", account_index)
                 else:
+                    failed_count += 1
                     print_log("Punch Card", f"❌ 失败: {title}", account_index)
-                time.sleep(random.uniform(2, 4))
+                yield random.uniform(2, 4)
+
+            punchcards_state[parent_offerid] = {
+                "href": merged_parent_map[parent_offerid],
+                "children": [task.offerid for task in child_tasks],
+                "settled": all(task.offerid in known_completed for task in child_tasks),
+            }
+
+        if config.OFFER_STATE_CACHE:
+            # 执行完没有失败的任务即视为已处理完毕，刷新间隔内后续运行跳过拉取；
+            # 有未解锁任务（含 Punch Card 后续天数的子任务）时记下重新检查时间，过了该时间不再跳过
+            locked_count += filter_stats["locked"]
+            now = int(time.time())
+            daily_set_dates = sorted({
+                t.daily_set_date for t in dashboard_tasks
+                if "Gamification_DailySet_" in t.offerid and t.daily_set_date
+            })
+            self.cache_manager.save_offer_state(state_key, {
+                "completed": sorted(known_completed),
+                "punchcards": punchcards_state,
+                "daily_set_date": today_mmddyyyy if today_mmddyyyy in daily_set_dates else (daily_set_dates[-1] if daily_set_dates else ""),
+                "discovered_at": now,
+                "settled": failed_count == 0,
+                "unlock_at": now + config.OFFER_LOCKED_RECHECK if locked_count else 0,
+            }, account_index)
 
         return completed_ids
 
@@ -2921,6 +4523,8 @@ class RewardsBot:
             exit(1)
         
         print_log("初始化", f"检测到 {len(self.accounts)} 个账号，即将开始...")
+        self.account_metrics: Dict[int, RequestMetrics] = {}  # 账号索引 -> 该账号的请求统计
+        self.profiler = RunProfiler.from_env()  # 仅在设置 BING_PROFILE 时启用
         
         # 统计有效刷新令牌数量
         valid_tokens = sum(1 for account in self.accounts if account.refresh_token)
@@ -2929,84 +4533,91 @@ class RewardsBot:
 
     def process_single_account(self, account: AccountInfo, service: RewardsService, stop_event: threading.Event) -> Optional[str]:
         """处理单个账号的完整流程"""
+        return run_paced(self._account_steps(account, service, stop_event))
+
+    def _account_steps(self, account: AccountInfo, service: RewardsService, stop_event: threading.Event) -> PacedSteps:
+        """账号分步任务；开启剖析时逐步包在该账号的剖析器中"""
+        steps = self.iter_account(account, service, stop_event)
+        if self.profiler:
+            steps = self.profiler.wrap_steps(account.index, steps)
+        return steps
+
+    def iter_account(self, account: AccountInfo, service: RewardsService, stop_event: threading.Event) -> PacedSteps:
+        """单个账号完整流程的分步实现，各任务的等待均以秒数产出"""
         try:
             account_index = account.index
             cookies = account.cookies
             
             # 获取账号信息
-            initial_data = service.get_rewards_points(cookies, account_index)
+            initial_data = yield from retry_paced(service.get_rewards_points, cookies, account_index)
             if not initial_data:
                 print_log("账号处理", "获取账号信息失败，跳过此账号", account_index)
                 return None
             
             email = initial_data.get('email', '未知邮箱')
+            account.email = initial_data.get('email') or ""
             current_points = initial_data['points']  # 当前即时积分
             logger.account_start(email, current_points, account_index)
 
             # 获取访问令牌（用于阅读、额外活动和Edge浏览打卡）
             access_token = None
-            app_sign_in_points = 0
-            edge_checkin_points = -2
-            read_completed = 0
-            
             if account.refresh_token:
                 access_token = service.get_access_token(account.refresh_token, account.alias, account_index)
-                
-                if access_token:
-                    # 先执行阅读任务（按用户期望优先）
-                    read_completed = service.complete_read_tasks(account.refresh_token, account.alias, account_index, access_token)
-                    logger.success("阅读任务", f"已完成 ({read_completed}/30)", account_index)
-                    
-                    # 执行APP签到任务
-                    app_sign_in_points = service.app_sign_in(access_token, account_index)
-                    if app_sign_in_points > 0:
-                        logger.success("APP签到", f"签到成功，获得 {app_sign_in_points} 积分", account_index)
-                    elif app_sign_in_points == 0:
-                        logger.success("APP签到", "今日已签到", account_index)
-                    else:
-                        logger.warning("APP签到", "签到失败", account_index)
-                else:
+                if not access_token:
                     logger.skip("阅读任务", "无法获取访问令牌", account_index)
                     logger.skip("APP签到", "无法获取访问令牌", account_index)
             else:
                 logger.skip("阅读任务", "未配置刷新令牌", account_index)
                 logger.skip("APP签到", "未配置刷新令牌", account_index)
+                logger.skip("Edge浏览打卡", "未配置刷新令牌", account_index)
 
             # 初始化变量，避免未定义错误
             daily_completed = 0
             daily_total = 0
             more_completed = 0
             more_total = 0
-            
-            # 执行额外任务：RSC offerid 仅依赖 cookies
-            extra_completed_count = 0
-            completed_offers = service.complete_all_offers(cookies, account_index=account_index)
-            extra_completed_count = len(completed_offers)
-            if completed_offers:
-                logger.success("额外活动", f"已执行 {extra_completed_count} 个任务", account_index)
-            
-            # 先执行 Edge 浏览连续打卡任务
+
+            # 各任务族相互独立：阅读+APP签到、额外活动（仅依赖 cookies）、Edge 浏览打卡；
+            # 单个任务族异常只影响自身，按未完成记录，其余任务族照常执行
+            families: Dict[str, PacedSteps] = {}
+            if access_token:
+                families["app"] = self._isolated("阅读/APP签到", self._iter_app_tasks(account, service, access_token), (0, 0), account_index)
+            families["offers"] = self._isolated("额外活动", self._iter_offer_tasks(account, service), 0, account_index)
+            edge = None
             if account.refresh_token:
-                edge_access_token = service.get_access_token(account.refresh_token, account.alias, account_index, silent=True) or access_token
-                if edge_access_token:
-                    access_token = edge_access_token
-                    edge_checkin_points = service.complete_edge_checkin(edge_access_token, account_index)
-                    if edge_checkin_points > 0:
-                        logger.success("Edge浏览打卡", f"完成并获得 {edge_checkin_points} 积分", account_index)
-                    elif edge_checkin_points == 0:
-                        logger.success("Edge浏览打卡", "任务已完成", account_index)
-                    else:
-                        logger.warning("Edge浏览打卡", "任务执行失败", account_index)
-                else:
-                    logger.skip("Edge浏览打卡", "无法获取访问令牌", account_index)
-            else:
-                logger.skip("Edge浏览打卡", "未配置刷新令牌", account_index)
+                edge = self._isolated("Edge浏览打卡", self._iter_edge_tasks(account, service, access_token), -1, account_index)
+            search = self._isolated(
+                "电脑搜索",
+                self._iter_search_tasks(cookies, account_index, service, stop_event, access_token),
+                False, account_index, on_error=stop_event.set
+            )
 
-            # 电脑搜索放到最后，避免搜索计数异常影响额外任务和 Edge 浏览
-            self._perform_search_tasks(cookies, account_index, service, stop_event, access_token)
+            if config.OVERLAP_TASK_FAMILIES:
+                # 电脑搜索仍在阅读/额外活动之后，避免搜索计数异常影响额外任务；
+                # Edge 打卡从一开始就与它们交错，其多次长时间等待期间依次进行阅读、额外活动和搜索，
+                # 账号耗时约等于 max(Edge 打卡, 其余任务族之和)
+                timelines = {"tasks": self._then(interleave_paced(families), search)}
+                if edge is not None:
+                    timelines["edge"] = edge
+                timeline_results = yield from interleave_paced(timelines)
+                results = timeline_results["tasks"]
+                if "edge" in timeline_results:
+                    results["edge"] = timeline_results["edge"]
+            else:
+                # 顺序执行；电脑搜索放到最后，避免搜索计数异常影响额外任务和 Edge 浏览
+                results = {}
+                for name, steps in families.items():
+                    results[name] = yield from steps
+                if edge is not None:
+                    results["edge"] = yield from edge
+                yield from search
+
+            read_completed, app_sign_in_points = results.get("app", (0, 0))
+            extra_completed_count = results.get("offers", 0)
+            edge_checkin_points = results.get("edge", -2)
             
             # 获取最终积分
-            final_data = service.get_rewards_points(cookies, account_index)
+            final_data = yield from retry_paced(service.get_rewards_points, cookies, account_index)
             if final_data and final_data['points'] is not None:
                 final_points = final_data['points']
 
@@ -3051,14 +4662,86 @@ class RewardsBot:
             print_log("错误详情", f"详细错误信息: {error_details}", account_index)
             return None
     
-    def _perform_search_tasks(
+    @staticmethod
+    def _then(first: PacedSteps, then: PacedSteps) -> PacedSteps:
+        """先执行 first，再执行 then，返回 first 的结果"""
+        result = yield from first
+        yield from then
+        return result
+
+    @staticmethod
+    def _isolated(name: str, steps: PacedSteps, default: Any, account_index: int,
+                  on_error: Optional[Callable[[], None]] = None) -> PacedSteps:
+        """包装任务族：异常时记录并返回 default，不中断同账号的其它任务族"""
+        try:
+            return (yield from steps)
+        except Exception as e:
+            print_log("账号处理错误", f"{name}执行异常: {e}", account_index)
+            logger.debug("错误详情", traceback.format_exc, account_index)
+            if on_error is not None:
+                on_error()
+            return default
+
+    def _iter_app_tasks(self, account: AccountInfo, service: RewardsService, access_token: str) -> PacedSteps:
+        """阅读 + APP签到任务族，返回 (阅读进度, 签到积分)"""
+        account_index = account.index
+
+        # 先执行阅读任务（按用户期望优先）
+        read_completed = yield from service.iter_read_tasks(account.refresh_token, account.alias, account_index, access_token)
+        logger.success("阅读任务", f"已完成 ({read_completed}/30)", account_index)
+
+        # 执行APP签到任务：签到前随机延时模拟人类操作，成功后再等一会让积分有时间更新
+        yield random.uniform(2, 4)
+        try:
+            app_sign_in_points = yield from retry_paced(service.app_sign_in, access_token, account_index)
+        except Exception as e:
+            print_log("APP签到", f"签到执行异常: {e}", account_index)
+            app_sign_in_points = -1
+        if app_sign_in_points >= 0:
+            yield random.uniform(2, 4)
+        if app_sign_in_points > 0:
+            logger.success("APP签到", f"签到成功，获得 {app_sign_in_points} 积分", account_index)
+        elif app_sign_in_points == 0:
+            logger.success("APP签到", "今日已签到", account_index)
+        else:
+            logger.warning("APP签到", "签到失败", account_index)
+        return read_completed, app_sign_in_points
+
+    def _iter_offer_tasks(self, account: AccountInfo, service: RewardsService) -> PacedSteps:
+        """额外活动任务族：RSC offerid 仅依赖 cookies，返回执行成功的任务数"""
+        account_index = account.index
+        completed_offers = yield from service.iter_all_offers(
+            account.cookies, account_index=account_index, state_key=account.state_key
+        )
+        if completed_offers:
+            logger.success("额外活动", f"已执行 {len(completed_offers)} 个任务", account_index)
+        return len(completed_offers)
+
+    def _iter_edge_tasks(self, account: AccountInfo, service: RewardsService, access_token: Optional[str]) -> PacedSteps:
+        """Edge 浏览连续打卡任务族，返回打卡积分（-2 表示未执行）"""
+        account_index = account.index
+        edge_access_token = service.get_access_token(account.refresh_token, account.alias, account_index, silent=True) or access_token
+        if not edge_access_token:
+            logger.skip("Edge浏览打卡", "无法获取访问令牌", account_index)
+            return -2
+
+        edge_checkin_points = yield from service.iter_edge_checkin(edge_access_token, account_index, account.state_key)
+        if edge_checkin_points > 0:
+            logger.success("Edge浏览打卡", f"完成并获得 {edge_checkin_points} 积分", account_index)
+        elif edge_checkin_points == 0:
+            logger.success("Edge浏览打卡", "任务已完成", account_index)
+        else:
+            logger.warning("Edge浏览打卡", "任务执行失败", account_index)
+        return edge_checkin_points
+
+    def _iter_search_tasks(
         self,
         cookies: str,
         account_index: int,
         service: RewardsService,
         stop_event: threading.Event,
         access_token: Optional[str]
-    ) -> bool:
+    ) -> PacedSteps:
         """执行电脑搜索任务：进度统计统一使用移动端信息接口。"""
         if not access_token:
             stop_event.set()
@@ -3091,17 +4774,27 @@ class RewardsBot:
 
         logger.search_start("电脑", required_searches, account_index)
         last_progress = pc_current
+        # 按每次搜索积分推算进度，每 SEARCH_CHECK_INTERVAL 次或临近完成/推算偏差时才拉取 dapi/me 核对
+        estimator = SearchProgressEstimator(pc_current, pc_max, per_search_points)
 
         for i in range(required_searches):
-            if service.perform_pc_search(cookies, account_index):
+            succeeded = yield from retry_paced(service.perform_pc_search, cookies, account_index)
+            if succeeded:
+                yield random.uniform(config.TASK_DELAY_MIN, config.TASK_DELAY_MAX)
                 delay = random.randint(config.SEARCH_DELAY_MIN, config.SEARCH_DELAY_MAX)
                 logger.search_progress("电脑", i + 1, required_searches, delay, account_index)
-                time.sleep(delay)
+                yield delay
             else:
                 print_log("电脑搜索", f"第{i + 1}次搜索失败", account_index)
 
+            estimator.record_search(succeeded)
+            if not estimator.should_check(required_searches - i - 1):
+                continue
+
             latest_status = service.get_pc_search_status_from_mobile_promotions(access_token, account_index, silent=True)
-            current_progress = int(latest_status.get("current", last_progress)) if latest_status else last_progress
+            if latest_status:
+                estimator.observe(int(latest_status.get("current", estimator.confirmed) or 0))
+            current_progress = estimator.confirmed
 
             if i + 1 == required_searches:
                 logger.search_progress_summary("电脑", i + 1, last_progress, current_progress, account_index)
@@ -3110,6 +4803,13 @@ class RewardsBot:
                 logger.search_complete("电脑", i + 1, account_index, True)
                 return True
 
+            if estimator.stalled:
+                if config.SEARCH_STALL_ABORT:
+                    print_log("电脑搜索", f"连续{estimator.stall_checks}次核对进度未增长 ({current_progress}/{pc_max})，停止搜索", account_index)
+                    break
+                if estimator.stall_checks == estimator.STALL_CHECKS:
+                    print_log("电脑搜索", f"连续{estimator.stall_checks}次核对进度未增长 ({current_progress}/{pc_max})，继续搜索", account_index)
+
         final_status = service.get_pc_search_status_from_mobile_promotions(access_token, account_index, silent=True)
         if not final_status:
             stop_event.set()
@@ -3197,6 +4897,85 @@ class RewardsBot:
     
     def run(self):
         """运行主程序"""
+        if config.ASYNC_ENGINE:
+            account_summaries, thread_stop_events = self._run_async()
+        else:
+            account_summaries, thread_stop_events = self._run_threads()
+
+        # 按账号索引排序并转换为列表
+        sorted_summaries = []
+        if account_summaries:
+            # 按账号索引排序
+            for account_index in sorted(account_summaries.keys()):
+                sorted_summaries.append(account_summaries[account_index])
+        
+        # 检查是否有线程因搜索失败而停止
+        any_search_failed = any(event.is_set() for event in thread_stop_events.values())
+        
+        # 推送结果
+        self._send_notification(sorted_summaries, any_search_failed)
+
+        if config.REQUEST_METRICS or config.REQUEST_METRICS_FILE:
+            self._report_request_metrics()
+
+        if self.profiler:
+            self.profiler.write_report()
+
+    def _report_request_metrics(self):
+        """输出请求统计：全局按接口耗时排序，账号级仅列总量；可选写入 JSON 文件"""
+        if config.REQUEST_METRICS:
+            logger.write(f"\n{'='*17} [请求统计] {'='*17}")
+            for line in global_request_metrics.format_report():
+                logger.write(line)
+            for account_index in sorted(self.account_metrics):
+                endpoints = self.account_metrics[account_index].to_dict()["endpoints"].values()
+                calls = sum(entry["calls"] for entry in endpoints)
+                total_ms = sum(entry["total_ms"] for entry in endpoints)
+                retries = sum(entry["retries"] for entry in endpoints)
+                logger.write(f"账号{account_index}: 请求 {calls} 次，累计耗时 {total_ms / 1000:.1f}s，重试 {retries} 次")
+
+        if config.REQUEST_METRICS_FILE:
+            report = {
+                "global": global_request_metrics.to_dict(),
+                "accounts": {str(k): v.to_dict() for k, v in sorted(self.account_metrics.items())},
+            }
+            try:
+                with open(config.REQUEST_METRICS_FILE, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, ensure_ascii=False, indent=2)
+                print_log("请求统计", f"已写入 {config.REQUEST_METRICS_FILE}")
+            except Exception as e:
+                print_log("请求统计", f"写入统计文件失败: {e}")
+
+    def _run_async(self) -> Tuple[Dict[int, str], Dict[int, threading.Event]]:
+        """asyncio 调度：所有账号作为协程共用一个事件循环和有界请求线程池"""
+        stop_events = {account.index: threading.Event() for account in self.accounts}
+        jobs = {
+            account.index: self._async_account_job(account, stop_events[account.index])
+            for account in self.accounts
+        }
+        print_log("初始化", f"使用 asyncio 调度器，请求并发上限 {config.ASYNC_MAX_INFLIGHT}")
+        results = AsyncAccountScheduler(config.ASYNC_MAX_INFLIGHT).run(jobs)
+
+        account_summaries = {}
+        for account_index, result in results.items():
+            if isinstance(result, BaseException):
+                if not isinstance(result, SystemExit):
+                    print_log(f"账号{account_index}错误", f"处理账号时发生异常: {result}", account_index)
+            elif result:
+                account_summaries[account_index] = result
+        return account_summaries, stop_events
+
+    def _async_account_job(self, account: AccountInfo, stop_event: threading.Event) -> PacedSteps:
+        """单个账号的协程任务：首步才创建 RewardsService，结束即释放，已完成账号不再占用会话与解析状态"""
+        service = RewardsService()
+        self.account_metrics[account.index] = service.request_manager.metrics
+        try:
+            return (yield from self._account_steps(account, service, stop_event))
+        finally:
+            service.request_manager.close()
+
+    def _run_threads(self) -> Tuple[Dict[int, str], Dict[int, threading.Event]]:
+        """线程调度：每个账号一个线程"""
         account_summaries = {}  # 使用字典保存账号摘要，key为账号索引
         threads = []
         summaries_lock = threading.Lock()
@@ -3206,6 +4985,7 @@ class RewardsBot:
         def thread_worker(account: AccountInfo):
             # 为每个线程创建独立的RewardsService实例，避免共享状态
             service = RewardsService()
+            self.account_metrics[account.index] = service.request_manager.metrics
             # 为每个线程创建独立的停止事件
             thread_stop_events[account.index] = threading.Event()
             try:
@@ -3232,31 +5012,20 @@ class RewardsBot:
         # 等待所有线程完成
         for t in threads:
             t.join()
-        
-        # 按账号索引排序并转换为列表
-        sorted_summaries = []
-        if account_summaries:
-            # 按账号索引排序
-            for account_index in sorted(account_summaries.keys()):
-                sorted_summaries.append(account_summaries[account_index])
-        
-        # 检查是否有线程因搜索失败而停止
-        any_search_failed = any(event.is_set() for event in thread_stop_events.values())
-        
-        # 推送结果
-        self._send_notification(sorted_summaries, any_search_failed)
+
+        return account_summaries, thread_stop_events
     
     def _send_notification(self, summaries: List[str], any_search_failed: bool):
         """发送通知"""
         if any_search_failed:
-            print(f"\n\n{'='*17} [任务未全部完成] {'='*17}")
+            logger.write(f"\n\n{'='*17} [任务未全部完成] {'='*17}")
             print_log(f"系统提示", f"搜索任务未全部完成")
             print_log(f"系统提示", f"建议每 30+ 分钟重新运行一次")
             print_log(f"统一推送", "任务未全部完成，取消推送")
-            print(f"{'='*17} [任务未全部完成] {'='*17}")
+            logger.write(f"{'='*17} [任务未全部完成] {'='*17}")
             return
         else:   
-            print(f"\n\n{'='*17} [全部任务完成] {'='*17}")
+            logger.write(f"\n\n{'='*17} [全部任务完成] {'='*17}")
             
             # 增加任务完成计数
             global_cache_manager.increment_tasks_complete_count()
@@ -3280,12 +5049,35 @@ class RewardsBot:
                 return
             
             # 无论是否推送，都在日志末尾打印内容摘要
-            print(f"{'='*17} [全部任务完成] {'='*17}")
-            print(f"\n\n{content}")
+            logger.write(f"{'='*17} [全部任务完成] {'='*17}")
+            logger.write(f"\n\n{content}")
 
 # ==================== 主程序入口 ====================
+def should_skip_today() -> bool:
+    """快速路径：今日已运行满 MAX_REPEAT_COUNT 次时直接跳过（不加载 requests、不访问网络）"""
+    started = time.perf_counter()
+    try:
+        current_complete_count = global_cache_manager.get_tasks_complete_count()
+
+        # 强制检查计数是否超过设定次数
+        if current_complete_count >= TASK_CONFIG['MAX_REPEAT_COUNT']:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print_log("脚本跳过", f"已重复运行{current_complete_count}次，跳过执行（检查耗时 {elapsed_ms:.1f}ms）")
+            return True
+        elif current_complete_count > 0:
+            print_log("系统提示", f"已重复运行{current_complete_count}/{TASK_CONFIG['MAX_REPEAT_COUNT']}次", None)
+    except Exception as e:
+        # 如果检查失败，继续执行
+        print_log("检查警告", f"检查重复运行次数失败: {e}", None)
+    return False
+
 def main():
     """主程序入口"""
+    if should_skip_today():
+        return
+
+    # 热搜词在后台预取，与账号校验、积分查询并行
+    threading.Thread(target=hot_words_manager.get, name="hotwords-init", daemon=True).start()
     try:
         bot = RewardsBot()
         bot.run()
@@ -3293,6 +5085,8 @@ def main():
         print_log("程序中断", "用户中断程序执行")
     except Exception as e:
         print_log("程序错误", f"程序执行出错: {e}")
+    finally:
+        logger.flush()
 
 if __name__ == "__main__":
     main() 
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 Bing Rewards 本地替身服务 + 端到端性能基准
+
+在本机启动一个模拟 Rewards 各接口的 HTTP 替身服务（earn/dashboard RSC 流、punchcard 任务页、
+dapi/me、OAuth 令牌、活动上报、cn.bing.com 搜索、热搜源），将 Bing_Rewards.py 的全部请求
+重定向到替身服务，并以虚拟时钟把等待时间缩放为 0，离线测量解析和缓存优化的效果。
+
+每个账号数在独立子进程中运行（隔离缓存文件并单独统计峰值内存），输出：
+墙钟耗时、各接口请求次数、替身返回字节数、RSC 解析字节数、峰值 RSS。
+
+用法：
+python Bing_Rewards_bench.py                       # 默认 1,5,20 个账号
+python Bing_Rewards_bench.py --accounts 1,10,50 --rsc-kb 800 --async-engine
+python Bing_Rewards_bench.py --runs 3              # 每个账号数连续运行 3 次，观察重复运行的增量开销
+python Bing_Rewards_bench.py --json bench.json     # 同时输出 JSON 报告
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+BENCH_HOST_HEADER = "X-Bench-Host"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ==================== 替身服务状态 ====================
+class StandInState:
+    """按账号记录任务进度，让重复查询能观察到上报产生的变化"""
+
+    PC_SEARCH_MAX = 90
+    READ_MAX = 30
+    EDGE_MAX = 30
+
+    def __init__(self, rsc_kb: int = 400, offers: int = 12, punch_children: int = 4):
+        self.rsc_kb = rsc_kb
+        self.offers = offers
+        self.punch_children = punch_children
+        self.lock = threading.RLock()
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.requests = Counter()
+        self.bytes_out = Counter()
+        self.connections = 0  # 客户端新建的 TCP 连接数
+        self._filler = self._build_filler(rsc_kb)
+
+    @staticmethod
+    def _build_filler(rsc_kb: int) -> str:
+        """生成与真实页面体量相当的无关 RSC 行（组件树 + T 文本块）"""
+        rows: List[str] = []
+        size = 0
+        row_id = 0x100
+        while size < rsc_kb * 1024:
+            node = json.dumps(["$", "div", None, {
+                "className": "mee-rewards-card",
+                "children": [["$", "span", f"k{row_id}", {"children": "占位文本" * 8}]] * 6
+            }], ensure_ascii=False)
+            text = "lorem ipsum 示例正文 " * 40
+            rows.append(f"{row_id:x}:{node}\n")
+            rows.append(f"{row_id + 1:x}:T{len(text.encode('utf-8')):x},{text}")
+            size += len(rows[-2].encode("utf-8")) + len(rows[-1].encode("utf-8"))
+            row_id += 2
+        return "".join(rows)
+
+    def account(self, uid: str) -> Dict[str, Any]:
+        with self.lock:
+            return self.accounts.setdefault(uid, {
+                "balance": 10000,
+                "pc": 0,
+                "read": 0,
+                "edge": 0,
+                "signed": False,
+                "done": set(),
+            })
+
+    def record(self, endpoint: str, size: int):
+        with self.lock:
+            self.requests[endpoint] += 1
+            self.bytes_out[endpoint] += size
+
+    def earn(self, uid: str, count: int):
+        with self.lock:
+            self.accounts[uid]["balance"] += count
+
+# ==================== 替身页面构造 ====================
+def _offer_items(state: StandInState, uid: str, prefix: str, with_date: bool = False) -> List[Dict[str, Any]]:
+    acc = state.account(uid)
+    items = []
+    for i in range(state.offers):
+        offerid = f"{prefix}_offer{i}"
+        item = {
+            "offerId": offerid,
+            "hash": f"h{abs(hash(offerid)) % 10 ** 12:012d}",
+            "title": f"活动 {prefix} #{i}",
+            "points": 10,
+            "isCompleted": offerid in acc["done"],
+            "isLocked": False,
+            "isUnlocked": True,
+            "isPromotional": "$undefined",
+            "destination": "https://www.bing.com/search?q=bench",
+        }
+        if with_date:
+            item["dailySetDate"] = date.today().strftime("%m/%d/%Y")
+        items.append(item)
+    return items
+
+def build_earn_rsc(state: StandInState, uid: str) -> str:
+    cards = _offer_items(state, uid, "ENUS_bench_earn")
+    cards.append({
+        "offerId": "bench_global_punchcard", "hash": "hpunch", "title": "Punch Card", "points": 50,
+        "isCompleted": False, "isLocked": False, "href": "/earn/quest/bench_global_punchcard",
+    })
+    head = f'0:["$","$L1",null,{{"href":"/earn/quest/bench_global_punchcard","activityCards":{json.dumps(cards, ensure_ascii=False)}}}]\n'
+    return head + state._filler
+
+def build_dashboard_rsc(state: StandInState, uid: str) -> str:
+    items = _offer_items(state, uid, "Gamification_DailySet_bench", with_date=True)
+    head = f'0:["$","$L1",null,{{"dailySetItems":{json.dumps(items, ensure_ascii=False)}}}]\n'
+    return head + state._filler
+
+def build_punchcard_rsc(state: StandInState, uid: str) -> str:
+    acc = state.account(uid)
+    children = []
+    for i in range(state.punch_children):
+        offerid = f"bench_pcchild{i}_punchcard"
+        children.append({
+            "aria-label": f"打卡子任务 {i}",
+            "href": f"/earn/quest/bench_global_punchcard/{i}",
+            "offerId": offerid,
+            "hash": f"hc{i:06d}",
+            "isCompleted": offerid in acc["done"],
+            "isLocked": False,
+        })
+    head = f'0:["$","$L1",null,{{"children":{json.dumps(children, ensure_ascii=False)}}}]\n'
+    return head + state._filler[: len(state._filler) // 4]
+
+def build_promotions(state: StandInState, uid: str, channel: str) -> Dict[str, Any]:
+    acc = state.account(uid)
+    if channel == "edge":
+        promotions = [{"name": "edge_browsing_streak_flight", "attributes": {
+            "offerid": "DailyCheckIn_Edge", "progress": acc["edge"], "max": state.EDGE_MAX,
+            "complete": acc["edge"] >= state.EDGE_MAX, "report_per_minutes": 5,
+        }}]
+    else:
+        today = date.today().strftime("%m/%d/%Y")
+        promotions = [
+            {"name": "level_info", "attributes": {"points_per_pc_search": 3, "todays_points": acc["balance"] - 10000}},
+            {"name": "bench_search_PC", "attributes": {
+                "offerid": "bench_pcsearch", "Classification.Tag": "PCSearch",
+                "progress": acc["pc"], "max": state.PC_SEARCH_MAX, "complete": acc["pc"] >= state.PC_SEARCH_MAX,
+            }},
+            {"name": "readarticle", "attributes": {
+                "offerid": "ENUS_readarticle3_30points", "progress": acc["read"], "max": state.READ_MAX,
+            }},
+        ]
+        for item in _offer_items(state, uid, "Gamification_DailySet_bench", with_date=True):
+            promotions.append({"name": item["offerId"], "attributes": {
+                "offerid": item["offerId"], "daily_set_date": today, "max": 10,
+                "complete": item["isCompleted"],
+            }})
+    return {"response": {"promotions": promotions}, "code": 0}
+
+# ==================== 替身 HTTP 服务 ====================
+class StandInHandler(BaseHTTPRequestHandler):
+    """按原始域名 + 路径分发到各替身接口"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 头部和正文分两次写出，避免 Nagle + 延迟确认带来的 40ms 停顿
+    state: StandInState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def _uid(self) -> str:
+        auth = self.headers.get("Authorization", "")
+        match = re.search(r"at-(\d+)", auth) or re.search(r"bench_uid=(\d+)", self.headers.get("Cookie", ""))
+        return match.group(1) if match else "0"
+
+    def _body(self) -> str:
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        return self.rfile.read(length).decode("utf-8", "replace") if length else ""
+
+    def _send(self, endpoint: str, body: Any, status: int = 200, content_type: str = "application/json"):
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body, ensure_ascii=False)
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.state.record(endpoint, len(data))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        host = self.headers.get(BENCH_HOST_HEADER, "")
+        parts = urlsplit(self.path)
+        path, query = parts.path, parse_qs(parts.query)
+        uid = self._uid()
+        state = self.state
+
+        if host == "rewards.bing.com":
+            if method == "POST":
+                match = re.search(r'"offerid"\s*:\s*"([^"]+)"', self._body())
+                if match:
+                    with state.lock:
+                        newly_done = match.group(1) not in state.account(uid)["done"]
+                        state.account(uid)["done"].add(match.group(1))
+                    if newly_done:
+                        state.earn(uid, 10)
+                return self._send("rewards:action", '0:{"a":"$@1"}\n1:true\n', content_type="text/x-component")
+            if "_rsc" not in query:
+                acc = state.account(uid)
+                html = f'<script>self.__next_f.push([1,"{{\\"balance\\":{acc["balance"]},\\"children\\":\\"bench{uid}@example.com\\"}}"])</script>'
+                return self._send("rewards:dashboard", html, content_type="text/html")
+            if path.startswith("/earn/quest"):
+                return self._send("rewards:punchcard", build_punchcard_rsc(state, uid), content_type="text/x-component")
+            if path == "/dashboard":
+                return self._send("rewards:dashboard_rsc", build_dashboard_rsc(state, uid), content_type="text/x-component")
+            return self._send("rewards:earn_rsc", build_earn_rsc(state, uid), content_type="text/x-component")
+
+        if host == "login.live.com":
+            match = re.search(r"refresh_token=rt-(\d+)", self._body())
+            token_uid = match.group(1) if match else "0"
+            return self._send("oauth:token", {
+                "access_token": f"at-{token_uid}", "refresh_token": f"rt-{token_uid}", "expires_in": 3600
+            })
+
+        if host == "prod.rewardsplatform.microsoft.com":
+            if method == "GET":
+                channel = query.get("channel", ["SAAndroid"])[0]
+                return self._send(f"dapi:me?channel={channel}", build_promotions(state, uid, channel))
+            payload = json.loads(self._body() or "{}")
+            acc = state.account(uid)
+            activity_type = str(payload.get("type"))
+            points = 0
+            with state.lock:
+                if activity_type == "101" and acc["read"] < state.READ_MAX:
+                    acc["read"] += 1
+                    points = 1
+                elif activity_type == "103" and not acc["signed"]:
+                    acc["signed"] = True
+                    points = 5
+                elif activity_type == "29" and acc["edge"] < state.EDGE_MAX:
+                    acc["edge"] += 5
+                    points = 10 if acc["edge"] >= state.EDGE_MAX else 0
+                acc["balance"] += points
+            return self._send("dapi:activities", {"response": {"balance": acc["balance"], "activity": {"p": points}}, "code": 0})
+
+        if host == "cn.bing.com":
+            if path == "/search":
+                html = '<html><script>_G={IG:"BENCHIG0001"};_G.AppVer="12345678";var data_iid="SERP.5047";</script></html>'
+                return self._send("bing:search", html, content_type="text/html")
+            if path == "/rewardsapp/reportActivity":
+                self._body()
+                with state.lock:
+                    acc = state.account(uid)
+                    if acc["pc"] < state.PC_SEARCH_MAX:
+                        acc["pc"] += 3
+                        acc["balance"] += 3
+                return self._send("bing:report", "", content_type="text/plain")
+            self._body()
+            return self._send("bing:ncheader", "", content_type="text/plain")
+
+        # 其余域名视为热搜源
+        return self._send("hotwords", {"data": [{"title": f"基准热词{i}"} for i in range(50)]})
+
+def start_stand_in(state: StandInState) -> ThreadingHTTPServer:
+    handler = type("BoundStandInHandler", (StandInHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stand-in", daemon=True).start()
+    return server
+
+# ==================== 请求重定向与虚拟时钟 ====================
+def install_redirect(port: int):
+    """让所有 HTTPAdapter（含脚本的共享连接池）把外部域名改写到替身服务"""
+    from requests.adapters import HTTPAdapter
+
+    original_send = HTTPAdapter.send
+
+    def redirected_send(adapter, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.headers[BENCH_HOST_HEADER] = parts.netloc
+        request.url = f"http://127.0.0.1:{port}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        return original_send(adapter, request, **kwargs)
+
+    HTTPAdapter.send = redirected_send
+
+class VirtualClock:
+    """按比例缩短 sleep，同时把被跳过的时间计入 monotonic/time，保证按时间戳调度的逻辑照常推进"""
+
+    def __init__(self, scale: float = 0.0):
+        self.scale = max(0.0, scale)
+        self.offset = 0.0
+        self.lock = threading.Lock()
+
+    def _skip(self, seconds: float) -> float:
+        if not seconds or seconds <= 0:
+            return 0.0
+        with self.lock:
+            self.offset += seconds * (1 - self.scale)
+        return seconds * self.scale
+
+    def time_module(self):
+        clock = self
+
+        class _Time:
+            def __getattr__(self, name):
+                return getattr(time, name)
+
+            @staticmethod
+            def sleep(seconds):
+                time.sleep(clock._skip(seconds))
+
+            @staticmethod
+            def monotonic():
+                return time.monotonic() + clock.offset
+
+            @staticmethod
+            def time():
+                return time.time() + clock.offset
+
+        return _Time()
+
+    def asyncio_module(self):
+        clock = self
+
+        class _Asyncio:
+            def __getattr__(self, name):
+                return getattr(asyncio, name)
+
+            @staticmethod
+            async def sleep(seconds, result=None):
+                return await asyncio.sleep(clock._skip(seconds), result)
+
+        return _Asyncio()
+
+# ==================== 子进程：单次基准 ====================
+def run_child(args) -> Dict[str, Any]:
+    """在临时工作目录中运行单次基准；--keep 时保留目录供排查缓存文件"""
+    if args.keep:
+        workdir = tempfile.mkdtemp(prefix="bing_bench_")
+        print(f"工作目录已保留: {workdir}", file=sys.stderr)
+        return _run_child_in(args, workdir)
+    with tempfile.TemporaryDirectory(prefix="bing_bench_") as workdir:
+        try:
+            return _run_child_in(args, workdir)
+        finally:
+            os.chdir(SCRIPT_DIR)  # 离开工作目录，便于删除
+
+def _run_child_in(args, workdir: str) -> Dict[str, Any]:
+    """在当前进程内启动替身服务并运行 RewardsBot，返回统计结果"""
+    os.chdir(workdir)  # 缓存文件为相对路径，落在临时目录中
+    sys.path.insert(0, SCRIPT_DIR)
+
+    for key in list(os.environ):
+        if key.startswith(("bing_ck_", "bing_token_")):
+            del os.environ[key]
+    for i in range(1, args.child + 1):
+        os.environ[f"bing_ck_{i}"] = f"bench_uid={i}; tifacfaatcs=bench; _U=bench{i}"
+        os.environ[f"bing_token_{i}"] = f"rt-{i}"
+
+    state = StandInState(rsc_kb=args.rsc_kb, offers=args.offers)
+    server = start_stand_in(state)
+    install_redirect(server.server_address[1])
+
+    import Bing_Rewards as br
+
+    clock = VirtualClock(args.delay_scale)
+    br.time = clock.time_module()
+    br.asyncio = clock.asyncio_module()
+    br.config.ASYNC_ENGINE = args.async_engine
+
+    parsed = {"bytes": 0, "streams": 0}
+    parsed_lock = threading.Lock()
+    original_index_init = br.RscStreamIndex.__init__
+
+    original_from_stream = br.RscStreamIndex.from_stream.__func__
+
+    def counting_index_init(index, text):
+        if text:
+            with parsed_lock:
+                parsed["bytes"] += len(text.encode("utf-8"))
+                parsed["streams"] += 1
+        original_index_init(index, text)
+
+    def counting_from_stream(cls, chunks, keep=()):
+        index = original_from_stream(cls, chunks, keep)
+        with parsed_lock:
+            parsed["bytes"] += index.bytes_seen
+            parsed["streams"] += 1
+        return index
+
+    br.RscStreamIndex.__init__ = counting_index_init
+    br.RscStreamIndex.from_stream = classmethod(counting_from_stream)
+
+    # 同一进程内连续运行多次，模拟一天内的重复执行（缓存与替身服务状态保留）
+    runs: List[Dict[str, Any]] = []
+    quiet = open(os.devnull, "w", encoding="utf-8")
+    stdout = sys.stdout
+    try:
+        if not args.verbose:
+            sys.stdout = quiet
+        for _ in range(max(1, args.runs)):
+            requests_before = sum(state.requests.values())
+            parsed_before = parsed["bytes"]
+            started = time.perf_counter()
+            br.RewardsBot().run()
+            runs.append({
+                "wall_seconds": round(time.perf_counter() - started, 3),
+                "requests_total": sum(state.requests.values()) - requests_before,
+                "rsc_bytes_parsed": parsed["bytes"] - parsed_before,
+            })
+    finally:
+        br.logger.flush()
+        sys.stdout = stdout
+        quiet.close()
+    server.shutdown()
+
+    return {
+        "accounts": args.child,
+        "runs": runs,
+        "wall_seconds": round(sum(run["wall_seconds"] for run in runs), 3),
+        "virtual_seconds_skipped": round(clock.offset, 1),
+        "requests": dict(sorted(state.requests.items())),
+        "requests_total": sum(state.requests.values()),
+        "bytes_served": sum(state.bytes_out.values()),
+        "connections": state.connections,
+        "rsc_bytes_parsed": parsed["bytes"],
+        "rsc_streams_parsed": parsed["streams"],
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "client_metrics": br.global_request_metrics.to_dict()["endpoints"],
+    }
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+# ==================== 父进程：汇总报告 ====================
+def run_bench(args) -> List[Dict[str, Any]]:
+    results = []
+    for count in [int(x) for x in args.accounts.split(",") if x.strip()]:
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", str(count),
+               "--rsc-kb", str(args.rsc_kb), "--offers", str(args.offers),
+               "--delay-scale", str(args.delay_scale), "--runs", str(args.runs)]
+        if args.async_engine:
+            cmd.append("--async-engine")
+        if args.verbose:
+            cmd.append("--verbose")
+        if args.keep:
+            cmd.append("--keep")
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            print(f"账号数 {count} 运行失败，退出码 {proc.returncode}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(
+            f"账号 {count:>3} | 耗时 {result['wall_seconds']:>7.2f}s | 请求 {result['requests_total']:>5} | "
+            f"连接 {result['connections']:>4} | "
+            f"返回 {result['bytes_served'] / 1024 / 1024:>7.2f}MB | RSC解析 {result['rsc_bytes_parsed'] / 1024 / 1024:>7.2f}MB"
+            f"（{result['rsc_streams_parsed']} 个流） | 峰值RSS {result['peak_rss_mb']:>6.1f}MB"
+        )
+        if len(result["runs"]) > 1:
+            for i, run in enumerate(result["runs"], 1):
+                print(f"    第{i}次运行: 耗时 {run['wall_seconds']:.2f}s | 请求 {run['requests_total']} | "
+                      f"RSC解析 {run['rsc_bytes_parsed'] / 1024 / 1024:.2f}MB")
+        for endpoint, n in result["requests"].items():
+            print(f"    {endpoint:<28} {n:>6}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Bing Rewards 本地替身服务性能基准")
+    parser.add_argument("--accounts", default="1,5,20", help="逗号分隔的账号数列表")
+    parser.add_argument("--rsc-kb", type=int, default=400, help="每个 RSC 流的填充体积（KB）")
+    parser.add_argument("--offers", type=int, default=12, help="每个 earn/dashboard 流中的任务数")
+    parser.add_argument("--delay-scale", type=float, default=0.0, help="等待时间缩放比例，0 表示不等待")
+    parser.add_argument("--runs", type=int, default=1, help="每个账号数连续运行的次数（模拟当天重复执行）")
+    parser.add_argument("--async-engine", action="store_true", help="使用 asyncio 调度器")
+    parser.add_argument("--json", help="将报告写入 JSON 文件")
+    parser.add_argument("--verbose", action="store_true", help="输出脚本自身日志")
+    parser.add_argument("--keep", action="store_true", help="保留每次运行的临时工作目录（缓存与日志文件）")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(args)
+        print(json.dumps(result, ensure_ascii=False))
+        return
+
+    results = run_bench(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
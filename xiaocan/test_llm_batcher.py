@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+LlmBatcher 跨账号合并测试：本地 http.server 充当大模型接口，记录每次请求的题目ID。
+
+运行: python -m unittest xiaocan/test_llm_batcher.py  (或 pytest)
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+
+def load_football():
+    name = "xc_football_under_test"
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            name, os.path.join(SCRIPT_DIR, "小蚕全民足球赛v1.02.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+class StubLlm(BaseHTTPRequestHandler):
+    """按 OpenAI chat/completions 格式应答，每题都选 index=id%2+1"""
+
+    calls = []
+    status = 200
+    delay = 0.2
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        questions = json.loads(prompt.split("\n", 1)[1])
+        ids = [q["id"] for q in questions]
+        type(self).calls.append(ids)
+        time.sleep(self.delay)
+        if self.status != 200:
+            self.send_response(self.status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        answers = {str(i): i % 2 + 1 for i in ids}
+        out = json.dumps(
+            {"choices": [{"message": {"content": json.dumps({"answers": answers})}}]}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+def question(qid):
+    return {
+        "id": qid,
+        "content": f"题目{qid}",
+        "options": [{"index": 1, "content": "甲"}, {"index": 2, "content": "乙"}],
+    }
+
+
+class LlmBatcherTest(unittest.TestCase):
+    WINDOW = 1.0
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubLlm)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.fb = load_football()
+        cls.saved = {
+            key: getattr(cls.fb, key)
+            for key in ("LLM_API_KEY", "LLM_API_URL", "LLM_MAX_RETRIES", "thread_safe_print")
+        }
+        cls.fb.LLM_API_KEY = "sk-test"
+        cls.fb.LLM_API_URL = f"http://127.0.0.1:{cls.server.server_port}/v1/chat/completions"
+        cls.fb.LLM_MAX_RETRIES = 1
+        cls.fb.thread_safe_print = lambda *args, **kwargs: None
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        for key, value in cls.saved.items():
+            setattr(cls.fb, key, value)
+
+    def setUp(self):
+        StubLlm.calls = []
+        StubLlm.status = 200
+        self.batcher = self.fb.LlmBatcher(self.WINDOW, 30, concurrency=4)
+
+    def ask_staggered(self, question_lists, stagger=0.1):
+        """各调用者错开 stagger 秒进入，返回 [答案或异常]"""
+        results = [None] * len(question_lists)
+
+        def worker(i, questions):
+            time.sleep(i * stagger)
+            try:
+                results[i] = self.batcher.ask(questions)
+            except Exception as exc:
+                results[i] = exc
+
+        threads = [
+            threading.Thread(target=worker, args=(i, questions))
+            for i, questions in enumerate(question_lists)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return results
+
+    def test_staggered_callers_share_one_request(self):
+        results = self.ask_staggered([[question(1), question(2)], [question(3)], [question(4)]])
+        self.assertEqual(len(StubLlm.calls), 1)
+        self.assertEqual(sorted(StubLlm.calls[0]), [1, 2, 3, 4])
+        self.assertTrue(all(isinstance(r, dict) for r in results))
+
+    def test_shared_question_ids_are_sent_once(self):
+        self.ask_staggered([[question(1), question(2)], [question(2), question(3)], [question(1)]])
+        self.assertEqual(len(StubLlm.calls), 1)
+        self.assertEqual(sorted(StubLlm.calls[0]), [1, 2, 3])
+
+    def test_each_caller_gets_only_its_answers(self):
+        results = self.ask_staggered([[question(1), question(2)], [question(2), question(3)]])
+        self.assertEqual(results[0], {"1": 2, "2": 1})
+        self.assertEqual(results[1], {"2": 1, "3": 2})
+
+    def test_error_reaches_every_caller(self):
+        StubLlm.status = 500
+        results = self.ask_staggered([[question(1)], [question(2)], [question(3)]])
+        self.assertEqual(len(StubLlm.calls), 1)
+        for result in results:
+            self.assertIsInstance(result, self.fb.requests.HTTPError)
+
+    def test_single_thread_skips_window(self):
+        self.batcher.set_concurrency(1)
+        start = time.monotonic()
+        self.assertEqual(self.batcher.ask([question(5)]), {"5": 2})
+        self.assertLess(time.monotonic() - start, self.WINDOW)
+        self.assertEqual(StubLlm.calls, [[5]])
+
+    def test_all_threads_joined_flushes_early(self):
+        self.batcher.set_concurrency(2)
+        start = time.monotonic()
+        results = self.ask_staggered([[question(1)], [question(2)]])
+        self.assertLess(time.monotonic() - start, self.WINDOW)
+        self.assertEqual(StubLlm.calls, [[1, 2]])
+        self.assertEqual(results, [{"1": 2}, {"2": 1}])
+
+    def test_full_batch_flushes_early(self):
+        self.batcher = self.fb.LlmBatcher(self.WINDOW, 3, concurrency=4)
+        start = time.monotonic()
+        results = self.ask_staggered([[question(1), question(2)], [question(3)]], stagger=0.05)
+        self.assertLess(time.monotonic() - start, self.WINDOW)
+        self.assertEqual(results[1], {"3": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+小蚕网关公共客户端 (gw / gwh.xiaocantech.com)
+
+各小蚕脚本共用的签名 RPC 实现:
+  - 每个账号一个 keep-alive Session，连接在整次运行中复用
+  - x-ashe 的内层 md5(lower(server.method)) 按方法只算一次
+  - 统一的响应解码与 status 判断
+
+签名规则:
+  x-garen = 毫秒时间戳
+  x-nami  = 4位随机hex + silk_id + 随机hex 补足到 nami_length
+  x-ashe  = md5(md5(lower(server.method)) + x-garen + x-nami)
+"""
+
+import hashlib
+import json
+import time
+import uuid
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+GW_URL = "https://gw.xiaocantech.com/rpc"
+GWH_URL = "https://gwh.xiaocantech.com/rpc"
+
+DEFAULT_TIMEOUT = 15
+DEFAULT_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+
+
+# ── 签名 ────────────────────────────────────────────────────
+
+
+def md5_hex(text: str) -> str:
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def method_digest(server: str, method: str) -> str:
+    """x-ashe 内层摘要 md5(lower(server.method))，每个方法只计算一次"""
+    return md5_hex(f"{server}.{method}".lower())
+
+
+def make_nami(silk_id: str, length: int = 20) -> str:
+    rid = uuid.uuid4().hex
+    tail = max(0, length - len(silk_id) - 4)
+    return rid[:4] + silk_id + rid[4:4 + tail]
+
+
+def sign(server: str, method: str, silk_id: str, nami_length: int = 20) -> dict:
+    """返回单次请求的动态签名头 (methodname / x-nami / x-garen / x-ashe)"""
+    nami = make_nami(silk_id, nami_length)
+    garen = str(int(time.time() * 1000))
+    return {
+        "methodname": method,
+        "x-nami": nami,
+        "x-garen": garen,
+        "x-ashe": md5_hex(method_digest(server, method) + garen + nami),
+    }
+
+
+# ── 响应解码 ────────────────────────────────────────────────
+
+
+class RpcError(RuntimeError):
+    """接口 status.code 非 0"""
+
+    def __init__(self, method: str, code, msg: str, result: dict):
+        super().__init__(f"{method}: code={code} {msg}".rstrip())
+        self.method = method
+        self.code = code
+        self.msg = msg
+        self.result = result
+
+
+def decode(response: requests.Response, method: str = "") -> dict:
+    """校验 HTTP 状态并解析为 dict，非法 JSON / 非对象统一抛 ValueError"""
+    response.raise_for_status()
+    try:
+        result = response.json()
+    except ValueError as exc:
+        raise ValueError(f"接口返回不是合法 JSON: {method}") from exc
+    if not isinstance(result, dict):
+        raise ValueError(f"接口返回格式异常: {method}")
+    return result
+
+
+def status_of(result: dict) -> tuple:
+    """返回 (code, msg)，缺失 status 时 code 为 -1"""
+    status = result.get("status") if isinstance(result, dict) else None
+    if not isinstance(status, dict):
+        return -1, ""
+    return status.get("code", -1), status.get("msg", "")
+
+
+def is_ok(result: dict) -> bool:
+    return status_of(result)[0] == 0
+
+
+# ── 客户端 ──────────────────────────────────────────────────
+
+
+def build_adapter(retries: int = 2, backoff: float = 0.5,
+                  status_forcelist=DEFAULT_STATUS_FORCELIST,
+                  pool_size: int = 10) -> HTTPAdapter:
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        backoff_factor=backoff,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset(["POST"]),
+    ) if retries else 0
+    return HTTPAdapter(max_retries=retry, pool_connections=2, pool_maxsize=pool_size)
+
+
+def new_session(retries: int = 2, backoff: float = 0.5,
+                status_forcelist=DEFAULT_STATUS_FORCELIST,
+                pool_size: int = 10) -> requests.Session:
+    """单账号的 keep-alive Session，gw / gwh 两个网关各自保有连接"""
+    session = requests.Session()
+    session.mount("https://", build_adapter(retries, backoff, status_forcelist, pool_size))
+    return session
+
+
+class XiaocanClient:
+    """
+    单个账号的网关会话：固定请求头挂在 Session 上，每次只补动态签名。
+
+    传入 session 时复用调用方的连接 (如多个活动共用一个账号会话)，
+    此时固定请求头随每次请求发送，不改动共享 Session；
+    retries / backoff / status_forcelist / pool_size 只作用于自建会话，
+    共享会话的重试策略由创建方决定 (见 new_session)。
+    """
+
+    def __init__(self, silk_id: str, base_headers: dict, server: str,
+                 url: str = GW_URL, timeout: float = DEFAULT_TIMEOUT,
+                 nami_length: int = 20, retries: int = 2, backoff: float = 0.5,
+                 status_forcelist=DEFAULT_STATUS_FORCELIST, pool_size: int = 10,
+                 session: requests.Session = None):
+        self.silk_id = silk_id
+        self.server = server
+        self.url = url
+        self.timeout = timeout
+        self.nami_length = nami_length
+        self.owns_session = session is None
+        if self.owns_session:
+            session = new_session(retries, backoff, status_forcelist, pool_size)
+            session.headers.update(base_headers)
+            self.base_headers = None
+        else:
+            self.base_headers = dict(base_headers)
+        self.session = session
+
+    def signed_headers(self, method: str, server: str = None) -> dict:
+        server = server or self.server
+        headers = sign(server, method, self.silk_id, self.nami_length)
+        if server != self.server:
+            headers["servername"] = server
+        if self.base_headers:
+            headers = {**self.base_headers, **headers}
+        return headers
+
+    def post(self, method: str, body: dict, server: str = None,
+             timeout: float = None) -> requests.Response:
+        payload = json.dumps(body, separators=(",", ":"), ensure_ascii=False)
+        return self.session.post(
+            self.url,
+            headers=self.signed_headers(method, server),
+            data=payload.encode("utf-8"),
+            timeout=timeout or self.timeout,
+        )
+
+    def rpc(self, method: str, body: dict, server: str = None,
+            check: bool = False) -> dict:
+        """发送签名请求并解码；check=True 时 status.code 非 0 抛 RpcError"""
+        result = decode(self.post(method, body, server), method)
+        if check:
+            code, msg = status_of(result)
+            if code != 0:
+                raise RpcError(method, code, msg, result)
+        return result
+
+    def close(self):
+        if self.owns_session:
+            self.session.close()
@@ -25,20 +25,17 @@
   因使用本脚本产生的风险由使用者自行承担。
 """
 
-import hashlib
-import json
 import os
 import sys
 import threading
 import time
-import uuid
 from collections import defaultdict
 from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from xiaocan_client import XiaocanClient, is_ok, status_of
 
 # ── 配置常量 ─────────────────────────────────────────────
 RPC_URL = "https://gw.xiaocantech.com/rpc"
@@ -75,16 +72,12 @@ def colored(text, *codes):
     return f"{prefix}{text}{_C['RST']}" if prefix else text
 
 
-def md5(text: str) -> str:
-    return hashlib.md5(text.encode()).hexdigest()
-
-
 # ── 认证解析 ─────────────────────────────────────────────
 
 class GrabAccount:
     """单个账号的认证信息"""
 
-    __slots__ = ("user_id", "silk_id", "token", "label", "color")
+    __slots__ = ("user_id", "silk_id", "token", "label", "color", "client")
 
     def __init__(self, cookie: str, index: int = 1, total: int = 1):
         parts = cookie.strip().split("#")
@@ -110,6 +103,13 @@ class GrabAccount:
         self.token = token
         self.label = note if note else (f"账号{index}" if total > 1 else f"账号{index}")
         self.color = _ACC_COLORS[(index - 1) % len(_ACC_COLORS)]
+        # 同一账号的查询、预热与发射共用一个连接池，预热建立的连接直接用于发射
+        self.client = XiaocanClient(
+            silk_id, self.build_base_headers(), SERVER_NAME,
+            url=RPC_URL, timeout=HTTP_TIMEOUT,
+            retries=1, backoff=0.1, status_forcelist=(429, 500, 502, 503),
+            pool_size=50,
+        )
 
     def build_base_headers(self) -> dict:
         """构建该账号的基础请求头（不含签名）"""
@@ -147,34 +147,6 @@ def parse_accounts(cookie_text: str) -> list[GrabAccount]:
     return accounts
 
 
-# ── 签名生成 ─────────────────────────────────────────────
-
-def generate_x_nami(silk_id: str) -> str:
-    """X-Nami: 4字节随机前缀 + silk_id + 随机后缀"""
-    rid = uuid.uuid4().hex
-    tail_len = max(0, 20 - len(silk_id) - 4)
-    return rid[:4] + silk_id + rid[4:4 + tail_len]
-
-
-def generate_x_ashe(server: str, method: str, x_garen: str, x_nami: str) -> str:
-    """X-Ashe: md5(md5(service.method) + x_garen + x_nami)"""
-    service_method = f"{server}.{method}".lower()
-    return md5(md5(service_method) + x_garen + x_nami)
-
-
-def build_signed_headers(base_headers: dict, method_name: str,
-                         silk_id: str) -> dict:
-    """在基础请求头上注入动态签名"""
-    headers = dict(base_headers)
-    headers["methodname"] = method_name
-    x_nami = generate_x_nami(silk_id)
-    x_garen = str(int(time.time() * 1000))
-    headers["x-nami"] = x_nami
-    headers["x-garen"] = x_garen
-    headers["x-ashe"] = generate_x_ashe(SERVER_NAME, method_name, x_garen, x_nami)
-    return headers
-
-
 # ── 服务器时间校准 ───────────────────────────────────────
 
 def sync_server_time() -> tuple:
@@ -209,36 +181,13 @@ def get_calibrated_time(offset: float) -> float:
     return time.time() + offset
 
 
-# ── HTTP Session ─────────────────────────────────────────
-
-def create_session() -> requests.Session:
-    session = requests.Session()
-    retry = Retry(
-        total=1, connect=1, read=1, backoff_factor=0.1,
-        status_forcelist=(429, 500, 502, 503),
-        allowed_methods=frozenset(["POST"]),
-    )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=50, pool_maxsize=50)
-    session.mount("https://", adapter)
-    return session
-
-
 # ── API 调用 ─────────────────────────────────────────────
 
-def check_inventory(session: requests.Session,
-                    account: GrabAccount) -> tuple:
+def check_inventory(account: GrabAccount) -> tuple:
     """返回 (ok, inventory, start_time)"""
     try:
-        headers = build_signed_headers(
-            account.build_base_headers(), CHECK_METHOD, account.silk_id
-        )
-        payload = json.dumps({"silk_id": int(account.silk_id)},
-                            separators=(",", ":"))
-        resp = session.post(RPC_URL, headers=headers, data=payload,
-                           timeout=HTTP_TIMEOUT)
-        result = resp.json()
-        status = result.get("status", {})
-        if status.get("code") == 0:
+        result = account.client.rpc(CHECK_METHOD, {"silk_id": int(account.silk_id)})
+        if is_ok(result):
             ei = result.get("event_info", {})
             return True, ei.get("inventory", -1), ei.get("start_time", 0)
         return False, -1, 0
@@ -247,20 +196,10 @@ def check_inventory(session: requests.Session,
         return False, -1, 0
 
 
-def grab_free_order(session: requests.Session,
-                    account: GrabAccount) -> tuple:
+def grab_free_order(account: GrabAccount) -> tuple:
     """返回 (success, message)"""
-    headers = build_signed_headers(
-        account.build_base_headers(), GRAB_METHOD, account.silk_id
-    )
-    payload = json.dumps({"silk_id": int(account.silk_id)},
-                        separators=(",", ":"))
-    resp = session.post(RPC_URL, headers=headers, data=payload,
-                       timeout=HTTP_TIMEOUT)
-    result = resp.json()
-    status = result.get("status", {})
-    code = status.get("code", -1)
-    msg = status.get("msg", "")
+    result = account.client.rpc(GRAB_METHOD, {"silk_id": int(account.silk_id)})
+    code, msg = status_of(result)
 
     if code == 0:
         info = result.get("info", {})
@@ -311,7 +250,6 @@ class AccountGrabber:
     def __init__(self, account: GrabAccount, n_threads: int):
         self.account = account
         self.n_threads = min(n_threads, 50)
-        self.base_headers = account.build_base_headers()
         self.results: list[FireResult] = []
         self.results_lock = threading.Lock()
 
@@ -323,18 +261,11 @@ class AccountGrabber:
                 ready_counter: list, ready_lock: threading.Lock,
                 barrier: threading.Barrier,
                 server_offset: float, target_ts: float, advance_ms: int):
-        session = create_session()
-
         try:
             # 预热
             try:
-                h = build_signed_headers(
-                    self.base_headers, CHECK_METHOD, self.account.silk_id
-                )
-                session.post(RPC_URL, headers=h,
-                            data=json.dumps({"silk_id": int(self.account.silk_id)},
-                                           separators=(",", ":")),
-                            timeout=HTTP_TIMEOUT)
+                self.account.client.post(
+                    CHECK_METHOD, {"silk_id": int(self.account.silk_id)})
             except Exception:
                 pass
 
@@ -359,7 +290,7 @@ class AccountGrabber:
 
             # 发射
             start = time.perf_counter()
-            success, message = grab_free_order(session, self.account)
+            success, message = grab_free_order(self.account)
             elapsed = (time.perf_counter() - start) * 1000
 
             with self.results_lock:
@@ -423,8 +354,7 @@ class MultiAccountGrabber:
         shared_start_time = None
         for grabber in self.grabbers:
             acc = grabber.account
-            session = create_session()
-            ok, inv, start_ts = check_inventory(session, acc)
+            ok, inv, start_ts = check_inventory(acc)
             if start_ts and not shared_start_time:
                 shared_start_time = start_ts
 
@@ -4,24 +4,26 @@
 用法:
   SET XC_THREADS=2          (可选，默认1)
   SET XC_LOTTERY=1          (可选，默认0不抽奖，设为1开启抽奖)
+  SET XC_PRIZE_CACHE_TTL=12 (可选，奖池映射磁盘缓存有效小时数，0 关闭落盘)
 
 xcplus 格式: 多个账户用 @ 或换行分隔，每账户格式为 备注名#user_id#silk_id#token
 """
 
 import os
 import sys
+import json
 import time
 import random
-import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding="utf-8", errors="replace")
 
-import requests
+from xiaocan_client import GW_URL, XiaocanClient
 
 # ── 常量 ────────────────────────────────────────────────────
-BASE_URL = "https://gw.xiaocantech.com/rpc"
+BASE_URL = GW_URL
 APP_ID = 20
 UA = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -30,37 +32,112 @@ UA = (
     "MiniProgramEnv/Windows WindowsWechat/WMPF "
     "WindowsWechat(0x63090a13) UnifiedPCWindowsWechat(0xf2541923) XWEB/19823"
 )
+PRIZE_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "xc_prize_map.json")
+PRIZE_CACHE_TTL = float(os.getenv("XC_PRIZE_CACHE_TTL", "12")) * 3600
+PRIZE_FETCH_THREADS = 4
+
+# ── 奖池缓存 ────────────────────────────────────────────────
+
+
+class PrizeMapCache:
+    """
+    奖池 图片文件名→奖品名称 映射的进程级缓存。
+
+    奖池是全局数据，与账户无关: 按活动 ID 缓存并落盘 (带 TTL)，
+    多个账户线程同时缺失同一活动时只由第一个线程拉取，其余等待其结果。
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pools = self._load()      # "活动ID" -> {"ts": 拉取时间, "prizes": {文件名: 名称}}
+        self._inflight: dict = {}       # 活动ID -> Future，正在拉取中的活动
+
+    def _load(self) -> dict:
+        if self.ttl <= 0:
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self):
+        if self.ttl <= 0:
+            return
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._pools, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def get(self, sess: "Session", ids: list) -> dict:
+        now = time.time()
+        sources = []        # 按 ids 顺序: 已缓存的映射 dict 或等待中的 Future
+        lead = []           # 本线程负责拉取的 (活动ID, Future)
+        with self._lock:
+            for aid in ids:
+                entry = self._pools.get(str(aid))
+                if entry and (self.ttl <= 0 or now - entry.get("ts", 0) < self.ttl):
+                    sources.append(entry["prizes"])
+                    continue
+                fut = self._inflight.get(aid)
+                if fut is None:
+                    fut = self._inflight[aid] = Future()
+                    lead.append((aid, fut))
+                sources.append(fut)
+
+        if lead:
+            self._fetch_all(sess, lead, now)
 
-# ── 签名 ────────────────────────────────────────────────────
-
-
-def _nami(silk_id: str) -> str:
-    """x-nami: 4位随机hex + silk_id + 随机hex 补足到20字符"""
-    rid = hashlib.md5(str(time.time_ns()).encode()).hexdigest()
-    tail = max(0, 20 - len(silk_id) - 4)
-    return rid[:4] + silk_id + rid[4:4 + tail]
-
-
-def _ashe(server: str, method: str, garen: str, nami: str) -> str:
-    """x-ashe: md5(md5(lower(server.method)) + x-garen + x-nami)"""
-    inner = hashlib.md5(f"{server}.{method}".lower().encode()).hexdigest()
-    return hashlib.md5((inner + garen + nami).encode()).hexdigest()
+        pm = {}
+        for src in sources:
+            pm.update(src.result() if isinstance(src, Future) else src)
+        return pm
 
+    def _fetch_all(self, sess: "Session", lead: list, now: float):
+        """并发拉取互不相关的奖池，结果写回缓存并唤醒等待的线程"""
+        results = {}
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(lead), PRIZE_FETCH_THREADS)) as pool:
+                futures = {pool.submit(sess.reward_pool_prizes, aid): aid for aid, _ in lead}
+                for fut in as_completed(futures):
+                    try:
+                        results[futures[fut]] = fut.result()
+                    except Exception:
+                        pass
+        finally:
+            with self._lock:
+                for aid, fut in lead:
+                    prizes = results.get(aid)
+                    if prizes is not None:
+                        self._pools[str(aid)] = {"ts": now, "prizes": prizes}
+                    del self._inflight[aid]
+                    fut.set_result(prizes or {})
+                if results:
+                    self._save()
+
+
+prize_cache = PrizeMapCache(PRIZE_CACHE_FILE, PRIZE_CACHE_TTL)
 
 # ── Session ─────────────────────────────────────────────────
 
 
 class Session:
-    """封装一个账户的 API 会话 (签名、RPC 调用)"""
+    """封装一个账户的 API 会话 (签名、RPC 调用)，连接在整个账户流程内复用"""
 
-    def __init__(self, user_id: str, silk_id: str, token: str):
+    def __init__(self, user_id: str, silk_id: str, token: str, session=None):
         self.uid = user_id
         self.sid = silk_id
         self.token = token
+        self.client = XiaocanClient(silk_id, self._headers(), "ActivityTask",
+                                    url=BASE_URL, retries=0, session=session)
 
-    def _headers(self, server: str, method: str) -> dict:
-        ts = str(int(time.time() * 1000))
-        n = _nami(self.sid)
+    def _headers(self) -> dict:
         return {
             "Host": "gw.xiaocantech.com",
             "Content-Type": "application/json",
@@ -68,27 +145,20 @@ class Session:
             "x-vayne": self.uid,
             "x-teemo": self.sid,
             "x-sivir": self.token,
-            "x-ashe": _ashe(server, method, ts, n),
-            "x-nami": n,
             "x-annie": "XC",
             "x-platform": "mini",
             "x-version": "3.16.4.13",
             "x-city": "430105",
             "x-model": "microsoft microsoft",
-            "x-garen": ts,
-            "servername": server,
-            "methodname": method,
+            "servername": "ActivityTask",
             "User-Agent": UA,
         }
 
     def rpc(self, server: str, method: str, body: dict) -> dict:
-        resp = requests.post(BASE_URL, json=body,
-                            headers=self._headers(server, method), timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
-        if data.get("status", {}).get("code") != 0:
-            raise RuntimeError(str(data))
-        return data
+        return self.client.rpc(method, body, server=server, check=True)
+
+    def close(self):
+        self.client.close()
 
     # ── 业务 API ─────────────────────────────────────────
 
@@ -115,24 +185,24 @@ class Session:
         return self.rpc("ActivityTask", "ActivityTaskMobileService.CollectPoints",
                         {"silk_id": int(self.sid), "app_id": APP_ID}).get("point", 0)
 
-    def load_prize_map(self, activity_ids: list, box_ids: list) -> dict:
-        """从活动奖池 + 宝箱奖池拉取 图片文件名→奖品名称 映射"""
-        all_ids = list(dict.fromkeys(activity_ids + box_ids))  # 去重保序
+    def reward_pool_prizes(self, activity_id) -> dict:
+        """拉取单个奖池的 图片文件名→奖品名称 映射"""
+        data = self.rpc("MarketingActivityApi", "ActivityApiService.RewardPools",
+                        {"activity_id": activity_id, "app_id": APP_ID})
         pm = {}
-        for aid in all_ids:
-            try:
-                data = self.rpc("MarketingActivityApi", "ActivityApiService.RewardPools",
-                                {"activity_id": aid, "app_id": APP_ID})
-                for p in data.get("data", {}).get("reward_pools", []):
-                    for k in ("prize_pic", "pic"):
-                        url = p.get(k, "")
-                        if url:
-                            fname = url.rsplit("/", 1)[-1].rsplit("?", 1)[0]
-                            pm[fname] = p.get("reward_name", fname)
-            except Exception:
-                pass
+        for p in data.get("data", {}).get("reward_pools", []):
+            for k in ("prize_pic", "pic"):
+                url = p.get(k, "")
+                if url:
+                    fname = url.rsplit("/", 1)[-1].rsplit("?", 1)[0]
+                    pm[fname] = p.get("reward_name", fname)
         return pm
 
+    def load_prize_map(self, activity_ids: list, box_ids: list) -> dict:
+        """活动奖池 + 宝箱奖池的 图片文件名→奖品名称 映射 (经进程级缓存)"""
+        all_ids = list(dict.fromkeys(activity_ids + box_ids))  # 去重保序
+        return prize_cache.get(self, all_ids)
+
 
 # ── 奖品名称解析 ────────────────────────────────────────────
 
@@ -165,8 +235,13 @@ def run_one(cookie: str, idx: int, total: int) -> str:
         return f"[{idx}/{total}] 账户格式错误(需 备注名#user_id#silk_id#token), 跳过"
 
     sess = Session(user_id, silk_id, token)
-    tag = f"[{idx}/{total}] {note or user_id}"
+    try:
+        return _run_session(sess, f"[{idx}/{total}] {note or user_id}")
+    finally:
+        sess.close()
+
 
+def _run_session(sess: Session, tag: str) -> str:
     # 1. 查询
     info = sess.user_info()
     li = sess.lottery_info()
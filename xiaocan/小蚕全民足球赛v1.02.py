@@ -11,6 +11,8 @@
 #     XC_FOOTBALL_LLM_API_KEY   大模型 API Key（sk-xxxx...）
 #     XC_FOOTBALL_LLM_API_URL   大模型接口地址，默认官方DeepSeek
 #     XC_FOOTBALL_LLM_MODEL     大模型名称（如deepseek-v4-pro）
+#     XC_FOOTBALL_LOCAL_QBANK   本地题库 SQLite 路径，默认脚本目录 xc_football_qbank.db
+#     XC_FOOTBALL_LLM_BATCH_WINDOW  多账号大模型请求合并等待秒数，默认2，0 关闭合并
 
 # 饱了么脚本交流群：476250706
 # 免责声明:
@@ -21,15 +23,15 @@ import hashlib
 import json
 import os
 import random
+import sqlite3
 import threading
 import time
-import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import date
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from xiaocan_client import XiaocanClient
 
 
 #   大模型答题配置，兼容 DeepSeek / 千问 DashScope OpenAI-compatible 接口
@@ -40,9 +42,15 @@ LLM_API_URL = os.getenv("XC_FOOTBALL_LLM_API_URL", "https://api.deepseek.com/v1/
 LLM_MODEL = os.getenv("XC_FOOTBALL_LLM_MODEL", "deepseek-chat")
 LLM_TIMEOUT = int(os.getenv("XC_FOOTBALL_LLM_TIMEOUT", "30"))
 LLM_MAX_RETRIES = 3
+LLM_BATCH_WINDOW = float(os.getenv("XC_FOOTBALL_LLM_BATCH_WINDOW", "2"))
+LLM_BATCH_MAX_QUESTIONS = 30
 QBANK_URL = os.getenv("XC_FOOTBALL_QBANK_URL", "http://106.53.12.120:34567").rstrip("/")
 QBANK_TOKEN = os.getenv("XC_FOOTBALL_QBANK_TOKEN", "")
 QBANK_TIMEOUT = int(os.getenv("XC_FOOTBALL_QBANK_TIMEOUT", "20"))
+LOCAL_QBANK_PATH = os.getenv(
+    "XC_FOOTBALL_LOCAL_QBANK",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "xc_football_qbank.db"),
+)
 
 RPC_URL = "https://gwh.xiaocantech.com/rpc"
 COOKIE_ENV = "xcplus"
@@ -97,22 +105,6 @@ def colored(text, *codes):
     return f"{prefix}{text}{ANSI_COLORS['RST']}" if prefix else text
 
 
-def md5_hex(text):
-    return hashlib.md5(text.encode()).hexdigest()
-
-
-def build_retry_adapter():
-    retry = Retry(
-        total=2,
-        connect=2,
-        read=2,
-        backoff_factor=0.5,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=frozenset({"POST"}),
-    )
-    return HTTPAdapter(max_retries=retry)
-
-
 def is_finished_task(task):
     status = task.get("status")
     if status is True or status == 1 or status == "1":
@@ -351,7 +343,76 @@ def ask_llm_for_answers(questions):
     return raw_answers
 
 
-def resolve_quiz_answers(questions):
+class LlmBatch:
+    __slots__ = ("questions", "callers", "full", "future")
+
+    def __init__(self):
+        self.questions = {}             # 题目ID -> 题目，跨账号去重
+        self.callers = 0
+        self.full = threading.Event()
+        self.future = Future()
+
+
+class LlmBatcher:
+    """
+    跨账号合并大模型答题请求。
+    第一个调用者开启一个批次并等待 window 秒 (题目数达到上限或所有答题线程都已并入时提前发送)，
+    期间其他账号线程的缺失题目并入同一批次，最终只发一次去重后的提示词，
+    每个调用者取回自己题目的答案。
+    同时答题的线程数为 1 (单线程或单账号) 时不会有人并入，直接请求不等待。
+    """
+
+    def __init__(self, window, max_questions, concurrency=None):
+        self.window = window
+        self.max_questions = max_questions
+        self.concurrency = concurrency  # 同时答题的账号线程数，None 表示未知
+        self.lock = threading.Lock()
+        self.batch = None
+
+    def set_concurrency(self, concurrency):
+        self.concurrency = concurrency
+
+    def ask(self, questions):
+        if self.window <= 0 or not LLM_API_KEY or (self.concurrency is not None and self.concurrency <= 1):
+            return ask_llm_for_answers(questions)
+
+        with self.lock:
+            batch = self.batch
+            leader = batch is None
+            if leader:
+                batch = self.batch = LlmBatch()
+            for question in questions:
+                batch.questions.setdefault(str(question.get("id")), question)
+            batch.callers += 1
+            everyone_joined = self.concurrency is not None and batch.callers >= self.concurrency
+            if len(batch.questions) >= self.max_questions or everyone_joined:
+                self.batch = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self.lock:
+                if self.batch is batch:
+                    self.batch = None
+            if batch.callers > 1:
+                thread_safe_print(
+                    f"  [LLM] 合并 {batch.callers} 个请求，共 {len(batch.questions)} 题"
+                )
+            try:
+                batch.future.set_result(ask_llm_for_answers(list(batch.questions.values())))
+            except BaseException as exc:
+                batch.future.set_exception(exc)
+
+        raw_answers = batch.future.result()
+        wanted = {str(question.get("id")) for question in questions}
+        return {key: value for key, value in raw_answers.items() if str(key) in wanted}
+
+
+llm_batcher = LlmBatcher(LLM_BATCH_WINDOW, LLM_BATCH_MAX_QUESTIONS)
+
+
+def resolve_remote_answers(questions):
+    """云题库 → 大模型，返回 (答案, 来自云题库的题目ID集合)"""
     answers = {}
     qbank_answers = {}
     try:
@@ -378,13 +439,13 @@ def resolve_quiz_answers(questions):
         else:
             missing_questions.append(question)
 
-    qbank_hit = len(questions) - len(missing_questions)
-    thread_safe_print(f"  [题库] 有效命中 {qbank_hit}/{len(questions)}，剩余 {len(missing_questions)} 题走LLM")
+    from_qbank = set(answers)
+    thread_safe_print(f"  [题库] 有效命中 {len(from_qbank)}/{len(questions)}，剩余 {len(missing_questions)} 题走LLM")
 
     if not missing_questions:
-        return answers
+        return answers, from_qbank
 
-    llm_answers = ask_llm_for_answers(missing_questions)
+    llm_answers = llm_batcher.ask(missing_questions)
     for question in missing_questions:
         raw_question_id = question.get("id")
         question_id = str(raw_question_id)
@@ -398,11 +459,175 @@ def resolve_quiz_answers(questions):
                 break
         if answer is not None:
             answers[question_id] = answer
-    return answers
+    return answers, from_qbank
+
+
+class LocalQuestionBank:
+    """
+    本地 SQLite 题库，按 (题目ID, 题干+选项摘要) 存答案。
+    同一 ID 题目内容变化时视为新题；提交后确认的答案 (verified) 不会被未确认答案覆盖。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS answers (
+                    question_id TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    answer_index INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    verified INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (question_id, content_hash)
+                )
+                """
+            )
+
+    @staticmethod
+    def key(question):
+        options = [
+            [option.get("index"), option.get("content")]
+            for option in question.get("options", []) or []
+        ]
+        digest = hashlib.md5(
+            json.dumps([question_text(question), options], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        return str(question.get("id")), digest
+
+    def lookup(self, question):
+        """只返回提交确认过或来自云题库的答案，未经确认的大模型答案不参与"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT answer_index FROM answers WHERE question_id = ? AND content_hash = ?"
+                " AND (verified = 1 OR source = 'qbank')",
+                self.key(question),
+            ).fetchone()
+        return normalize_answer(question, row[0]) if row else None
+
+    def save(self, question, answer, source, verified=False):
+        question_id, digest = self.key(question)
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO answers (question_id, content_hash, answer_index, source, verified, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (question_id, content_hash) DO UPDATE SET
+                    answer_index = excluded.answer_index,
+                    source = excluded.source,
+                    verified = excluded.verified,
+                    updated_at = excluded.updated_at
+                WHERE excluded.verified >= answers.verified
+                """,
+                (question_id, digest, int(answer), source, int(verified), time.time()),
+            )
+
+
+class QuizResolver:
+    """
+    题目答案解析：本地题库 → 云题库 → 大模型。
+    多个账号线程同时遇到同一未知题目时只由一个线程请求远端，其余线程等待结果；
+    本次运行内已解析过的题目 (包括远端也答不出的) 不再重复请求。
+    只有云题库答案和提交确认的答案写入本地题库，大模型的猜测只在本次运行内复用。
+    """
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.lock = threading.Lock()
+        self.inflight = {}      # key -> Future，正在远端解析的题目
+        self.settled = {}       # key -> 答案 (None 表示远端无答案)
+
+    def resolve(self, questions):
+        answers = {}
+        lead = []
+        waits = []
+        local_hit = 0
+        for question in questions:
+            question_id = str(question.get("id"))
+            answer = self.bank.lookup(question)
+            if answer is not None:
+                answers[question_id] = answer
+                local_hit += 1
+                continue
+            key = self.bank.key(question)
+            with self.lock:
+                if key in self.settled:
+                    if self.settled[key] is not None:
+                        answers[question_id] = self.settled[key]
+                    continue
+                future = self.inflight.get(key)
+                if future is None:
+                    future = self.inflight[key] = Future()
+                    lead.append((question, key, future))
+                else:
+                    waits.append((question_id, future))
+
+        thread_safe_print(
+            f"  [本地题库] 命中 {local_hit}/{len(questions)}，"
+            f"远端解析 {len(lead)} 题，等待其他账号 {len(waits)} 题"
+        )
+        if lead:
+            answers.update(self._resolve_remote(lead))
+        for question_id, future in waits:
+            answer = future.result()
+            if answer is not None:
+                answers[question_id] = answer
+        return answers
+
+    def _resolve_remote(self, lead):
+        try:
+            remote, from_qbank = resolve_remote_answers([question for question, _, _ in lead])
+        except BaseException as exc:
+            with self.lock:
+                for _, key, future in lead:
+                    del self.inflight[key]
+                    future.set_exception(exc)
+            raise
+
+        answers = {}
+        for question, _, _ in lead:
+            question_id = str(question.get("id"))
+            answer = remote.get(question_id)
+            if answer is not None:
+                answers[question_id] = answer
+                if question_id in from_qbank:
+                    self.bank.save(question, answer, "qbank")
+        with self.lock:
+            for question, key, future in lead:
+                answer = answers.get(str(question.get("id")))
+                self.settled[key] = answer
+                del self.inflight[key]
+                future.set_result(answer)
+        return answers
+
+    def confirm(self, question, answer):
+        """提交结果确认的正确答案，写入本地题库并覆盖本次运行内的结果"""
+        self.bank.save(question, answer, "submit", verified=True)
+        with self.lock:
+            self.settled[self.bank.key(question)] = answer
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def quiz_resolver():
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = QuizResolver(LocalQuestionBank(LOCAL_QBANK_PATH))
+        return _resolver
+
+
+def resolve_quiz_answers(questions):
+    return quiz_resolver().resolve(questions)
 
 
 class FootballBot:
-    def __init__(self, cookie, account_label="", color_code="C"):
+    def __init__(self, cookie, account_label="", color_code="C", session=None):
         user_id, silk_id, token, note = self.parse_cookie(cookie)
         self.user_id = user_id
         self.silk_id = silk_id
@@ -410,9 +635,11 @@ class FootballBot:
         self.note = note
         self.label = note or account_label
         self.color_code = color_code
-        self.session = requests.Session()
-        self.session.mount("https://", build_retry_adapter())
-        self.headers = self.build_base_headers()
+        self.client = XiaocanClient(
+            silk_id, self.build_base_headers(), SERVER_NAME,
+            url=RPC_URL, timeout=HTTP_TIMEOUT, nami_length=16,
+            session=session,
+        )
         self.success = True
 
     @staticmethod
@@ -447,13 +674,9 @@ class FootballBot:
             "x-platform": "iOS",
             "x-annie": "XC",
             "x-city": os.getenv("XC_FOOTBALL_CITY", "430102"),
-            "x-nami": "",
             "x-teemo": self.silk_id,
-            "x-garen": "",
             "x-sivir": self.token,
-            "x-ashe": "",
             "servername": SERVER_NAME,
-            "methodname": HOME_PAGE_METHOD,
             "content-type": "application/json",
             "accept": "application/json, text/plain, */*",
             "origin": "https://gw.hzaiguojiang.com",
@@ -465,44 +688,13 @@ class FootballBot:
             ),
         }
 
-    def refresh_auth_headers(self, method_name):
-        request_id = uuid.uuid4().hex
-        random_tail_length = max(0, 16 - len(self.silk_id) - 4)
-        x_nami = request_id[:4] + self.silk_id + request_id[4: 4 + random_tail_length]
-        x_garen = str(int(time.time() * 1000))
-        service_method = f"{SERVER_NAME}.{method_name}".lower()
-        x_ashe = md5_hex(md5_hex(service_method) + x_garen + x_nami)
-        self.headers.update(
-            {
-                "methodname": method_name,
-                "x-nami": x_nami,
-                "x-garen": x_garen,
-                "x-ashe": x_ashe,
-            }
-        )
-
     def base_payload(self, **extra):
         payload = {"silk_id": self.silk_id_as_int(), "channel": CHANNEL}
         payload.update(extra)
         return payload
 
     def rpc(self, method_name, data):
-        self.refresh_auth_headers(method_name)
-        payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
-        response = self.session.post(
-            RPC_URL,
-            headers=self.headers,
-            data=payload.encode("utf-8"),
-            timeout=HTTP_TIMEOUT,
-        )
-        response.raise_for_status()
-        try:
-            result = response.json()
-        except ValueError as exc:
-            raise ValueError(f"接口返回不是合法 JSON: {method_name}") from exc
-        if not isinstance(result, dict):
-            raise ValueError(f"接口返回格式异常: {method_name}")
-        return result
+        return self.client.rpc(method_name, data)
 
     def fetch_home_page(self):
         response = self.rpc(HOME_PAGE_METHOD, self.base_payload())
@@ -697,12 +889,16 @@ class FootballBot:
 
         wrong_question_ids = set()
         wrong_answers = response.get("answer_list") or []
-        for wrong in wrong_answers[:3]:
+        for index, wrong in enumerate(wrong_answers):
             question_id = pick_int(wrong, ("question_id",))
             if question_id is not None:
                 wrong_question_ids.add(question_id)
             question = question_by_id.get(question_id, {})
             correct_answer = normalize_answer(question, wrong.get("correct_answer"))
+            if question and correct_answer is not None:
+                quiz_resolver().confirm(question, correct_answer)
+            if index >= 3:
+                continue
             self._kv(
                 "错题",
                 (
@@ -720,6 +916,8 @@ class FootballBot:
                 continue
             answer = int(answer_str)
             question = question_by_id.get(qid_int, {})
+            if question:
+                quiz_resolver().confirm(question, answer)
             push_answer_to_qbank(question, answer)
 
         return True
@@ -810,6 +1008,7 @@ def main():
     cookies = [cookie.strip() for cookie in cookie_text.replace("\n", "@").split("@") if cookie.strip()]
     total = len(cookies)
     threads = max(1, min(DEFAULT_THREADS, total))
+    llm_batcher.set_concurrency(threads)
 
     thread_safe_print(colored("=" * 50, "C"))
     thread_safe_print(colored("  小蚕全民足球赛 - 多账号并发执行", "C", "BOLD"))
@@ -26,20 +26,18 @@
   因使用本脚本产生的风险由使用者自行承担。
 """
 
-import hashlib
 import json
 import os
 import sys
 import threading
 import time
-import uuid
 from collections import defaultdict
 from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from xiaocan_client import XiaocanClient, status_of
 
 # ── 配置常量 ─────────────────────────────────────────────
 RPC_URL = "https://gw.xiaocantech.com/rpc"
@@ -77,16 +75,12 @@ def colored(text, *codes):
     return f"{prefix}{text}{_C['RST']}" if prefix else text
 
 
-def md5(text: str) -> str:
-    return hashlib.md5(text.encode()).hexdigest()
-
-
 # ── 认证解析 ─────────────────────────────────────────────
 
 class GrabAccount:
     """单个账号的认证信息"""
 
-    __slots__ = ("user_id", "silk_id", "token", "label", "color")
+    __slots__ = ("user_id", "silk_id", "token", "label", "color", "client")
 
     def __init__(self, cookie: str, index: int = 1, total: int = 1):
         parts = cookie.strip().split("#")
@@ -112,6 +106,13 @@ class GrabAccount:
         self.token = token
         self.label = note if note else (f"账号{index}" if total > 1 else f"账号{index}")
         self.color = _ACC_COLORS[(index - 1) % len(_ACC_COLORS)]
+        # 同一账号的查询、预热与发射共用一个连接池，预热建立的连接直接用于发射
+        self.client = XiaocanClient(
+            silk_id, self.build_base_headers(), SERVER_NAME,
+            url=RPC_URL, timeout=HTTP_TIMEOUT,
+            retries=1, backoff=0.1, status_forcelist=(429, 500, 502, 503),
+            pool_size=50,
+        )
 
     def build_base_headers(self) -> dict:
         return {
@@ -141,31 +142,6 @@ def parse_accounts(cookie_text: str) -> list[GrabAccount]:
     return [GrabAccount(raw, i, total) for i, raw in enumerate(raw_list, 1)]
 
 
-# ── 签名生成 ─────────────────────────────────────────────
-
-def generate_x_nami(silk_id: str) -> str:
-    rid = uuid.uuid4().hex
-    tail_len = max(0, 20 - len(silk_id) - 4)
-    return rid[:4] + silk_id + rid[4:4 + tail_len]
-
-
-def generate_x_ashe(server: str, method: str, x_garen: str, x_nami: str) -> str:
-    service_method = f"{server}.{method}".lower()
-    return md5(md5(service_method) + x_garen + x_nami)
-
-
-def build_signed_headers(base_headers: dict, method_name: str,
-                         silk_id: str) -> dict:
-    headers = dict(base_headers)
-    headers["methodname"] = method_name
-    x_nami = generate_x_nami(silk_id)
-    x_garen = str(int(time.time() * 1000))
-    headers["x-nami"] = x_nami
-    headers["x-garen"] = x_garen
-    headers["x-ashe"] = generate_x_ashe(SERVER_NAME, method_name, x_garen, x_nami)
-    return headers
-
-
 # ── 服务器时间校准 ───────────────────────────────────────
 
 def sync_server_time() -> tuple:
@@ -198,39 +174,18 @@ def get_calibrated_time(offset: float) -> float:
     return time.time() + offset
 
 
-# ── HTTP Session ─────────────────────────────────────────
-
-def create_session() -> requests.Session:
-    session = requests.Session()
-    retry = Retry(
-        total=1, connect=1, read=1, backoff_factor=0.1,
-        status_forcelist=(429, 500, 502, 503),
-        allowed_methods=frozenset(["POST"]),
-    )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=50, pool_maxsize=50)
-    session.mount("https://", adapter)
-    return session
-
-
 # ── API 调用 ─────────────────────────────────────────────
 
-def check_quota(session: requests.Session, account: GrabAccount) -> dict:
+def check_quota(account: GrabAccount) -> dict:
     """
     查询影音会员周卡资格。
     返回 {"ok", "has_quota", "available_count", "grab_time",
           "has_inventory", "next_time", "event_count"}
     """
     try:
-        headers = build_signed_headers(
-            account.build_base_headers(), CHECK_METHOD, account.silk_id
-        )
-        payload = json.dumps({"silk_id": int(account.silk_id)},
-                            separators=(",", ":"))
-        resp = session.post(RPC_URL, headers=headers, data=payload,
-                           timeout=HTTP_TIMEOUT)
-        result = resp.json()
-        status = result.get("status", {})
-        if status.get("code") == 0:
+        result = account.client.rpc(CHECK_METHOD, {"silk_id": int(account.silk_id)})
+        code, msg = status_of(result)
+        if code == 0:
             info = result.get("info", {})
             return {
                 "ok": True,
@@ -241,24 +196,15 @@ def check_quota(session: requests.Session, account: GrabAccount) -> dict:
                 "next_time": info.get("next_time", 0),
                 "event_count": info.get("event_count", 0),
             }
-        return {"ok": False, "error": status.get("msg", str(result))}
+        return {"ok": False, "error": msg or str(result)}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
 
-def grab_vip_card(session: requests.Session, account: GrabAccount) -> tuple:
+def grab_vip_card(account: GrabAccount) -> tuple:
     """返回 (success, message)"""
-    headers = build_signed_headers(
-        account.build_base_headers(), GRAB_METHOD, account.silk_id
-    )
-    payload = json.dumps({"silk_id": int(account.silk_id)},
-                        separators=(",", ":"))
-    resp = session.post(RPC_URL, headers=headers, data=payload,
-                       timeout=HTTP_TIMEOUT)
-    result = resp.json()
-    status = result.get("status", {})
-    code = status.get("code", -1)
-    msg = status.get("msg", "")
+    result = account.client.rpc(GRAB_METHOD, {"silk_id": int(account.silk_id)})
+    code, msg = status_of(result)
 
     if code == 0:
         info = result.get("info", {})
@@ -306,7 +252,6 @@ class AccountGrabber:
     def __init__(self, account: GrabAccount, n_threads: int):
         self.account = account
         self.n_threads = min(n_threads, 50)
-        self.base_headers = account.build_base_headers()
         self.results: list[FireResult] = []
         self.results_lock = threading.Lock()
 
@@ -318,18 +263,11 @@ class AccountGrabber:
                 ready_counter: list, ready_lock: threading.Lock,
                 barrier: threading.Barrier,
                 server_offset: float, target_ts: float, advance_ms: int):
-        session = create_session()
-
         try:
             # 预热连接
             try:
-                h = build_signed_headers(
-                    self.base_headers, CHECK_METHOD, self.account.silk_id
-                )
-                session.post(RPC_URL, headers=h,
-                            data=json.dumps({"silk_id": int(self.account.silk_id)},
-                                           separators=(",", ":")),
-                            timeout=HTTP_TIMEOUT)
+                self.account.client.post(
+                    CHECK_METHOD, {"silk_id": int(self.account.silk_id)})
             except Exception:
                 pass
 
@@ -350,7 +288,7 @@ class AccountGrabber:
                     time.sleep((fire_at - now) * 0.5)
 
             start = time.perf_counter()
-            success, message = grab_vip_card(session, self.account)
+            success, message = grab_vip_card(self.account)
             elapsed = (time.perf_counter() - start) * 1000
 
             with self.results_lock:
@@ -405,8 +343,7 @@ class MultiAccountGrabber:
         shared_next_time = None
         for grabber in self.grabbers:
             acc = grabber.account
-            session = create_session()
-            info = check_quota(session, acc)
+            info = check_quota(acc)
 
             if info.get("ok"):
                 if info.get("next_time") and not shared_next_time:
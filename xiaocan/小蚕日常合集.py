@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   小蚕日常合集：元宝 / 霸王餐 / 红包雨 / 全民足球赛 单进程一次跑完
+#   变量：xcplus 多号：换行 或 @ 分割
+#   格式：备注名#x-vayne#x-teemo#x-sivir
+#   变量XC_STAGES 启用的活动，逗号分隔，默认 yuanbao,bwc,rain,football
+#   变量XC_THREADS线程数量，默认3
+#   各活动自身的变量 (XC_LOTTERY / XC_RAIN_MODE / XC_FOOTBALL_* 等) 照常生效
+#   羊毛交流群：476250706
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+from xiaocan_client import new_session
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+COOKIE_ENV = "xcplus"
+STAGES_ENV = "XC_STAGES"
+DEFAULT_THREADS = int(os.getenv("XC_THREADS", "3"))
+
+DISCLAIMER = (
+    "免责声明：本脚本仅供学习和接口调试使用，请遵守平台规则和相关法律法规；"
+    "因使用本脚本产生的风险由使用者自行承担。"
+)
+
+# ── ANSI 颜色 ────────────────────────────────────────────────
+_C = {
+    "R": "\033[31m",
+    "G": "\033[32m",
+    "Y": "\033[33m",
+    "B": "\033[34m",
+    "C": "\033[36m",
+    "M": "\033[35m",
+    "W": "\033[90m",
+    "D": "\033[2m",
+    "BOLD": "\033[1m",
+    "RST": "\033[0m",
+}
+_ACC_COLORS = ["B", "M", "C", "G", "R", "Y"]
+
+_print_lock = threading.Lock()
+
+
+def ts_print(*args, **kwargs):
+    with _print_lock:
+        print(*args, **kwargs)
+
+
+def colored(text, *codes):
+    prefix = "".join(_C.get(c, "") for c in codes)
+    return f"{prefix}{text}{_C['RST']}" if prefix else text
+
+
+def load_script(filename, name):
+    """加载同目录下的活动脚本 (文件名含中文与版本号，无法直接 import)"""
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPT_DIR, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+# ── 账号 ─────────────────────────────────────────────────────
+
+
+class Account:
+    """
+    一个账号的认证信息与整轮共用的 keep-alive 会话。
+    会话按重试策略区分：非幂等的抽奖/领取 (元宝) 走不重试的会话，其余阶段共用带重试的会话。
+    """
+
+    __slots__ = ("index", "total", "note", "user_id", "silk_id", "token",
+                 "label", "color", "sessions")
+
+    def __init__(self, cookie, index, total):
+        parts = cookie.strip().split("#")
+        if len(parts) == 3:
+            parts.insert(0, "")
+        if len(parts) != 4:
+            raise ValueError(f"账号{index}: cookie 格式应为 备注名#x-vayne#x-teemo#x-sivir")
+        self.note, self.user_id, self.silk_id, self.token = parts
+        if not self.user_id.isdigit() or not self.silk_id.isdigit() or not self.token:
+            raise ValueError(f"账号{index}: cookie 内容无效")
+        self.index = index
+        self.total = total
+        self.label = self.note or f"账号{index}/{total}"
+        self.color = _ACC_COLORS[(index - 1) % len(_ACC_COLORS)]
+        self.sessions = {}
+
+    @property
+    def cookie(self):
+        return f"{self.note}#{self.user_id}#{self.silk_id}#{self.token}"
+
+    def session(self, retries):
+        """按重试次数取本账号的 keep-alive 会话，同一策略的阶段共用连接"""
+        session = self.sessions.get(retries)
+        if session is None:
+            session = self.sessions[retries] = new_session(retries=retries)
+        return session
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+        self.sessions.clear()
+
+
+def parse_accounts(cookie_text):
+    """解析 xcplus；格式错误的账号单独跳过 (与各活动脚本一致)，返回 (有效账号, 错误信息)"""
+    cookies = [c.strip() for c in cookie_text.replace("\n", "@").split("@") if c.strip()]
+    total = len(cookies)
+    accounts = []
+    errors = []
+    for i, cookie in enumerate(cookies):
+        try:
+            accounts.append(Account(cookie, i + 1, total))
+        except ValueError as exc:
+            errors.append(str(exc))
+    return accounts, errors
+
+
+# ── 活动阶段 ─────────────────────────────────────────────────
+
+
+class Stage:
+    """
+    一个活动阶段：key 用于 XC_STAGES 选择，runner(module, account, session) 返回是否成功。
+    retries 为该阶段网关请求的重试次数，与原脚本保持一致；skip(module) 返回非空文本时整轮跳过该阶段。
+    """
+
+    __slots__ = ("key", "name", "filename", "runner", "retries", "skip")
+
+    def __init__(self, key, name, filename, runner, retries=2, skip=None):
+        self.key = key
+        self.name = name
+        self.filename = filename
+        self.runner = runner
+        self.retries = retries
+        self.skip = skip
+
+    def load(self):
+        return load_script(self.filename, f"xc_stage_{self.key}")
+
+
+def run_yuanbao(module, account, session):
+    sess = module.Session(account.user_id, account.silk_id, account.token,
+                          session=session)
+    tag = f"[{account.index}/{account.total}] {account.note or account.user_id}"
+    ts_print(module._run_session(sess, tag))
+    return True
+
+
+def bot_runner(class_name):
+    def runner(module, account, session):
+        bot = getattr(module, class_name)(
+            account.cookie, account_label=account.label,
+            color_code=account.color, session=session,
+        )
+        bot.run()
+        return bot.success
+    return runner
+
+
+def football_expired(module):
+    return module.EXPIRE_MESSAGE if date.today() == module.EXPIRE_DATE else ""
+
+
+STAGES = (
+    # 抽奖与积分领取是非幂等 POST，与原脚本一样不做自动重试，避免超时重发造成重复抽奖
+    Stage("yuanbao", "元宝", "小蚕元宝.py", run_yuanbao, retries=0),
+    Stage("bwc", "霸王餐", "小蚕霸王餐.py", bot_runner("XiaocanLotteryBot")),
+    Stage("rain", "红包雨", "小蚕红包雨.py", bot_runner("XiaocanRedPackRainBot")),
+    Stage("football", "全民足球赛", "小蚕全民足球赛v1.02.py", bot_runner("FootballBot"),
+          skip=football_expired),
+)
+STAGE_BY_KEY = {stage.key: stage for stage in STAGES}
+
+
+def enabled_stages():
+    """按 XC_STAGES 顺序加载启用的阶段，返回 [(stage, module)]"""
+    value = os.getenv(STAGES_ENV, "").strip()
+    keys = [k.strip().lower() for k in value.split(",") if k.strip()] if value else list(STAGE_BY_KEY)
+    loaded = []
+    for key in dict.fromkeys(keys):
+        stage = STAGE_BY_KEY.get(key)
+        if stage is None:
+            ts_print(colored(f"未知阶段 {key}，可选: {','.join(STAGE_BY_KEY)}", "Y"))
+            continue
+        module = stage.load()
+        reason = stage.skip(module) if stage.skip else ""
+        if reason:
+            ts_print(colored(f"[{stage.name}] 跳过: {reason}", "Y"))
+            continue
+        loaded.append((stage, module))
+    return loaded
+
+
+# ── 并发执行 ─────────────────────────────────────────────────
+
+
+class StageResult:
+    __slots__ = ("stage", "account", "success", "elapsed", "error")
+
+    def __init__(self, stage, account, success, elapsed, error=None):
+        self.stage = stage
+        self.account = account
+        self.success = success
+        self.elapsed = elapsed
+        self.error = error
+
+
+def run_account(account, stages):
+    """单个账号按顺序跑完所有阶段，相同重试策略的阶段共用同一会话"""
+    results = []
+    try:
+        for stage, module in stages:
+            start = time.perf_counter()
+            error = None
+            try:
+                success = bool(stage.runner(module, account, account.session(stage.retries)))
+            except Exception as exc:
+                success, error = False, str(exc)
+                ts_print(colored(f"[{account.label}] {stage.name} 异常: {exc}", "R"))
+            results.append(StageResult(stage, account, success, time.perf_counter() - start, error))
+    finally:
+        account.close()
+    return results
+
+
+def print_summary(stages, results, elapsed, errors=()):
+    ts_print()
+    ts_print(colored("=" * 50, "C"))
+    ts_print(colored("  执行完成", "C", "BOLD"))
+    ts_print(colored(f"  {'阶段':<8} {'成功':>7} {'总耗时':>8} {'平均':>7} {'最慢':>7}", "C"))
+    for stage, _ in stages:
+        rows = [r for r in results if r.stage is stage]
+        if not rows:
+            continue
+        ok_count = sum(1 for r in rows if r.success)
+        total_time = sum(r.elapsed for r in rows)
+        slowest = max(r.elapsed for r in rows)
+        ts_print(
+            f"  {stage.name:<8} "
+            + colored(f"{ok_count:>3}/{len(rows):<3}", "G" if ok_count == len(rows) else "R")
+            + f" {total_time:>7.1f}s {total_time / len(rows):>6.1f}s {slowest:>6.1f}s"
+        )
+    ts_print(colored(f"  总耗时: {elapsed:.1f}秒", "C"))
+    for error in errors:
+        ts_print(colored(f"  {error}，已跳过", "R"))
+    for r in sorted(results, key=lambda r: r.account.index):
+        if r.error:
+            ts_print(colored(f"  {r.account.label} {r.stage.name} 执行异常: {r.error}", "R"))
+    ts_print(colored("=" * 50, "C"))
+
+
+def main():
+    ts_print(colored(DISCLAIMER, "D"))
+    ts_print()
+
+    cookie_text = os.getenv(COOKIE_ENV, "").strip()
+    if not cookie_text:
+        ts_print(colored(f"请设置环境变量：{COOKIE_ENV}", "R"))
+        return
+
+    accounts, errors = parse_accounts(cookie_text)
+    for error in errors:
+        ts_print(colored(error, "R"))
+    if not accounts:
+        return
+    stages = enabled_stages()
+    if not stages:
+        ts_print(colored("没有可执行的阶段", "R"))
+        return
+
+    total = len(accounts)
+    threads = max(1, min(DEFAULT_THREADS, total))
+    for _, module in stages:
+        # 足球赛跨账号合并大模型请求：只有一个线程时没有可合并的请求，不必等待
+        batcher = getattr(module, "llm_batcher", None)
+        if batcher is not None:
+            batcher.set_concurrency(threads)
+
+    ts_print(colored("=" * 50, "C"))
+    ts_print(colored("  小蚕日常合集 - 多账号并发执行", "C", "BOLD"))
+    ts_print(colored(f"  线程数: {threads}  |  账号数: {total}", "C"))
+    ts_print(colored(f"  阶段: {' → '.join(stage.name for stage, _ in stages)}", "C"))
+    ts_print(colored("=" * 50, "C"))
+    ts_print()
+
+    start_time = time.time()
+    results = []
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(run_account, account, stages) for account in accounts]
+        for future in as_completed(futures):
+            results.extend(future.result())
+
+    print_summary(stages, results, time.time() - start_time, errors)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,20 +9,18 @@
 import base64
 import hashlib
 import hmac
-import json
 import os
 import random
 import sys
 import threading
 import time
-import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from io import StringIO
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from xiaocan_client import XiaocanClient
 
 
 RPC_URL = "https://gwh.xiaocantech.com/rpc"
@@ -125,26 +123,10 @@ def pick_text(data, keys):
     return ""
 
 
-def md5(text):
-    return hashlib.md5(text.encode()).hexdigest()
-
-
 def build_nonce(length=6):
     return "".join(random.choice("0123456789abcdef") for _ in range(length))
 
 
-def build_retry_adapter():
-    retry = Retry(
-        total=2,
-        connect=2,
-        read=2,
-        backoff_factor=0.5,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=frozenset(["POST"]),
-    )
-    return HTTPAdapter(max_retries=retry)
-
-
 def format_time(timestamp):
     return datetime.fromtimestamp(int(timestamp)).strftime("%H:%M:%S")
 
@@ -235,7 +217,7 @@ def choose_current_or_next_event(events):
 
 
 class XiaocanRedPackRainBot:
-    def __init__(self, cookie, account_label="", color_code="C"):
+    def __init__(self, cookie, account_label="", color_code="C", session=None):
         user_id, silk_id, token, note = self.parse_cookie(cookie)
         self.user_id = user_id
         self.silk_id = silk_id
@@ -244,9 +226,11 @@ class XiaocanRedPackRainBot:
         self.label = note or account_label
         self.cc = color_code
         self.city_code = int(os.getenv("XC_CITY_CODE", "430105"))
-        self.session = requests.Session()
-        self.session.mount("https://", build_retry_adapter())
-        self.headers = self.build_base_headers()
+        self.client = XiaocanClient(
+            silk_id, self.build_base_headers(), SERVER_NAME,
+            url=RPC_URL, timeout=HTTP_TIMEOUT,
+            session=session,
+        )
         self.success = True  # 执行过程中由各方法设置
 
     # ── 输出辅助 ──
@@ -308,13 +292,9 @@ class XiaocanRedPackRainBot:
             "appid": str(APP_ID),
             "x-annie": "XC",
             "x-city": str(self.city_code),
-            "x-nami": "",
             "x-teemo": self.silk_id,
-            "x-garen": "",
             "x-sivir": self.token,
-            "x-ashe": "",
             "servername": SERVER_NAME,
-            "methodname": GET_CURRENT_EVENT_METHOD,
             "content-type": "application/json",
             "accept": "application/json, text/plain, */*",
             "origin": "https://gw.hzaiguojiang.com",
@@ -329,42 +309,10 @@ class XiaocanRedPackRainBot:
             ),
         }
 
-    def refresh_auth_headers(self, method_name):
-        request_id = uuid.uuid4().hex
-        random_tail_length = max(0, 20 - len(self.silk_id) - 4)
-        x_nami = request_id[:4] + self.silk_id + request_id[4: 4 + random_tail_length]
-        x_garen = str(int(time.time() * 1000))
-        service_method = f"{SERVER_NAME}.{method_name}".lower()
-        x_ashe = md5(md5(service_method) + x_garen + x_nami)
-
-        self.headers.update(
-            {
-                "methodname": method_name,
-                "x-nami": x_nami,
-                "x-garen": x_garen,
-                "x-ashe": x_ashe,
-            }
-        )
-
     # ── RPC ──
 
     def rpc(self, method_name, data):
-        self.refresh_auth_headers(method_name)
-        payload = json.dumps(data, separators=(",", ":"))
-        response = self.session.post(
-            RPC_URL,
-            headers=self.headers,
-            data=payload,
-            timeout=HTTP_TIMEOUT,
-        )
-        response.raise_for_status()
-        try:
-            result = response.json()
-        except ValueError as exc:
-            raise ValueError(f"接口返回不是合法 JSON: {method_name}") from exc
-        if not isinstance(result, dict):
-            raise ValueError(f"接口返回格式异常: {method_name}")
-        return result
+        return self.client.rpc(method_name, data)
 
     def base_payload(self, **extra):
         payload = {"silk_id": int(self.silk_id)}
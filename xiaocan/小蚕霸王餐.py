@@ -10,19 +10,17 @@
 import base64
 import hashlib
 import hmac
-import json
 import os
 import random
 import string
 import threading
 import time
-import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from xiaocan_client import XiaocanClient
 
 
 RPC_URL = "https://gwh.xiaocantech.com/rpc"
@@ -127,22 +125,6 @@ def pick_text(data, keys):
     return ""
 
 
-def md5(text):
-    return hashlib.md5(text.encode()).hexdigest()
-
-
-def build_retry_adapter():
-    retry = Retry(
-        total=2,
-        connect=2,
-        read=2,
-        backoff_factor=0.5,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=frozenset(["POST"]),
-    )
-    return HTTPAdapter(max_retries=retry)
-
-
 def format_progress(lottery_count, second_step_count):
     if second_step_count is None:
         return str(lottery_count)
@@ -241,7 +223,7 @@ def looks_like_task(value):
 
 
 class XiaocanLotteryBot:
-    def __init__(self, cookie, account_label="", color_code="C"):
+    def __init__(self, cookie, account_label="", color_code="C", session=None):
         user_id, silk_id, token, note = self.parse_cookie(cookie)
         self.user_id = user_id
         self.silk_id = silk_id
@@ -249,9 +231,11 @@ class XiaocanLotteryBot:
         self.note = note
         self.label = note or account_label
         self.cc = color_code
-        self.session = requests.Session()
-        self.session.mount("https://", build_retry_adapter())
-        self.headers = self.build_base_headers()
+        self.client = XiaocanClient(
+            silk_id, self.build_base_headers(), SERVER_NAME,
+            url=RPC_URL, timeout=HTTP_TIMEOUT,
+            session=session,
+        )
         self.success = True
 
     # ── 输出辅助 ──
@@ -287,13 +271,9 @@ class XiaocanLotteryBot:
             "x-platform": "mini",
             "x-annie": "XC",
             "x-city": "430100",
-            "x-nami": "",
             "x-teemo": self.silk_id,
-            "x-garen": "",
             "x-sivir": self.token,
-            "x-ashe": "",
             "servername": SERVER_NAME,
-            "methodname": LOTTERY_METHOD,
             "content-type": "application/json",
             "accept": "application/json, text/plain, */*",
             "origin": "https://gw.djtaoke.cn",
@@ -308,23 +288,6 @@ class XiaocanLotteryBot:
             ),
         }
 
-    def refresh_auth_headers(self, method_name):
-        request_id = uuid.uuid4().hex
-        random_tail_length = max(0, 20 - len(self.silk_id) - 4)
-        x_nami = request_id[:4] + self.silk_id + request_id[4: 4 + random_tail_length]
-        x_garen = str(int(time.time() * 1000))
-        service_method = f"{SERVER_NAME}.{method_name}".lower()
-        x_ashe = md5(md5(service_method) + x_garen + x_nami)
-
-        self.headers.update(
-            {
-                "methodname": method_name,
-                "x-nami": x_nami,
-                "x-garen": x_garen,
-                "x-ashe": x_ashe,
-            }
-        )
-
     def base_payload(self, **extra):
         payload = {"silk_id": self.silk_id_as_int()}
         payload.update(extra)
@@ -336,22 +299,7 @@ class XiaocanLotteryBot:
     # ── RPC ──
 
     def rpc(self, method_name, data):
-        self.refresh_auth_headers(method_name)
-        payload = json.dumps(data, separators=(",", ":"))
-        response = self.session.post(
-            RPC_URL,
-            headers=self.headers,
-            data=payload,
-            timeout=HTTP_TIMEOUT,
-        )
-        response.raise_for_status()
-        try:
-            result = response.json()
-        except ValueError as exc:
-            raise ValueError(f"接口返回不是合法 JSON: {method_name}") from exc
-        if not isinstance(result, dict):
-            raise ValueError(f"接口返回格式异常: {method_name}")
-        return result
+        return self.client.rpc(method_name, data)
 
     # ── 任务 ──
 